@@ -0,0 +1,30 @@
+"""
+Merge the per-rank cProfile dumps of a profiled run and report the hot spots.
+
+Reads the `time_profile.<rank>` files written when a simulation script is run with
+`--profile`, and writes a merged profile, folded stacks for flame graphs and a
+hot-spot report into the same directory.
+"""
+
+import argparse
+
+from gains.utils.profile import aggregate_profiles
+
+parser = argparse.ArgumentParser(
+    description="Merge per-rank profiles and report the most expensive functions."
+)
+
+parser.add_argument(
+    "profile_dir", type=str, help="Directory holding the time_profile.<rank> files."
+)
+
+parser.add_argument(
+    "--top",
+    type=int,
+    default=20,
+    help="Number of functions to report, by cumulative and by self time.",
+)
+
+args = vars(parser.parse_args())
+
+print(aggregate_profiles(args["profile_dir"], top=args["top"]))  # noqa: T201
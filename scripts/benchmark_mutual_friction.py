@@ -0,0 +1,159 @@
+"""
+Measure the cost of evaluating the mutual-friction force on the right-hand sides.
+
+Both momentum equations of the two-fluid problems contain the mutual-friction force,
+so each evaluation of the right-hand sides evaluates `x_s/x_n * F_mf` and `-F_mf`.
+This times those evaluations with the force written inline, as the scripts used to,
+with the cross product omega_s x u_ns built separately for each of its two terms,
+and as built by `gains.problems.mutual_friction.MutualFriction`, with the cross
+product shared between them. The velocities are random fields on the bases of the
+problem. The time per evaluation of each, their ratio and the largest difference
+between the two forces are logged and written to --output as JSON.
+
+Example, on 4 ranks:
+
+    mpiexec -n 4 python scripts/benchmark_mutual_friction.py two_fluid_shell
+        --defaults spherical_shell --resolution 64,32,32
+"""
+
+import argparse
+import json
+import logging
+import time
+import uuid
+from pathlib import Path
+
+import dedalus.public as d3
+import numpy as np
+from mpi4py import MPI
+
+from gains.problems.mutual_friction import UNIT_EPSILON, MutualFriction
+from gains.problems.spin_up import X_N, X_S, TwoFluidShellSpinUp, TwoFluidSphereSpinUp
+from gains.utils.sweep import load_base_params, parse_resolution
+
+# Builder of each problem, with its velocity basis and whether omega_unit is
+# normalised.
+PROBLEMS = {
+    "two_fluid_sphere": (TwoFluidSphereSpinUp, lambda b: b.basis.ball, True),
+    "two_fluid_shell": (TwoFluidShellSpinUp, lambda b: b.basis.shell, False),
+}
+
+parser = argparse.ArgumentParser(
+    description="Measure the cost of evaluating the mutual-friction force."
+)
+
+parser.add_argument(
+    "problem",
+    choices=sorted(PROBLEMS),
+    nargs="?",
+    default="two_fluid_sphere",
+    help="Problem whose bases are used.",
+)
+parser.add_argument(
+    "--defaults",
+    type=str,
+    default=None,
+    help="Parameters overriding the defaults of the problem: a module of"
+    " gains.params (e.g. spherical_shell) or a JSON parameter file.",
+)
+parser.add_argument(
+    "--resolution",
+    type=parse_resolution,
+    default=parse_resolution("64,32,32"),
+    help="Resolution, as NPHI,NTHETA,NR.",
+)
+parser.add_argument(
+    "--repeats",
+    type=int,
+    default=50,
+    help="Number of evaluations of the right-hand sides timed for each version.",
+)
+parser.add_argument(
+    "--output",
+    type=Path,
+    default=Path("outputs") / "benchmark_mutual_friction.json",
+    help="JSON file the results are written to.",
+)
+
+args = parser.parse_args()
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+logger = logging.getLogger(__name__)
+comm = MPI.COMM_WORLD
+
+builder_class, get_bases, normalise = PROBLEMS[args.problem]
+params = load_base_params(args.defaults) if args.defaults else {}
+builder = builder_class({**params, **args.resolution})
+bases = get_bases(builder)
+u_n = builder.dist.VectorField(builder.coords, name="u_n", bases=bases)
+u_s = builder.dist.VectorField(builder.coords, name="u_s", bases=bases)
+for seed, u in enumerate((u_n, u_s)):
+    u.fill_random("g", seed=seed, distribution="normal", scale=1e-2)
+    u.low_pass_filter(scales=0.5)
+b = builder.params["B"]
+
+
+def inline_force() -> d3.Field:
+    """Build the force as the scripts wrote it inline."""
+    u_ns = u_n - u_s
+    omega_s = d3.Curl(u_s) + 2 * builder.ez
+    omega_unit = (
+        omega_s / (np.sqrt(d3.DotProduct(omega_s, omega_s)) + UNIT_EPSILON)
+        if normalise
+        else omega_s / 2
+    )
+    return b * d3.CrossProduct(
+        omega_unit, d3.CrossProduct(omega_s, u_ns)
+    ) + b / 2 * d3.CrossProduct(omega_s, u_ns)
+
+
+def time_rhs(force: d3.Field) -> tuple[float, np.ndarray]:
+    """
+    Time the evaluations of the force on the right-hand sides.
+
+    :param force: The mutual-friction force.
+    :returns wall_time: Largest wall time per evaluation over the ranks.
+    :returns result: Local grid data of the force on the normal fluid.
+    """
+    tasks = [X_S / X_N * force, -force]
+    comm.Barrier()
+    start = time.monotonic()
+    for _ in range(args.repeats):
+        # One identifier per evaluation, as the evaluator uses
+        evaluation = uuid.uuid4()
+        outputs = [task.evaluate(id=evaluation) for task in tasks]
+    wall_time = comm.allreduce(time.monotonic() - start, op=MPI.MAX)
+    return wall_time / args.repeats, np.copy(outputs[0]["g"])
+
+
+inline_time, inline_result = time_rhs(inline_force())
+shared_time, shared_result = time_rhs(
+    MutualFriction(u_n, u_s, builder.ez, b, normalise=normalise).force
+)
+difference = comm.allreduce(
+    float(np.max(np.abs(shared_result - inline_result))), op=MPI.MAX
+)
+ratio = shared_time / inline_time
+
+if comm.rank == 0:
+    logger.info(
+        f"Per evaluation of the right-hand sides: inline {1e3 * inline_time:.3f} ms,"
+        f" shared {1e3 * shared_time:.3f} ms (ratio {ratio:.3f});"
+        f" largest difference {difference:.1e}"
+    )
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with args.output.open("w") as f:
+        json.dump(
+            {
+                "problem": args.problem,
+                "resolution": args.resolution,
+                "ranks": comm.size,
+                "repeats": args.repeats,
+                "inline_time": inline_time,
+                "shared_time": shared_time,
+                "ratio": ratio,
+                "max_difference": difference,
+            },
+            f,
+            indent=2,
+        )
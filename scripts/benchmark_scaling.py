@@ -0,0 +1,185 @@
+"""
+Measure how the simulation scripts scale with the number of ranks and the resolution.
+
+Each script is run for a fixed number of iterations at every resolution on every
+number of ranks, one run at a time as local `mpiexec` subprocesses (see
+`gains.utils.scaling`). The setup time, steady-state wall time per iteration and peak
+memory of every run, and the strong- and weak-scaling efficiencies they give, are
+written to --output as JSON, together with the versions of the code. Give the result
+file of an earlier version as --baseline to log how each run has changed.
+
+The spherical scripts run at each --resolution, and kelvin_helmholtz at each
+--plane_resolution. For weak scaling, choose resolutions whose number of grid points
+grows with the number of ranks, e.g. doubling Nphi whenever the ranks double.
+
+Example, on up to 4 ranks:
+
+    python scripts/benchmark_scaling.py --ranks 1 2 4
+        --resolution 16,16,16 --resolution 32,16,16 --resolution 64,16,16
+        --plane_resolution 128,128 --plane_resolution 256,128
+"""
+
+import argparse
+import json
+import logging
+from pathlib import Path
+
+from gains.utils.scaling import (
+    compare_results,
+    parse_plane_resolution,
+    run_scaling_benchmark,
+    strong_scaling,
+    versions,
+    weak_scaling,
+)
+from gains.utils.sweep import load_base_params, parse_resolution
+
+# Parameters each script is run with, before the resolution is applied. None for
+# scripts taking their parameters as arguments.
+SCRIPTS = {
+    "single_spin_up_rotating_frame": "single_spin_up_rotating",
+    "two_fluid_spin_up": "single_spin_up_rotating",
+    "spherical_shell_spin_up": "spherical_shell",
+    "crust_core": "spherical_shell",
+    "kelvin_helmholtz": None,
+}
+
+parser = argparse.ArgumentParser(
+    description="Measure how the simulation scripts scale with ranks and resolution."
+)
+
+parser.add_argument(
+    "--scripts",
+    choices=list(SCRIPTS),
+    nargs="+",
+    default=list(SCRIPTS),
+    help="Scripts to benchmark.",
+)
+parser.add_argument(
+    "--ranks",
+    type=int,
+    nargs="+",
+    default=[1, 2, 4],
+    help="Numbers of MPI ranks to run on.",
+)
+parser.add_argument(
+    "--resolution",
+    type=parse_resolution,
+    action="append",
+    default=None,
+    help="Resolution of the spherical scripts, as NPHI,NTHETA,NR. Repeat for each"
+    " resolution. Defaults to 16,16,16.",
+)
+parser.add_argument(
+    "--plane_resolution",
+    type=parse_plane_resolution,
+    action="append",
+    default=None,
+    help="Resolution of kelvin_helmholtz, as NX,NY. Repeat for each resolution."
+    " Defaults to 128,128.",
+)
+parser.add_argument(
+    "--iterations",
+    type=int,
+    default=200,
+    help="Number of iterations of each run.",
+)
+parser.add_argument(
+    "--load_balance_cadence",
+    type=int,
+    default=50,
+    help="Iterations between timing summaries. The time per iteration is measured"
+    " from the second summary on.",
+)
+parser.add_argument(
+    "--benchmark_dir",
+    type=Path,
+    default=Path("outputs") / "scaling",
+    help="Directory under which each run gets its own output directory.",
+)
+parser.add_argument(
+    "--mpiexec",
+    type=str,
+    default="mpiexec",
+    help="MPI launcher, called as <mpiexec> -n <ranks>.",
+)
+parser.add_argument(
+    "--baseline",
+    type=Path,
+    default=None,
+    help="Result file of an earlier benchmark to compare against.",
+)
+parser.add_argument(
+    "--output",
+    type=Path,
+    default=Path("outputs") / "benchmark_scaling.json",
+    help="JSON file the results are written to.",
+)
+
+args = parser.parse_args()
+if args.iterations < 2 * args.load_balance_cadence:
+    parser.error("--iterations must be at least twice --load_balance_cadence")
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+logger = logging.getLogger(__name__)
+
+scripts_dir = Path(__file__).parent
+runs = []
+for name in args.scripts:
+    defaults = SCRIPTS[name]
+    runs.extend(
+        run_scaling_benchmark(
+            scripts_dir / f"{name}.py",
+            load_base_params(defaults) if defaults is not None else None,
+            (
+                args.resolution or [parse_resolution("16,16,16")]
+                if defaults is not None
+                else args.plane_resolution or [parse_plane_resolution("128,128")]
+            ),
+            args.benchmark_dir,
+            logger,
+            ranks=args.ranks,
+            iterations=args.iterations,
+            load_balance_cadence=args.load_balance_cadence,
+            launcher=(args.mpiexec, "-n", "{ranks}"),
+        )
+    )
+
+results = {
+    "versions": versions(),
+    "iterations": args.iterations,
+    "load_balance_cadence": args.load_balance_cadence,
+    "runs": runs,
+    "strong_scaling": strong_scaling(runs),
+    "weak_scaling": weak_scaling(runs),
+}
+
+for run in results["strong_scaling"]:
+    logger.info(
+        f"{run['script']} {run['resolution']} on {run['ranks']} ranks:"
+        f" {1e3 * run['step_time']:.3f} ms per iteration, strong-scaling efficiency"
+        f" {run['efficiency']:.2f}"
+    )
+for run in results["weak_scaling"]:
+    logger.info(
+        f"{run['script']} {run['resolution']} on {run['ranks']} ranks: weak-scaling"
+        f" efficiency {run['efficiency']:.2f}"
+    )
+failed = [run for run in runs if run["status"] != "completed"]
+if failed:
+    logger.warning(f"{len(failed)} runs did not complete, see {args.benchmark_dir}")
+
+if args.baseline is not None:
+    with args.baseline.open() as f:
+        baseline = json.load(f)
+    results["baseline_versions"] = baseline["versions"]
+    results["comparison"] = compare_results(baseline, results)
+    for run in results["comparison"]:
+        logger.info(
+            f"{run['script']} {run['resolution']} on {run['ranks']} ranks: time per"
+            f" iteration x{run['step_time_ratio']:.2f} of the baseline"
+        )
+
+args.output.parent.mkdir(parents=True, exist_ok=True)
+with args.output.open("w") as f:
+    json.dump(results, f, indent=2)
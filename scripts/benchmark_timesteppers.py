@@ -0,0 +1,183 @@
+"""
+Compare the accuracy per core-second of timesteppers and timestep settings.
+
+A small spin-up problem (by default the single-fluid sphere at reduced resolution) is
+run with every combination of --timesteppers, --safety and --max_timesteps, and its
+state is compared against a high-accuracy reference run at each of --times. Each
+configuration is scored by its largest relative error over those times, and by its
+cost in core-seconds per unit of simulation time. A table of the results, sorted by
+cost and with the Pareto-optimal configurations marked, is logged and the results are
+written to --output as JSON.
+
+All runs are built by the same `gains.problems.spin_up` builder, so they share the
+bases and their states can be compared directly. Configurations that blow up are
+reported with an infinite error.
+
+Example, on 4 ranks:
+
+    mpiexec -n 4 python scripts/benchmark_timesteppers.py single_fluid
+        --resolution 32,16,16 --timesteppers SBDF2 SBDF3 RK222 RK443
+"""
+
+import argparse
+import itertools
+import json
+import logging
+from pathlib import Path
+
+import dedalus.public as d3
+from mpi4py import MPI
+
+from gains.problems.spin_up import BUILDERS, SpinUpRun
+from gains.utils.benchmark import integrate_to, max_error, pareto_table
+from gains.utils.sweep import load_base_params, parse_resolution
+
+parser = argparse.ArgumentParser(
+    description="Compare the accuracy per core-second of timesteppers."
+)
+
+parser.add_argument(
+    "problem",
+    choices=sorted(BUILDERS),
+    nargs="?",
+    default="single_fluid",
+    help="Problem to run.",
+)
+parser.add_argument(
+    "--defaults",
+    type=str,
+    default=None,
+    help="Parameters overriding the defaults of the problem: a module of"
+    " gains.params (e.g. spherical_shell) or a JSON parameter file.",
+)
+parser.add_argument(
+    "--resolution",
+    type=parse_resolution,
+    default=parse_resolution("32,16,16"),
+    help="Resolution of all runs, as NPHI,NTHETA,NR.",
+)
+parser.add_argument(
+    "--timesteppers",
+    type=str,
+    nargs="+",
+    default=["SBDF2", "SBDF3", "SBDF4", "RK222", "RK443"],
+    help="Names of the dedalus timesteppers to compare.",
+)
+parser.add_argument(
+    "--safety",
+    type=float,
+    nargs="+",
+    default=[0.2, 0.3, 0.5],
+    help="CFL safety factors to compare.",
+)
+parser.add_argument(
+    "--max_timesteps",
+    type=float,
+    nargs="+",
+    default=[1e-2, 2e-2, 5e-2],
+    help="Largest timesteps to compare. The spin-up flows are slow, so the timestep"
+    " is often capped by this rather than by the CFL condition.",
+)
+parser.add_argument(
+    "--times",
+    type=float,
+    nargs="+",
+    default=[1.0, 2.0, 5.0],
+    help="Simulation times at which the runs are compared with the reference.",
+)
+parser.add_argument(
+    "--reference",
+    type=str,
+    default="RK443",
+    help="Timestepper of the reference run.",
+)
+parser.add_argument(
+    "--reference_refinement",
+    type=float,
+    default=10.0,
+    help="The reference run uses the smallest of --safety and --max_timesteps, each"
+    " divided by this factor.",
+)
+parser.add_argument(
+    "--output",
+    type=Path,
+    default=Path("outputs") / "benchmark_timesteppers.json",
+    help="JSON file the results are written to.",
+)
+parser.add_argument(
+    "--matrix_cache",
+    type=Path,
+    default=None,
+    help="Directory caching the assembled solver matrices between runs.",
+)
+
+args = parser.parse_args()
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+logger = logging.getLogger(__name__)
+comm = MPI.COMM_WORLD
+
+params = load_base_params(args.defaults) if args.defaults else {}
+builder = BUILDERS[args.problem]({**params, **args.resolution})
+times = sorted(args.times)
+
+
+def build(timestepper: str, safety: float, max_timestep: float) -> SpinUpRun:
+    """Build a run with the given time-integration settings."""
+    return builder.build(
+        {"stop_sim_time": times[-1]},
+        logger=logger,
+        matrix_cache=args.matrix_cache,
+        timestepper=getattr(d3, timestepper),
+        cfl_safety=safety,
+        max_timestep=max_timestep,
+    )
+
+
+refinement = args.reference_refinement
+reference_run = build(
+    args.reference, min(args.safety) / refinement, min(args.max_timesteps) / refinement
+)
+logger.info(f"Running the reference with {args.reference}")
+references, _ = integrate_to(reference_run, times, comm)
+if len(references) < len(times):
+    msg = "the reference run blew up"
+    raise RuntimeError(msg)
+del reference_run
+
+results = []
+for timestepper, safety, max_timestep in itertools.product(
+    args.timesteppers, args.safety, args.max_timesteps
+):
+    logger.info(f"Running {timestepper}, safety {safety}, max dt {max_timestep}")
+    run = build(timestepper, safety, max_timestep)
+    snapshots, wall_time = integrate_to(run, times, comm)
+    results.append(
+        {
+            "timestepper": timestepper,
+            "safety": safety,
+            "max_timestep": max_timestep,
+            "iterations": run.solver.iteration - run.solver.initial_iteration,
+            "wall_time": wall_time,
+            "cost": wall_time * comm.size / run.solver.sim_time,
+            "error": max_error(snapshots, references, comm),
+        }
+    )
+    del run
+
+if comm.rank == 0:
+    logger.info(f"Pareto table (* marks the Pareto front):\n{pareto_table(results)}")
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with args.output.open("w") as f:
+        json.dump(
+            {
+                "problem": args.problem,
+                "resolution": args.resolution,
+                "ranks": comm.size,
+                "times": times,
+                "reference": args.reference,
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
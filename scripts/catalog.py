@@ -0,0 +1,76 @@
+"""
+Query the catalog of simulation runs.
+
+Every run of a simulation script is registered in a SQLite catalog (by default
+`outputs/catalog.sqlite`), with its parameters, status, final simulation time and
+wall time. Runs are selected with filters on the run record or on any parameter,
+all of which must hold. For example, all two-fluid runs with Ek < 1e-3 that reached
+t = 40:
+
+    python scripts/catalog.py sim_name=two_fluid_spin_up "Ek<1e-3" "sim_time>=40"
+
+With `--paths` only the output directories are printed, one per line, for use by
+analysis tools.
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from gains.utils.catalog import CATALOG_FILE, RUN_COLUMNS, RunCatalog, parse_filter
+
+parser = argparse.ArgumentParser(description="Select runs from the run catalog.")
+
+parser.add_argument(
+    "filters",
+    type=parse_filter,
+    nargs="*",
+    help="Filters of the form NAME<OP>VALUE, with OP one of = != < <= > >=. NAME is"
+    f" a run column ({', '.join(RUN_COLUMNS)}) or a parameter.",
+)
+parser.add_argument(
+    "--catalog",
+    type=Path,
+    default=Path("outputs") / CATALOG_FILE,
+    help="Path to the catalog.",
+)
+parser.add_argument(
+    "--show",
+    type=str,
+    nargs="+",
+    default=[],
+    help="Parameters to show for each run.",
+)
+output = parser.add_mutually_exclusive_group()
+output.add_argument(
+    "--paths", action="store_true", help="Only print the output directories."
+)
+output.add_argument(
+    "--json", action="store_true", help="Print the full records as JSON."
+)
+
+args = parser.parse_args()
+
+if not args.catalog.exists():
+    parser.error(f"no catalog at {args.catalog}")
+runs = RunCatalog(args.catalog).query(args.filters)
+
+if args.paths:
+    for run in runs:
+        print(run["output_dir"])  # noqa: T201
+elif args.json:
+    print(json.dumps(runs, indent=2))  # noqa: T201
+else:
+    header = (
+        f"{'id':>4} {'sim_name':<24} {'status':<12} {'sim_time':>10} {'wall/s':>10}"
+        + "".join(f" {name:>12}" for name in args.show)
+        + "  output_dir"
+    )
+    print(header)  # noqa: T201
+    for run in runs:
+        sim_time = "" if run["sim_time"] is None else f"{run['sim_time']:.4g}"
+        shown = "".join(f" {run['params'].get(name, '')!s:>12}" for name in args.show)
+        print(  # noqa: T201
+            f"{run['id']:>4} {run['sim_name'] or '':<24} {run['status']:<12}"
+            f" {sim_time:>10} {run['wall_time']:>10.1f}{shown}  {run['output_dir']}"
+        )
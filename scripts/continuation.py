@@ -0,0 +1,122 @@
+"""
+Run the early spin-up at a coarse resolution, then continue it at the full one.
+
+The transients right after the impulsive change in rotation are computed on the
+--coarse grid, up to --switch_time or until the flow has settled (--switch_rtol).
+The coarse state is then checkpointed in coefficient space, padded to the resolution
+of the parameters (see `gains.utils.checkpoints.load_checkpoint`) and evolved to the
+stop time. The coarse run is kept under `coarse/` in the output directory.
+
+Example, on 8 ranks:
+
+    mpiexec -n 8 python scripts/continuation.py two_fluid_shell
+        --defaults spherical_shell --coarse 64,32,32 --switch_time 5
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+from mpi4py import MPI
+
+from gains.problems.spin_up import BUILDERS
+from gains.utils.checkpoints import CheckpointManager
+from gains.utils.convergence import SteadyStateMonitor
+from gains.utils.sweep import load_base_params, parse_resolution
+
+parser = argparse.ArgumentParser(
+    description="Run a spin-up problem at a coarse resolution, then continue it at"
+    " the full one."
+)
+
+parser.add_argument("problem", choices=sorted(BUILDERS), help="Problem to run.")
+parser.add_argument(
+    "--defaults",
+    type=str,
+    default=None,
+    help="Parameters overriding the defaults of the problem: a module of"
+    " gains.params (e.g. spherical_shell) or a JSON parameter file. Their resolution"
+    " is the one the run is continued at.",
+)
+parser.add_argument(
+    "--coarse",
+    type=parse_resolution,
+    required=True,
+    help="Resolution of the early part of the run, as NPHI,NTHETA,NR.",
+)
+parser.add_argument(
+    "--switch_time",
+    type=float,
+    required=True,
+    help="Simulation time at which to switch to the full resolution.",
+)
+parser.add_argument(
+    "--switch_rtol",
+    type=float,
+    default=None,
+    help="Switch earlier, once the relative change of the angular momentum and"
+    " maximum Reynolds number over --switch_window is below this tolerance.",
+)
+parser.add_argument(
+    "--switch_window",
+    type=float,
+    default=1.0,
+    help="Length in simulation time of the window used by --switch_rtol.",
+)
+parser.add_argument(
+    "--output_dir",
+    type=Path,
+    default=Path("outputs") / "continuation",
+    help="Output directory of the run.",
+)
+parser.add_argument(
+    "--matrix_cache",
+    type=Path,
+    default=None,
+    help="Directory caching the assembled solver matrices between runs.",
+)
+
+args = parser.parse_args()
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+logger = logging.getLogger(__name__)
+comm = MPI.COMM_WORLD
+
+builder_class = BUILDERS[args.problem]
+params = load_base_params(args.defaults) if args.defaults else {}
+coarse_dir = args.output_dir / "coarse"
+
+# Coarse run, stopped at the switch time or once the transients have settled.
+coarse = builder_class({**params, **args.coarse}).build(
+    {"stop_sim_time": args.switch_time},
+    logger=logger,
+    output_dir=coarse_dir,
+    matrix_cache=args.matrix_cache,
+)
+steady_state = (
+    SteadyStateMonitor(
+        coarse.flow,
+        {"L_z": "volume_integral", "Re_n": "max"},
+        rtol=args.switch_rtol,
+        window=args.switch_window,
+    )
+    if args.switch_rtol
+    else None
+)
+checkpoints = CheckpointManager(coarse.solver, coarse_dir, keep=1)
+logger.info(f"Running at {args.coarse} up to t = {args.switch_time}")
+coarse.evolve(logger, steady_state=steady_state, checkpoints=checkpoints)
+switch = comm.bcast(
+    checkpoints.write(coarse.solver, coarse.cfl.compute_timestep()), root=0
+)
+del coarse, checkpoints
+
+# Full-resolution run, continued from the padded coarse state.
+fine = builder_class(params).build(
+    logger=logger,
+    output_dir=args.output_dir,
+    checkpoint=switch,
+    matrix_cache=args.matrix_cache,
+)
+logger.info(f"Continuing from {switch} at t = {fine.solver.sim_time}")
+fine.evolve(logger, checkpoints=CheckpointManager(fine.solver, args.output_dir))
@@ -0,0 +1,108 @@
+"""
+Run several configurations of a spin-up problem, one after another, in one process.
+
+The distributor and bases are created once (see `gains.problems.spin_up`), so each
+configuration only pays for building its solver. Only parameters that do not change
+the bases (e.g. Delta_Omega, Ek, B) can be swept. Each run gets its own directory
+under --ensemble_dir, and is registered in the run catalog.
+
+Example, on 4 ranks:
+
+    mpiexec -n 4 python scripts/ensemble.py two_fluid_sphere --defaults spherical_shell
+        --grid Delta_Omega=1e-3,2e-3,4e-3
+"""
+
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+
+from mpi4py import MPI
+
+from gains.problems.spin_up import BUILDERS
+from gains.utils.catalog import CATALOG_FILE, RunCatalog
+from gains.utils.sweep import (
+    PARAMETER_FILE,
+    expand_grid,
+    load_base_params,
+    parse_grid_axis,
+)
+
+parser = argparse.ArgumentParser(
+    description="Run several configurations of a spin-up problem in one process."
+)
+
+parser.add_argument("problem", choices=sorted(BUILDERS), help="Problem to run.")
+parser.add_argument(
+    "--defaults",
+    type=str,
+    default=None,
+    help="Parameters overriding the defaults of the problem: a module of"
+    " gains.params (e.g. spherical_shell) or a JSON parameter file.",
+)
+parser.add_argument(
+    "--grid",
+    type=parse_grid_axis,
+    action="append",
+    default=[],
+    help="Values of a swept parameter, as NAME=VALUE,VALUE,... Repeat for each"
+    " parameter; every combination is run.",
+)
+parser.add_argument(
+    "--ensemble_dir",
+    type=Path,
+    default=Path("outputs") / "ensemble",
+    help="Directory under which each run gets its own output directory.",
+)
+parser.add_argument(
+    "--matrix_cache",
+    type=Path,
+    default=None,
+    help="Directory caching the assembled solver matrices between runs.",
+)
+parser.add_argument(
+    "--catalog",
+    type=Path,
+    default=Path("outputs") / CATALOG_FILE,
+    help="SQLite catalog the runs are registered in.",
+)
+
+args = parser.parse_args()
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+logger = logging.getLogger(__name__)
+rank = MPI.COMM_WORLD.rank
+
+builder = BUILDERS[args.problem](
+    load_base_params(args.defaults) if args.defaults else None
+)
+catalog = RunCatalog(args.catalog) if rank == 0 else None
+
+for i, overrides in enumerate(expand_grid(dict(args.grid))):
+    run_dir = args.ensemble_dir / f"run_{i}"
+    params = {**builder.params, **overrides}
+    if rank == 0:
+        run_dir.mkdir(parents=True, exist_ok=True)
+        with (run_dir / PARAMETER_FILE).open("w") as f:
+            json.dump(params, f, indent=2)
+        catalog.register(run_dir, params, sim_name=builder.sim_name, script=__file__)
+    logger.info(f"Running {run_dir}: {overrides}")
+
+    start = time.monotonic()
+    run = builder.build(
+        overrides, logger=logger, output_dir=run_dir, matrix_cache=args.matrix_cache
+    )
+    status = "failed"
+    try:
+        run.evolve(logger)
+        status = "completed"
+    finally:
+        if rank == 0:
+            catalog.update(
+                run_dir,
+                status,
+                sim_time=run.solver.sim_time,
+                iteration=run.solver.iteration,
+                elapsed=time.monotonic() - start,
+            )
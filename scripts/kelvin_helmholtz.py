@@ -14,6 +14,7 @@ McNally et al 2012, ApJ, 201, 18
 import argparse
 import datetime
 import logging
+from pathlib import Path
 
 import dedalus.public as d3
 import numpy as np
@@ -21,6 +22,10 @@ from mpi4py import MPI
 
 from gains.exceptions import MeshError
 from gains.initial_conditions.mcnally import density, velocity_x
+from gains.utils.kh_diagnostics import DIAGNOSTICS_HANDLER, add_growth_diagnostics
+from gains.utils.loggers import main_loop
+from gains.utils.profile import MemoryTracker, PhaseTimer
+from gains.utils.telemetry import LoadBalanceMonitor
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(format="%(message)s", level=logging.INFO)
@@ -50,6 +55,15 @@ parser.add_argument(
     help="Gap in simulated time between snapshots",
 )
 
+parser.add_argument(
+    "--diagnostics_dt",
+    type=float,
+    default=1e-3,
+    help="Gap in simulated time between writes of the growth diagnostics (mode"
+    " amplitude, mixing-layer width and kinetic energies). These are a few numbers"
+    " per write, so snapshots can be much rarer.",
+)
+
 parser.add_argument(
     "--logger_dt",
     type=int,
@@ -64,6 +78,35 @@ parser.add_argument(
     help="Name of the output files.",
 )
 
+parser.add_argument(
+    "--output_dir",
+    type=Path,
+    default=None,
+    help="Directory to store simulation outputs. Defaults to outputs/<name>.",
+)
+
+parser.add_argument(
+    "--stop_iteration",
+    type=int,
+    default=None,
+    help="Iteration to stop at, if reached before the stop time. Disabled if not"
+    " given.",
+)
+
+parser.add_argument(
+    "--load_balance_cadence",
+    type=int,
+    default=None,
+    help="Iterations between per-rank load-imbalance summaries. Disabled if not given.",
+)
+
+parser.add_argument(
+    "--profile_memory",
+    action="store_true",
+    help="Record the current and peak memory of each rank at each phase of the run"
+    " and write a summary.",
+)
+
 args = vars(parser.parse_args())
 
 if args["name"] is None:
@@ -88,14 +131,24 @@ PARAMS = {
     "L": 0.025,
     "U_1": 0.5,
     "U_2": -0.5,
+    # Wavenumber of the seeded perturbation
+    "k": 4 * np.pi,
     "nu": args["viscosity"],
     "snap_dt": args["snapshots_dt"],
+    "diagnostics_dt": args["diagnostics_dt"],
     "log_dt": args["logger_dt"],
     "name": args["name"]
     if args["name"] is not None
     else "kelvin_helmholtz_"
     + datetime.datetime.now().astimezone().strftime("%Y-%m-%m-%H:%M"),
 }
+output_dir = (
+    args["output_dir"]
+    if args["output_dir"] is not None
+    else Path("outputs") / PARAMS["name"]
+)
+memory = MemoryTracker(output_dir, logger, enabled=args["profile_memory"])
+timers = PhaseTimer(output_dir, logger)
 
 ncpu = MPI.COMM_WORLD.size
 log2 = np.log2(ncpu)
@@ -115,14 +168,22 @@ PARAMS["U_m"] = U_m
 
 # Bases
 
-coords = d3.CartesianCoordinates("x", "y")
-dist = d3.Distributor(coords, dtype=dtype, mesh=mesh)
-xbasis = d3.RealFourier(
-    coords["x"], size=PARAMS["Nx"], bounds=(0, PARAMS["Lx"]), dealias=PARAMS["dealias"]
-)
-ybasis = d3.RealFourier(
-    coords["y"], size=PARAMS["Ny"], bounds=(0, PARAMS["Ly"]), dealias=PARAMS["dealias"]
-)
+with timers.phase("bases"):
+    coords = d3.CartesianCoordinates("x", "y")
+    dist = d3.Distributor(coords, dtype=dtype, mesh=mesh)
+    xbasis = d3.RealFourier(
+        coords["x"],
+        size=PARAMS["Nx"],
+        bounds=(0, PARAMS["Lx"]),
+        dealias=PARAMS["dealias"],
+    )
+    ybasis = d3.RealFourier(
+        coords["y"],
+        size=PARAMS["Ny"],
+        bounds=(0, PARAMS["Ly"]),
+        dealias=PARAMS["dealias"],
+    )
+memory.mark("bases")
 
 
 # Fields
@@ -138,6 +199,7 @@ x, y = dist.local_grids(xbasis, ybasis)
 ex, ey = coords.unit_vector_fields(dist)
 x = x.squeeze()
 y = y.squeeze()
+memory.mark("fields")
 # Problem
 problem = d3.IVP([u, rho, p, tau_p], namespace=locals())
 problem.add_equation("div(u) + tau_p = 0")
@@ -146,37 +208,57 @@ problem.add_equation("dt(u) + grad(p) = (PARAMS['nu']/rho)*lap(u)- u@grad(u)")
 problem.add_equation("integ(p) = 0")
 
 # Solver
-solver = problem.build_solver(PARAMS["timestepper"])
+with timers.phase("build_solver"):
+    solver = problem.build_solver(PARAMS["timestepper"])
+memory.mark("build_solver")
 solver.stop_sim_time = PARAMS["stop_sim_time"]
+if args["stop_iteration"] is not None:
+    solver.stop_iteration = args["stop_iteration"]
 
 # Initial conditions - see McNally et al., 2012, ApJ, 201, 18 for more details
 
-# density
-
-rho_y = density(xs=x, ys=y, **PARAMS)
+with timers.phase("initial_state"):
+    # density
 
-rho["g"] = rho_y
+    rho_y = density(xs=x, ys=y, **PARAMS)
 
-# x velocity
+    rho["g"] = rho_y
 
-v_xs = velocity_x(xs=x, ys=y, **PARAMS)
+    # x velocity
 
-u["g"][0] = v_xs
+    v_xs = velocity_x(xs=x, ys=y, **PARAMS)
 
-# y velocity perturbations
+    u["g"][0] = v_xs
 
-vys = 0.01 * np.sin(4 * np.pi * x)
+    # y velocity perturbations
 
+    vys = 0.01 * np.sin(PARAMS["k"] * x)
 
-u["g"][1] += vys[:, None]
+    u["g"][1] += vys[:, None]
 
 # Analysis
-snapshots = solver.evaluator.add_file_handler(
-    "outputs/{}/snapshots".format(PARAMS["name"]),
-    sim_dt=PARAMS["snap_dt"],
-    max_writes=10,
-)
-snapshots.add_task(rho, name="density")
+with timers.phase("outputs"):
+    snapshots = solver.evaluator.add_file_handler(
+        output_dir / "snapshots",
+        sim_dt=PARAMS["snap_dt"],
+        max_writes=10,
+    )
+    snapshots.add_task(rho, name="density")
+
+    diagnostics = solver.evaluator.add_file_handler(
+        output_dir / DIAGNOSTICS_HANDLER,
+        sim_dt=PARAMS["diagnostics_dt"],
+        max_writes=1000,
+    )
+    add_growth_diagnostics(
+        diagnostics,
+        u,
+        rho,
+        wavenumber=PARAMS["k"],
+        length=PARAMS["Lx"],
+        rho_1=PARAMS["rho_1"],
+        rho_2=PARAMS["rho_2"],
+    )
 
 # CFL
 CFL = d3.CFL(
@@ -191,5 +273,35 @@ CFL = d3.CFL(
 )
 CFL.add_velocity(u)
 
+# Per-rank timing of the main loop, to measure load imbalance
+telemetry = (
+    LoadBalanceMonitor(
+        output_dir,
+        logger,
+        cadence=args["load_balance_cadence"],
+        mesh=mesh,
+    )
+    if args["load_balance_cadence"]
+    else None
+)
+
+
+def log_progress(timestep: float) -> None:
+    """Log the iteration and time."""
+    logger.info(
+        f"Iteration={solver.iteration}, Time={solver.sim_time:e}, dt={timestep:e}"
+    )
+
+
 # Main loop
-solver.evolve(timestep_function=CFL.compute_timestep, log_cadence=PARAMS["log_dt"])
+with timers.phase("main_loop"):
+    main_loop(
+        logger,
+        solver,
+        CFL,
+        log_progress,
+        log_cadence=PARAMS["log_dt"],
+        telemetry=telemetry,
+        memory=memory,
+    )
+timers.report()
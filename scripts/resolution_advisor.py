@@ -0,0 +1,126 @@
+"""
+Recommend a resolution for a spin-up run, or check the resolution of a finished one.
+
+`recommend` derives the minimum Nphi, Ntheta and Nr from the Ekman number (and the
+radii of a shell), and compares them with the resolution of a parameter set if one is
+given:
+
+    python scripts/resolution_advisor.py recommend --defaults spherical_shell
+
+`check` reads a checkpoint written in coefficient space and reports, for each field
+and axis, how far the trailing coefficients have decayed:
+
+    python scripts/resolution_advisor.py check outputs/two_fluid_spin_up
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from gains.analysis.resolution import (
+    LAYER_POINTS,
+    TAIL_FRACTION,
+    TAIL_TOLERANCE,
+    check_resolution,
+    recommend_resolution,
+)
+from gains.utils.checkpoints import CHECKPOINT_DIR, latest_valid_checkpoint
+from gains.utils.sweep import load_base_params
+
+parser = argparse.ArgumentParser(
+    description="Recommend or check the spectral resolution of a spin-up run."
+)
+subparsers = parser.add_subparsers(dest="mode", required=True)
+
+recommend = subparsers.add_parser(
+    "recommend", help="Recommend a resolution from the boundary-layer scales."
+)
+recommend.add_argument(
+    "--defaults",
+    type=str,
+    default=None,
+    help="Parameters to take Ek, Ri, Ro and dealias from, and to compare with: a"
+    " module of gains.params (e.g. spherical_shell) or a JSON parameter file.",
+)
+recommend.add_argument("--Ek", type=float, default=None, help="Ekman number.")
+recommend.add_argument(
+    "--Ri", type=float, default=None, help="Inner radius of a shell."
+)
+recommend.add_argument("--Ro", type=float, default=None, help="Outer radius.")
+recommend.add_argument("--dealias", type=float, default=None, help="Dealiasing factor.")
+recommend.add_argument(
+    "--points",
+    type=int,
+    default=LAYER_POINTS,
+    help="Number of grid points required across each boundary layer.",
+)
+recommend.add_argument(
+    "--tol",
+    type=float,
+    default=TAIL_TOLERANCE,
+    help="Tolerance on the relative size of the neglected radial coefficients.",
+)
+
+check = subparsers.add_parser(
+    "check", help="Check the decay of the coefficients of a checkpoint."
+)
+check.add_argument(
+    "path",
+    type=Path,
+    help="Checkpoint file, or output directory of a run to take its newest valid"
+    " checkpoint from.",
+)
+check.add_argument(
+    "--tasks", type=str, nargs="+", default=None, help="Fields to check."
+)
+check.add_argument(
+    "--tol",
+    type=float,
+    default=TAIL_TOLERANCE,
+    help="Tolerance on the relative size of the tail of each spectrum.",
+)
+check.add_argument(
+    "--fraction",
+    type=float,
+    default=TAIL_FRACTION,
+    help="Fraction of the highest modes making up the tail.",
+)
+
+args = parser.parse_args()
+
+if args.mode == "recommend":
+    params = load_base_params(args.defaults) if args.defaults else {}
+    for name in ("Ek", "Ri", "Ro", "dealias"):
+        if getattr(args, name) is not None:
+            params[name] = getattr(args, name)
+    if "Ek" not in params:
+        parser.error("recommend needs --Ek or --defaults")
+
+    result = recommend_resolution(
+        params["Ek"],
+        ro=params.get("Ro", 1.0),
+        ri=params.get("Ri"),
+        dealias=params.get("dealias", 3 / 2),
+        points=args.points,
+        tol=args.tol,
+    )
+    print(json.dumps(result, indent=2))  # noqa: T201
+    for name in ("Nphi", "Ntheta", "Nr"):
+        if name in params and params[name] < result[name]:
+            print(  # noqa: T201
+                f"{name} = {params[name]} is below the recommended {result[name]}."
+            )
+else:
+    path = args.path
+    if path.is_dir():
+        path = latest_valid_checkpoint(path / CHECKPOINT_DIR)
+        if path is None:
+            sys.exit(f"No valid checkpoint in {args.path / CHECKPOINT_DIR}.")
+
+    tails = check_resolution(path, args.tasks, tol=args.tol, fraction=args.fraction)
+    print(f"{path}:")  # noqa: T201
+    for name, task_tails in tails.items():
+        verdict = "ok" if task_tails.pop("adequate") else "under-resolved"
+        axes = "  ".join(f"{axis} {tail:.1e}" for axis, tail in task_tails.items())
+        print(f"  {name:<12} {axes}  {verdict}")  # noqa: T201
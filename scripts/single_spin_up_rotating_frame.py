@@ -1,201 +1,23 @@
-"""Simulates the spin up of a full basis.sphere containing a viscous newtonian fluid."""
+"""
+Simulates the spin up of a full sphere containing a viscous newtonian fluid.
 
-import logging
-from pathlib import Path
+The problem is defined by `gains.problems.spin_up.SingleFluidSpinUp`.
+"""
 
-import dedalus.core as d3core
-import dedalus.public as d3
-import numpy as np
-from mpi4py import MPI
+import logging
 
-# Parameters - load in from parameter file
-from gains.initial_conditions.single_component_spin_up import mask_angular, mask_r
-from gains.params.single_spin_up_rotating import parameters as default_params
-from gains.problems.bases import SphericalBasis
-from gains.utils.misc import mesh_cpus
+from gains.problems.spin_up import SingleFluidSpinUp, run_spin_up
 from gains.utils.parsers import SimulationCLI
-from gains.utils.profile import profile
 
+# Setup
 logger = logging.getLogger(__name__)
-
 parser = SimulationCLI(
-    profiling_option=True, place_all_outputs_under="outputs", sim_name="single_spin_up"
+    profiling_option=True,
+    place_all_outputs_under="outputs",
+    sim_name=SingleFluidSpinUp.sim_name,
 )
-PARAMS = parser.parse_args_and_get_params(logger, default_params=default_params)
-
-# Additional Parameters - not likely to change between runs
-radius = 1
-timestepper = d3.SBDF2
-cfl_safety = 0.2
-max_timestep = 1e-2
-dtype = np.float64
-comm = MPI.COMM_WORLD
-ncpu = comm.size
-
-mesh = mesh_cpus(ncpu)
-coords = d3.SphericalCoordinates("phi", "theta", "r")
-dist = d3.Distributor(coords, dtype=dtype, mesh=mesh)
-basis = SphericalBasis(coords, dist, dtype, radius, **PARAMS)
-
-logger.info(f"running on processor mesh={mesh}")
-
-# Fields
-u_n = basis.dist.VectorField(basis.coords, name="u_n", bases=basis.ball)
-p_n = basis.dist.Field(name="p_n", bases=basis.ball)
-omega_n = basis.dist.VectorField(basis.coords, name="omega_n", bases=basis.ball)
-
-tau_p_n = basis.dist.Field(name="tau_p_n")
-tau_u_n = basis.dist.VectorField(basis.coords, name="tau_u_n", bases=basis.sphere)
-tau_omega_n = basis.dist.VectorField(
-    basis.coords, name="tau_omega_n", bases=basis.sphere
+PARAMS = parser.parse_args_and_get_params(
+    logger, default_params=SingleFluidSpinUp.default_params
 )
 
-# Substitutions
-phi, theta, r = basis.dist.local_grids(basis.ball)
-
-r_vec = basis.dist.VectorField(basis.coords, bases=basis.ball)
-r_vec["g"][2] = r
-r_vec["g"][1] = theta
-r_vec["g"][0] = phi
-er = basis.dist.VectorField(basis.coords)
-etheta = basis.dist.VectorField(basis.coords)
-ephi = basis.dist.VectorField(basis.coords)
-er["g"][2] = 1
-etheta["g"][1] = 1
-ephi["g"][0] = 1
-
-
-ez = basis.dist.VectorField(basis.coords, bases=basis.ball)
-ez["g"][1] = -np.sin(theta)
-ez["g"][2] = np.cos(theta)  # unit vector in z direction
-
-
-# This field is for the Boundary Conditions
-sintheta = basis.dist.Field(name="sintheta", bases=basis.ball)
-mask_equator = basis.dist.Field(name="mask_equator", bases=basis.ball)
-mask_radial = basis.dist.Field(name="mask_radial", bases=basis.ball)
-
-sintheta["g"] = np.sin(theta)
-mask_equator["g"] = mask_angular(theta, 0.3, 2.0)
-mask_radial["g"] = mask_r(r, PARAMS["Nr"])
-u_n_target = basis.dist.VectorField(coords, name="u_n_target", bases=basis.ball)
-u_n_target["g"][0] = PARAMS["Delta_Omega"] * r * np.sin(theta)
-
-strain_rate = d3.grad(u_n) + d3.trans(d3.grad(u_n))
-shear_stress = d3.angular(d3.radial(strain_rate(r=1), index=1))
-
-uang_r1 = basis.dist.VectorField(basis.coords, bases=basis.ball)(r=radius).evaluate()
-
-uang_r1["g"][0, :] = (PARAMS["Delta_Omega"] * sintheta)(r=radius).evaluate()["g"]
-
-
-def lift(a: d3.Field) -> d3.Field:
-    """Lift operand to derivative basis."""
-    return d3.Lift(a, basis.ball, -1)
-
-
-dot = d3.DotProduct
-curl = d3.Curl
-cross = d3.CrossProduct
-
-Ek = PARAMS["Ek"]  # Seperately defined for use in equations
-
-problem = d3.IVP([p_n, u_n, tau_p_n, tau_u_n], namespace=locals())
-problem.add_equation("div(u_n) + tau_p_n = 0")
-problem.add_equation(
-    "dt(u_n) + grad(p_n) - Ek*lap(u_n) + lift(tau_u_n)  = -u_n@grad(u_n) "
-    "-2*cross(ez,u_n) "
-    "+100*(mask_equator*mask_radial*(u_n_target - u_n))"  # Boundary forcing
-)
-
-problem.add_equation("radial(u_n(r=radius)) = 0")  # impenetrable bc
-problem.add_equation("integ(p_n) = 0")  # Pressure gauge normal fluid
-problem.add_equation("shear_stress = 0")
-
-# Solver
-solver = problem.build_solver(timestepper)
-solver.stop_sim_time = PARAMS["stop_sim_time"]
-
-if PARAMS["use_checkpoint"]:
-    write, timestep = solver.load_state(PARAMS["checkpoint_path"])
-    # Shouldn't the initial condition be solid body rotation?
-else:
-    # Initial condition
-    u_n.fill_random("g", seed=42, distribution="normal", scale=1e-10)  # Random noise
-    u_n.low_pass_filter(scales=0.5)
-    timestep = max_timestep
-# Analysis
-
-volume = (4 / 3) * np.pi * radius**3
-
-
-def az_avg(a: d3.Field) -> d3.Field:
-    """Average over the phi coordinate."""
-    return d3.Average(a, basis.coords.coords[0])
-
-
-def s2_avg(a: d3.Field) -> d3.Field:
-    """Average over all angular coordinates."""
-    return d3.Average(a, basis.coords.S2basis.coordsys)
-
-
-def vol_avg(a: d3.Field) -> d3.Field:
-    """Average over whole basis.sphere."""
-    return d3.Integrate(a / volume, basis.coords)
-
-
-# define every component of velocity (for output)
-u_n_r = dot(u_n, er)
-u_n_theta = dot(u_n, etheta)
-u_n_phi = dot(u_n, ephi)
-
-save_path: Path = PARAMS["output_dir"] / "su_equator"
-save_path.mkdir(parents=True, exist_ok=True)
-
-AZ_avg = solver.evaluator.add_file_handler(
-    str(save_path / "AZ_avg_equator"),
-    sim_dt=0.05,
-    max_writes=100,
-)
-AZ_avg.add_task(dot(er, u_n), name="u_n_r")
-AZ_avg.add_task(dot(etheta, u_n), name="u_n_theta")
-AZ_avg.add_task(az_avg(u_n_phi), name="u_n_phi")
-
-
-slices = solver.evaluator.add_file_handler(
-    str(save_path / "slices"),
-    sim_dt=0.025,
-    max_writes=100,
-)
-
-slices.add_task(
-    u_n_phi(theta=np.pi / 2), scales=PARAMS["dealias"], name="u_n_phi(equator)"
-)
-
-# Checkpoint
-checkpoint = solver.evaluator.add_file_handler(
-    str(save_path / "checkpoint"),
-    sim_dt=50,
-    max_writes=1,
-    parallel="gather",
-)
-checkpoint.add_tasks(solver.state, layout="g")
-
-# CFL
-CFL = d3.CFL(
-    solver, timestep, cadence=1, safety=0.3, threshold=0.1, max_dt=max_timestep
-)
-CFL.add_velocity(u_n)
-
-# Flow properties
-flow = d3.GlobalFlowProperty(solver, cadence=10)
-flow.add_property(np.sqrt(u_n @ u_n) * PARAMS["Ek"], name="Re_n")
-
-
-@profile(dirname=PARAMS["profile"], run_output_dir=PARAMS["output_dir"])
-def evolve(solver: d3core.solvers.InitialValueSolver) -> None:
-    """Call solver.evolve, but decorate with the profiling function."""
-    return solver.evolve(timestep_function=CFL.compute_timestep, log_cadence=10)
-
-
-evolve(solver)
+run_spin_up(SingleFluidSpinUp, PARAMS, logger)
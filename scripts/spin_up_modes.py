@@ -0,0 +1,144 @@
+"""
+Find the least-damped axisymmetric modes of a spin-up problem, and their decay rates.
+
+The problem is linearised about corotation (see `gains.utils.linear`) and built with a
+single azimuthal mode and no change in rotation, by the same `gains.problems.spin_up`
+builder as the time-dependent runs, so it shares their bases and boundary
+conditions. Its least-damped modes are found by an Arnoldi iteration on its
+evolution over --period (see `gains.utils.eigenmodes.least_damped_modes`). The decay
+rate, frequency and residual of each mode are logged and written to --output as
+JSON, with the decay rates also in units of sqrt(Ek), the scale of the Ekman
+spin-up.
+
+Example, on 4 ranks:
+
+    mpiexec -n 4 python scripts/spin_up_modes.py two_fluid_sphere
+        --resolution 1,64,64 --n_modes 8
+"""
+
+import argparse
+import json
+import logging
+from pathlib import Path
+
+import dedalus.public as d3
+import numpy as np
+from mpi4py import MPI
+
+from gains.problems.spin_up import BUILDERS
+from gains.utils.eigenmodes import MODE_PERIOD, LinearPropagator, least_damped_modes
+from gains.utils.linear import LINEAR_TIMESTEP
+from gains.utils.sweep import load_base_params, parse_resolution
+
+parser = argparse.ArgumentParser(
+    description="Find the least-damped axisymmetric modes of a spin-up problem."
+)
+
+parser.add_argument(
+    "problem",
+    choices=sorted(BUILDERS),
+    nargs="?",
+    default="single_fluid",
+    help="Problem to analyse.",
+)
+parser.add_argument(
+    "--defaults",
+    type=str,
+    default=None,
+    help="Parameters overriding the defaults of the problem: a module of"
+    " gains.params (e.g. spherical_shell) or a JSON parameter file.",
+)
+parser.add_argument(
+    "--resolution",
+    type=parse_resolution,
+    default=parse_resolution("1,32,32"),
+    help="Resolution, as NPHI,NTHETA,NR. NPHI=1 restricts to axisymmetric modes.",
+)
+parser.add_argument(
+    "--period",
+    type=float,
+    default=MODE_PERIOD,
+    help="Time the problem is evolved by between Krylov vectors. Frequencies are"
+    " only resolved up to pi / period.",
+)
+parser.add_argument(
+    "--timestep",
+    type=float,
+    default=LINEAR_TIMESTEP,
+    help="Largest timestep of the evolution.",
+)
+parser.add_argument("--n_modes", type=int, default=6, help="Number of modes to report.")
+parser.add_argument(
+    "--n_krylov",
+    type=int,
+    default=40,
+    help="Largest dimension of the Krylov space, i.e. number of evolutions.",
+)
+parser.add_argument(
+    "--output",
+    type=Path,
+    default=Path("outputs") / "spin_up_modes.json",
+    help="JSON file the modes are written to.",
+)
+parser.add_argument(
+    "--matrix_cache",
+    type=Path,
+    default=None,
+    help="Directory caching the assembled solver matrices between runs.",
+)
+
+args = parser.parse_args()
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+logger = logging.getLogger(__name__)
+comm = MPI.COMM_WORLD
+
+params = load_base_params(args.defaults) if args.defaults else {}
+builder_class = BUILDERS[args.problem]
+builder = builder_class({**params, **args.resolution, "dealias": 1})
+run = builder.build(
+    {"linear": True, "Delta_Omega": 0.0, "stop_sim_time": np.inf},
+    logger=logger,
+    matrix_cache=args.matrix_cache,
+    timestepper=d3.RK222,
+)
+propagator = LinearPropagator(
+    run, builder_class.velocities, args.period, args.timestep, logger=logger
+)
+start = np.random.default_rng(42 + comm.rank).standard_normal(propagator.size)
+logger.info(
+    f"Arnoldi iteration over {args.n_krylov} evolutions of {propagator.steps} steps"
+)
+modes, _ = least_damped_modes(
+    propagator,
+    start,
+    args.period,
+    n_modes=args.n_modes,
+    n_krylov=args.n_krylov,
+    comm=comm,
+)
+
+ek = builder.params["Ek"]
+for mode in modes:
+    mode["decay_rate_sqrt_ek"] = mode["decay_rate"] / np.sqrt(ek)
+if comm.rank == 0:
+    for mode in modes:
+        logger.info(
+            f"Decay rate {mode['decay_rate']:.6e} ({mode['decay_rate_sqrt_ek']:.4f}"
+            f" sqrt(Ek)), frequency {mode['frequency']:+.6f},"
+            f" residual {mode['residual']:.1e}"
+        )
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with args.output.open("w") as f:
+        json.dump(
+            {
+                "problem": args.problem,
+                "resolution": args.resolution,
+                "Ek": ek,
+                "period": args.period,
+                "n_krylov": args.n_krylov,
+                "modes": modes,
+            },
+            f,
+            indent=2,
+        )
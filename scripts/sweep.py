@@ -0,0 +1,109 @@
+"""
+Run a simulation script over a sweep of parameters on the cores of one machine.
+
+Each run is given the default parameters with its own overrides applied, through a
+parameter file written into its output directory, and launched as a local `mpiexec`
+subprocess. This works on a workstation as well as inside a single batch allocation.
+Arguments not recognised here (e.g. `--wall_time 3600`) are passed on to every run.
+
+Example, sweeping Ek and B with 4 ranks per run on 16 cores:
+
+    python scripts/sweep.py scripts/two_fluid_spin_up.py --defaults spherical_shell
+        --grid Ek=1e-3,1e-4 --grid B=0.1,0.01 --ranks_per_run 4 --cores 16
+"""
+
+import argparse
+import json
+import logging
+from pathlib import Path
+
+from gains.utils.sweep import Sweep, expand_grid, load_base_params, parse_grid_axis
+
+parser = argparse.ArgumentParser(
+    description="Run a simulation script over a sweep of parameters, locally."
+)
+
+parser.add_argument("script", type=Path, help="Simulation script to run.")
+parser.add_argument(
+    "--defaults",
+    type=str,
+    required=True,
+    help="Parameters the overrides are applied to: a module of gains.params (e.g."
+    " spherical_shell) or a JSON parameter file.",
+)
+parser.add_argument(
+    "--grid",
+    type=parse_grid_axis,
+    action="append",
+    default=[],
+    help="Values of a swept parameter, as NAME=VALUE,VALUE,... Repeat for each"
+    " parameter; every combination is run.",
+)
+parser.add_argument(
+    "--runs",
+    type=Path,
+    default=None,
+    help="JSON file holding a list of parameter overrides, one per run. Combined with"
+    " every point of --grid, if both are given.",
+)
+parser.add_argument(
+    "--sweep_dir",
+    type=Path,
+    default=Path("outputs") / "sweep",
+    help="Directory under which each run gets its own output directory.",
+)
+parser.add_argument(
+    "--ranks_per_run", type=int, default=1, help="Number of MPI ranks of each run."
+)
+parser.add_argument(
+    "--cores",
+    type=int,
+    default=None,
+    help="Number of cores to pack the runs onto. Defaults to all cores.",
+)
+parser.add_argument(
+    "--max_concurrent",
+    type=int,
+    default=None,
+    help="Maximum number of runs at once.",
+)
+parser.add_argument(
+    "--retries",
+    type=int,
+    default=0,
+    help="Number of times a failed or interrupted run is relaunched.",
+)
+parser.add_argument(
+    "--mpiexec",
+    type=str,
+    default="mpiexec",
+    help="MPI launcher, called as <mpiexec> -n <ranks_per_run>.",
+)
+
+args, script_args = parser.parse_known_args()
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+logger = logging.getLogger(__name__)
+
+runs = [{}]
+if args.runs is not None:
+    with args.runs.open() as f:
+        runs = json.load(f)
+overrides = [{**run, **point} for run in runs for point in expand_grid(dict(args.grid))]
+
+sweep = Sweep(
+    args.script,
+    load_base_params(args.defaults),
+    overrides,
+    args.sweep_dir,
+    logger,
+    ranks_per_run=args.ranks_per_run,
+    cores=args.cores,
+    max_concurrent=args.max_concurrent,
+    retries=args.retries,
+    script_args=script_args,
+    launcher=(args.mpiexec, "-n", "{ranks}"),
+)
+sweep.run()
+
+print(sweep.format_summary())  # noqa: T201
@@ -2,206 +2,24 @@
 Solve the HVBK equations for a spherical star subject to a boundary spin up.
 
 Equations and mutual friction are in the same form as
-J. R. Fuentes and Vanessa Graber 2024 ApJ 974 300.
+J. R. Fuentes and Vanessa Graber 2024 ApJ 974 300. The problem is defined by
+`gains.problems.spin_up.TwoFluidSphereSpinUp`.
 """
 
 import logging
-from pathlib import Path
 
-import dedalus.public as d3
-import numpy as np
-from dedalus.public import CrossProduct as Cross
-from dedalus.public import Curl
-from dedalus.public import DotProduct as Dot
-from mpi4py import MPI
-
-from gains.params.single_spin_up_rotating import parameters as default_params
-from gains.problems.bases import SphericalBasis
-from gains.utils.loggers import track_vorticity
-from gains.utils.misc import mesh_cpus
+from gains.problems.spin_up import TwoFluidSphereSpinUp, run_spin_up
 from gains.utils.parsers import SimulationCLI
-from gains.utils.profile import profile
 
 # Setup
 logger = logging.getLogger(__name__)
 parser = SimulationCLI(
     profiling_option=True,
     place_all_outputs_under="outputs",
-    sim_name="two_fluid_spin_up",
-)
-PARAMS = parser.parse_args_and_get_params(logger, default_params=default_params)
-
-radius = 1
-timestepper = d3.SBDF2
-cfl_safety = 0.2
-max_timestep = 1e-2
-dtype = np.float64
-ncpu = MPI.COMM_WORLD.size
-
-Ek = PARAMS["Ek"]
-B = PARAMS["B"]
-Bprime = B / 2
-
-mesh = mesh_cpus(ncpu)
-
-logger.info(f"running on processor mesh={mesh}")
-
-# Basis
-coords = d3.SphericalCoordinates("phi", "theta", "r")
-dist = d3.Distributor(coords, dtype=dtype, mesh=mesh)
-basis = SphericalBasis(coords, dist, dtype, radius, **PARAMS)
-
-# Fields
-u_n = basis.dist.VectorField(basis.coords, name="u_n", bases=basis.ball)
-u_s = basis.dist.VectorField(basis.coords, name="u_s", bases=basis.ball)
-p_n = basis.dist.Field(name="p_n", bases=basis.ball)
-p_s = basis.dist.Field(name="p_s", bases=basis.ball)
-
-tau_p_n = basis.dist.Field(name="tau_p_n")
-tau_p_s = basis.dist.Field(name="tau_p_s")
-tau_u_n = basis.dist.VectorField(basis.coords, name="tau_u_n", bases=basis.sphere)
-tau_u_s = basis.dist.VectorField(basis.coords, name="tau_u_s", bases=basis.sphere)
-
-# Substitutions
-lift = lambda a: d3.Lift(a, basis.ball, -1)
-
-x_s = 0.95  # Neutron fraction
-x_n = 0.05  # Proton/electron fraction
-
-phi, theta, r = basis.dist.local_grids(basis.ball)
-er = basis.dist.VectorField(basis.coords)
-etheta = basis.dist.VectorField(basis.coords)
-ephi = basis.dist.VectorField(basis.coords)
-
-er["g"][2] = 1
-etheta["g"][1] = 1
-ephi["g"][0] = 1
-
-ez = basis.dist.VectorField(basis.coords, bases=basis.ball)
-ez["g"][1] = -np.sin(theta)
-ez["g"][2] = np.cos(theta)  # unit vector in z direction
-u_ns = u_n - u_s
-omega_s = Curl(u_s) + 2 * ez
-omega_unit = omega_s / (np.sqrt(Dot(omega_s, omega_s)) + 1e-14)
-F_mf = B * (Cross(omega_unit, Cross(omega_s, u_ns))) + Bprime * Cross(omega_s, u_ns)
-
-sintheta = basis.dist.Field(name="sintheta", bases=basis.ball)
-sintheta["g"] = np.sin(theta)
-uang = basis.dist.VectorField(basis.coords, bases=basis.ball)(r=radius).evaluate()
-uang["g"][0, :] = (PARAMS["Delta_Omega"] * sintheta)(r=radius).evaluate()["g"]
-strain_rate = d3.grad(u_s) + d3.trans(d3.grad(u_s))
-shear_stress = d3.angular(d3.radial(strain_rate(r=1), index=1))
-# problem - HVBK equations spin up in basis.sphere
-problem = d3.IVP(
-    [u_n, u_s, p_n, p_s, tau_p_n, tau_p_s, tau_u_n, tau_u_s], namespace=locals()
-)
-
-problem.add_equation("div(u_n) + tau_p_n = 0")
-problem.add_equation("div(u_s) + tau_p_s = 0")
-problem.add_equation("integ(p_n) = 0")
-problem.add_equation("integ(p_s) = 0")
-
-problem.add_equation(
-    "dt(u_n) - Ek*lap(u_n) + grad(p_n) + lift(tau_u_n)= -u_n@grad(u_n) + x_s/x_n * F_mf"
-    "- 2*cross(ez,u_n)"
-)
-problem.add_equation(
-    "dt(u_s) + grad(p_s) + lift(tau_u_s) = -u_s@grad(u_s) - F_mf - 2*cross(ez, u_s)"
-)
-
-problem.add_equation("radial(u_n(r=radius)) = 0")
-problem.add_equation("radial(u_s(r=radius)) = 0")
-problem.add_equation("angular(u_n(r=radius)) = angular(uang)")
-problem.add_equation("shear_stress = 0")
-
-solver = problem.build_solver(timestepper)
-solver.stop_sim_time = PARAMS["stop_sim_time"]
-
-if PARAMS["use_checkpoint"]:
-    write, timestep = solver.load_state(PARAMS["checkpoint_path"])
-else:
-    # Initial condition
-    u_n.fill_random("g", seed=42, distribution="normal", scale=1e-10)  # Random noise
-    u_n.low_pass_filter(scales=0.5)
-    u_s.fill_random("g", seed=42, distribution="normal", scale=1e-10)
-    u_s.low_pass_filter(scales=0.5)
-    timestep = max_timestep
-
-# Analysis
-volume = (4 / 3) * np.pi * radius**3
-
-
-def az_avg(a: d3.Field) -> d3.Field:
-    """Average over the phi coordinate."""
-    return d3.Average(a, basis.coords.coords[0])
-
-
-def s2_avg(a: d3.Field) -> d3.Field:
-    """Average over all angular coordinates."""
-    return d3.Average(a, basis.coords.S2basis.coordsys)
-
-
-def vol_avg(a: d3.Field) -> d3.Field:
-    """Average over whole basis.sphere."""
-    return d3.Integrate(a / volume, basis.coords)
-
-
-# define every component of velocity (for output)
-u_n_r = Dot(u_n, er)
-u_n_theta = Dot(u_n, etheta)
-u_n_phi = Dot(u_n, ephi)
-
-save_path: Path = PARAMS["output_dir"] / "su_equator"
-save_path.mkdir(parents=True, exist_ok=True)
-
-AZ_avg = solver.evaluator.add_file_handler(
-    str(save_path / "AZ_avg_equator"),
-    sim_dt=0.05,
-    max_writes=100,
+    sim_name=TwoFluidSphereSpinUp.sim_name,
 )
-AZ_avg.add_task(Dot(er, u_n), name="u_n_r")
-AZ_avg.add_task(Dot(etheta, u_n), name="u_n_theta")
-AZ_avg.add_task(az_avg(u_n_phi), name="u_n_phi")
-AZ_avg.add_task(az_avg(Dot(ephi, u_s)), name="u_s_phi")
-
-slices = solver.evaluator.add_file_handler(
-    str(save_path / "slices"),
-    sim_dt=0.025,
-    max_writes=100,
+PARAMS = parser.parse_args_and_get_params(
+    logger, default_params=TwoFluidSphereSpinUp.default_params
 )
 
-slices.add_task(
-    u_n_phi(theta=np.pi / 2), scales=PARAMS["dealias"], name="u_n_phi(equator)"
-)
-
-# Checkpoint
-checkpoint = solver.evaluator.add_file_handler(
-    "outputs/su_equator/checkpoint",
-    wall_dt=3600,
-    max_writes=1,
-    parallel="gather",
-)
-checkpoint.add_tasks(solver.state, layout="g")
-
-# CFL
-CFL = d3.CFL(
-    solver, timestep, cadence=1, safety=0.3, threshold=0.1, max_dt=max_timestep
-)
-CFL.add_velocity(u_n)
-CFL.add_velocity(u_s)
-
-
-# Flow properties
-flow = d3.GlobalFlowProperty(solver, cadence=10)
-flow.add_property(np.sqrt(u_n @ u_n) * PARAMS["Ek"], name="Re_n")
-flow.add_property(np.sqrt(omega_s @ omega_s), name="vorticity_mag")
-
-
-# Main loop
-@profile(PARAMS["profile"], PARAMS["output_dir"])
-def main_loop() -> None:
-    """Decorate main loop."""
-    return track_vorticity(logger, flow, solver, CFL)
-
-
-main_loop()
+run_spin_up(TwoFluidSphereSpinUp, PARAMS, logger)
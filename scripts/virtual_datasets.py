@@ -0,0 +1,59 @@
+"""
+View the output sets of each file handler of a run as a single HDF5 file.
+
+For every file handler under the output directory, writes `<handler>.h5` next to its
+directory, mapping the writes of all its sets onto one time axis without copying
+any data (see `gains.utils.virtual_dataset`). Checkpoints are left out. With
+--watch, the files are updated periodically as the run writes new sets, until the
+run records how it stopped (see `gains.utils.walltime`).
+
+Example, while a run is going:
+
+    python scripts/virtual_datasets.py outputs/single_spin_up --watch 60
+"""
+
+import argparse
+import logging
+import time
+from pathlib import Path
+
+from gains.utils.checkpoints import CHECKPOINT_DIR
+from gains.utils.virtual_dataset import find_handlers, update_virtual_dataset
+from gains.utils.walltime import read_run_state
+
+parser = argparse.ArgumentParser(
+    description="View the output sets of each file handler of a run as one file."
+)
+
+parser.add_argument("output_dir", type=Path, help="Output directory of the run.")
+parser.add_argument(
+    "--watch",
+    type=float,
+    default=None,
+    help="Seconds between updates while the run is going. Updates once if not given.",
+)
+parser.add_argument(
+    "--rebuild",
+    action="store_true",
+    help="Count the writes of every set again, rather than trusting those recorded"
+    " in the existing files.",
+)
+
+args = parser.parse_args()
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+logger = logging.getLogger(__name__)
+
+# The run state is only written once the run stops, replacing any earlier record
+initial_state = read_run_state(args.output_dir)
+rebuild = args.rebuild
+while True:
+    # Read before updating, so that the sets written last are included
+    state = read_run_state(args.output_dir)
+    for handler_dir in find_handlers(args.output_dir, exclude=(CHECKPOINT_DIR,)):
+        if update_virtual_dataset(handler_dir, rebuild=rebuild):
+            logger.info(f"Updated the virtual file of {handler_dir}")
+    rebuild = False
+    if args.watch is None or state not in (None, initial_state):
+        break
+    time.sleep(args.watch)
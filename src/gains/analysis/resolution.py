@@ -0,0 +1,240 @@
+"""
+Choose and check spectral resolutions from the boundary layers of spin-up flows.
+
+Spin-up is controlled by the Ekman layers on the boundaries, of thickness Ek^(1/2)
+in units of the outer radius. Near the equator the Ekman scaling breaks down over a
+band of latitudes of width Ek^(1/5), and in a shell Stewartson layers of width
+Ek^(1/4) form on the cylinder tangent to the inner boundary. The radial resolution
+must place enough grid points inside the Ekman layer, and have enough modes for the
+Chebyshev/Zernike coefficients of an Ekman profile to decay below a tolerance; the
+angular resolution must resolve the equatorial and Stewartson layers.
+"""
+
+import math
+from pathlib import Path
+from typing import Any
+
+import h5py
+import numpy as np
+from numpy.polynomial import chebyshev
+
+from gains.exceptions import CoefficientLayoutError
+
+# Default number of grid points required across a boundary layer.
+LAYER_POINTS = 5
+# Default tolerance on the relative size of the trailing spectral coefficients.
+TAIL_TOLERANCE = 1e-6
+# Fraction of the highest modes making up the tail of a spectrum.
+TAIL_FRACTION = 0.1
+
+
+def ekman_thickness(ek: float) -> float:
+    """Thickness of the Ekman layers, Ek^(1/2)."""
+    return math.sqrt(ek)
+
+
+def equatorial_width(ek: float) -> float:
+    """Latitudinal half-width, in radians, of the equatorial Ekman region, Ek^(1/5)."""
+    return ek**0.2
+
+
+def stewartson_width(ek: float) -> float:
+    """Width of the outer Stewartson layer on the tangent cylinder, Ek^(1/4)."""
+    return ek**0.25
+
+
+def _wall_angle(width: float, ro: float, ri: float | None) -> float:
+    """
+    Angle, in the Chebyshev variable, within `width` of the outer wall.
+
+    In a shell the radial grid is Gauss-Chebyshev in x = (2r - Ri - Ro) / (Ro - Ri).
+    In a ball it is Gauss-Jacobi in z = 2 (r / Ro)^2 - 1, whose points cluster like
+    Chebyshev points towards z = 1.
+    """
+    edge = 1 - 2 * width / (ro - ri) if ri else 2 * (1 - width / ro) ** 2 - 1
+    return math.acos(max(edge, -1.0))
+
+
+def boundary_layer_modes(
+    width: float, ro: float, ri: float | None = None, points: int = LAYER_POINTS
+) -> int:
+    """
+    Smallest radial resolution placing `points` grid points within a boundary layer.
+
+    :param width: Thickness of the layer at the outer wall.
+    :param ro: Outer radius.
+    :param ri: Inner radius of a shell, or None for a ball.
+    :param points: Number of grid points required inside the layer.
+    :returns Nr: Radial resolution.
+    """
+    # The k-th point from the wall is at angle pi (k + 1/2) / Nr.
+    return math.ceil(math.pi * (points - 0.5) / _wall_angle(width, ro, ri))
+
+
+def spectral_tail_modes(
+    width: float, ro: float, ri: float | None = None, tol: float = TAIL_TOLERANCE
+) -> int:
+    """
+    Smallest radial resolution resolving an Ekman profile to a given tolerance.
+
+    The profile exp(-d / width), with d the distance to the nearest wall, is expanded
+    in Chebyshev polynomials of the radial variable of the basis (see
+    `_wall_angle`), and the number of modes needed for all higher coefficients to be
+    below `tol` times the largest is returned.
+
+    :param width: Thickness of the layer.
+    :param ro: Outer radius.
+    :param ri: Inner radius of a shell, or None for a ball.
+    :param tol: Tolerance on the relative size of the neglected coefficients.
+    :returns Nr: Radial resolution.
+    """
+
+    def profile(x: np.ndarray) -> np.ndarray:
+        if ri:
+            r = ri + (x + 1) * (ro - ri) / 2
+            return np.exp(-(ro - r) / width) + np.exp(-(r - ri) / width)
+        r = ro * np.sqrt((x + 1) / 2)
+        return np.exp(-(ro - r) / width)
+
+    # Chebyshev coefficients of exp(-a x) are ~ exp(-n^2 / 2a), so this is enough
+    # modes for the tail to be well below the tolerance.
+    length = ro - ri if ri else ro
+    degree = 2 * math.ceil(math.sqrt(length * math.log(1 / tol) / width)) + 32
+    coeffs = np.abs(chebyshev.chebinterpolate(profile, degree))
+    above = np.flatnonzero(coeffs >= tol * coeffs.max())
+    return int(above[-1]) + 1
+
+
+def _round_up(n: int, multiple: int) -> int:
+    """Round up to a multiple."""
+    return multiple * math.ceil(n / multiple)
+
+
+def recommend_resolution(
+    ek: float,
+    *,
+    ro: float = 1.0,
+    ri: float | None = None,
+    dealias: float = 3 / 2,
+    points: int = LAYER_POINTS,
+    tol: float = TAIL_TOLERANCE,
+    multiple: int = 8,
+) -> dict[str, Any]:
+    """
+    Recommend the minimum resolution for a spin-up run.
+
+    Nr is the larger of the boundary-layer and spectral-tail criteria. Ntheta places
+    `points` grid points across the equatorial Ekman region and, in a shell, across
+    the Stewartson layer on the tangent cylinder. Nphi is twice Ntheta, as for an
+    isotropic resolution on the sphere.
+
+    :param ek: Ekman number.
+    :param ro: Outer radius.
+    :param ri: Inner radius of a shell, or None for a ball.
+    :param dealias: Dealiasing factor, used to report the size of the grid.
+    :param points: Number of grid points required across each layer.
+    :param tol: Tolerance on the relative size of the neglected radial coefficients.
+    :param multiple: Resolutions are rounded up to a multiple of this, to allow for
+        process meshes.
+    :returns recommendation: The recommended Nphi, Ntheta and Nr, the corresponding
+        grid shape, and the value of each criterion.
+    """
+    delta = ekman_thickness(ek)
+    criteria = {
+        "ekman_thickness": delta,
+        "Nr_boundary_layer": boundary_layer_modes(delta, ro, ri, points),
+        "Nr_spectral_tail": spectral_tail_modes(delta, ro, ri, tol),
+        "Ntheta_equatorial": math.ceil(points * math.pi / (2 * equatorial_width(ek))),
+    }
+    if ri:
+        # Latitudinal width of the Stewartson layer where it meets the outer sphere
+        tangent = math.asin(ri / ro)
+        width = stewartson_width(ek) / (ro * math.cos(tangent))
+        criteria["Ntheta_stewartson"] = math.ceil(points * math.pi / width)
+
+    nr = _round_up(
+        max(criteria["Nr_boundary_layer"], criteria["Nr_spectral_tail"]), multiple
+    )
+    ntheta = _round_up(
+        max(v for k, v in criteria.items() if k.startswith("Ntheta")), multiple
+    )
+    shape = {"Nphi": 2 * ntheta, "Ntheta": ntheta, "Nr": nr}
+    return {
+        **shape,
+        "grid_shape": [math.ceil(dealias * n) for n in shape.values()],
+        "criteria": criteria,
+    }
+
+
+def spectral_envelope(coeffs: np.ndarray, axis: int) -> np.ndarray:
+    """
+    Largest coefficient magnitude of each mode along one axis.
+
+    :param coeffs: Coefficients, in any shape.
+    :param axis: Axis along which the modes are indexed.
+    :returns envelope: Maximum of |coeffs| over all other axes, for each mode.
+    """
+    magnitude = np.abs(np.moveaxis(coeffs, axis, -1))
+    return magnitude.reshape(-1, magnitude.shape[-1]).max(axis=0)
+
+
+def spectral_tail(envelope: np.ndarray, fraction: float = TAIL_FRACTION) -> float:
+    """
+    Relative size of the highest modes of a spectrum.
+
+    :param envelope: Magnitude of each mode, from the lowest to the highest.
+    :param fraction: Fraction of the highest modes making up the tail.
+    :returns tail: Largest magnitude in the tail, relative to the largest overall.
+    """
+    peak = envelope.max()
+    if peak == 0:
+        return 0.0
+    size = max(1, math.ceil(fraction * len(envelope)))
+    return float(envelope[-size:].max() / peak)
+
+
+def check_resolution(
+    path: Path | str,
+    tasks: list[str] | None = None,
+    *,
+    write: int = -1,
+    axes: tuple[str, ...] = ("phi", "theta", "r"),
+    tol: float = TAIL_TOLERANCE,
+    fraction: float = TAIL_FRACTION,
+) -> dict[str, dict[str, float | bool]]:
+    """
+    Check the decay of the spectral coefficients stored in a dedalus output file.
+
+    The tasks must have been written in coefficient space (layout "c"), as the
+    checkpoints of the spin-up scripts are. For each spatial axis, the envelope of
+    the coefficients over all other axes and tensor components is formed, and its
+    tail compared with the tolerance. A tail above the tolerance means the
+    resolution along that axis should be increased.
+
+    :param path: Path to a checkpoint or other output file.
+    :param tasks: Names of the tasks to check. Defaults to all tasks in the file.
+    :param write: Index of the write to check.
+    :param axes: Names of the spatial axes, in the order they are stored.
+    :param tol: Tolerance on the relative size of the tail.
+    :param fraction: Fraction of the highest modes making up the tail.
+    :returns tails: For each task, the relative size of the tail along each axis,
+        and whether all of them are within the tolerance ("adequate").
+    """
+    tails: dict[str, dict[str, float]] = {}
+    with h5py.File(path, "r") as f:
+        for name in tasks or list(f["tasks"]):
+            dset = f["tasks"][name]
+            if any(dset.attrs.get("grid_space", [False])):
+                raise CoefficientLayoutError(name)
+            coeffs = dset[write]
+            ndim = len(axes)
+            tails[name] = {
+                axis: spectral_tail(
+                    spectral_envelope(coeffs, coeffs.ndim - ndim + i), fraction
+                )
+                for i, axis in enumerate(axes)
+            }
+    return {
+        name: {**axis_tails, "adequate": max(axis_tails.values()) <= tol}
+        for name, axis_tails in tails.items()
+    }
@@ -15,3 +15,38 @@ class ExpectPositiveError(Exception):
     def __init__(self, var: str | float) -> None:
         """:param var: The variable that should be positive."""
         super().__init__(f"{var} should be positive.")
+
+
+class BlowUpError(Exception):
+    """Exception raised if a run blows up and can no longer be rolled back."""
+
+    def __init__(self, iteration: int, reason: str) -> None:
+        """
+        Error message.
+
+        :param iteration: Iteration at which the blow-up was detected.
+        :param reason: Description of the blow-up.
+        """
+        super().__init__(f"Unrecoverable blow-up at iteration {iteration}: {reason}.")
+
+
+class CoefficientLayoutError(Exception):
+    """Exception raised if spectral data is requested from grid-space output."""
+
+    def __init__(self, task: str) -> None:
+        """:param task: Name of the task stored in grid space."""
+        super().__init__(
+            f"Task {task} is not stored in coefficient space (write it with"
+            ' layout="c").'
+        )
+
+
+class SetupMismatchError(Exception):
+    """Exception raised if a problem builder is asked to change its bases."""
+
+    def __init__(self, names: list[str]) -> None:
+        """:param names: Parameters that differ from those the bases were built with."""
+        super().__init__(
+            f"Parameters {', '.join(names)} fix the bases of the builder and cannot"
+            " change between builds."
+        )
@@ -0,0 +1,99 @@
+"""
+Ekman-layer initial conditions for the spin-up problems with an imposed boundary flow.
+
+Once the boundary velocity `uang` is switched on, an Ekman layer forms within about
+a rotation period, while the interior only spins up over the much longer Ekman time.
+Starting from rest, that first rotation period is spent on fast inertial waves,
+which force small timesteps. These functions instead seed the flow with the
+quasi-steady Ekman layer of the boundary flow, over an interior at rest.
+
+At each latitude the layer is the linear Ekman solution for the component of the
+(unit) rotation normal to the boundary, cos(theta). With xi the depth below the
+boundary in units of the layer thickness delta,
+
+    u_phi = U exp(-xi) cos(xi),    u_theta = sign(cos(theta)) U exp(-xi) sin(xi),
+
+where U = Delta_Omega sin(theta) is the boundary velocity `uang` of the scripts, and
+delta = sqrt(viscosity / |cos(theta)|). The radial velocity is zero, so the
+boundary conditions hold exactly, but the Ekman pumping out of the layer is left
+out: the divergence of the state, of order sqrt(viscosity), is removed by the
+pressure on the first step.
+"""
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import dedalus
+
+# Initial conditions the spin-up scripts accept: random noise only, or the Ekman
+# layer of the boundary flow on top of it.
+INITIAL_CONDITIONS = ("noise", "ekman")
+
+
+def ekman_thickness(theta: np.ndarray, viscosity: float) -> np.ndarray:
+    """
+    Compute the thickness of the Ekman layer at each colatitude.
+
+    The layer thickens towards the equator, where the rotation is parallel to the
+    boundary. Its thickness is capped at viscosity**(2/5), that of the equatorial
+    boundary layer, by bounding |cos(theta)| below by viscosity**(1/5).
+
+    :param theta: Colatitudes.
+    :param viscosity: Coefficient of the viscous term of the momentum equation,
+        e.g. Ek.
+    :returns delta: Thickness of the layer.
+    """
+    normal_rotation = np.maximum(np.abs(np.cos(theta)), viscosity ** (1 / 5))
+    return np.sqrt(viscosity / normal_rotation)
+
+
+def ekman_layer(
+    theta: np.ndarray,
+    r: np.ndarray,
+    *,
+    delta_omega: float,
+    radius: float,
+    viscosity: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the velocity of the Ekman layer below the boundary flow `uang`.
+
+    :param theta: Colatitudes, broadcastable against `r`.
+    :param r: Radii, inside the boundary.
+    :param delta_omega: Change in the rotation rate of the boundary.
+    :param radius: Radius of the boundary.
+    :param viscosity: Coefficient of the viscous term of the momentum equation.
+    :returns u_theta: Colatitudinal velocity.
+    :returns u_phi: Azimuthal velocity.
+    """
+    xi = (radius - r) / ekman_thickness(theta, viscosity)
+    envelope = delta_omega * np.sin(theta) * np.exp(-xi)
+    return np.sign(np.cos(theta)) * envelope * np.sin(xi), envelope * np.cos(xi)
+
+
+def add_ekman_layer(
+    u: "dedalus.core.field.Field",
+    theta: np.ndarray,
+    r: np.ndarray,
+    *,
+    delta_omega: float,
+    radius: float,
+    viscosity: float,
+) -> None:
+    """
+    Add the Ekman layer of the boundary flow to a velocity field, in place.
+
+    :param u: Velocity field, on spherical coordinates ordered (phi, theta, r).
+    :param theta: Local colatitude grid of the field.
+    :param r: Local radial grid of the field.
+    :param delta_omega: Change in the rotation rate of the boundary.
+    :param radius: Radius of the boundary.
+    :param viscosity: Coefficient of the viscous term of the momentum equation.
+    """
+    u_theta, u_phi = ekman_layer(
+        theta, r, delta_omega=delta_omega, radius=radius, viscosity=viscosity
+    )
+    u["g"][0] += u_phi
+    u["g"][1] += u_theta
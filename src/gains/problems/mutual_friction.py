@@ -0,0 +1,76 @@
+"""
+Mutual friction between the superfluid and the normal fluid, in the HVBK equations.
+
+The force on the normal fluid, in the form of J. R. Fuentes and Vanessa Graber 2024
+ApJ 974 300, is
+
+    F_mf = B omega_unit x (omega_s x u_ns) + B' omega_s x u_ns,
+
+with u_ns = u_n - u_s, omega_s the superfluid vorticity in the rotating frame and
+B' = B / 2. The superfluid feels -F_mf, so the force enters both momentum equations.
+
+`MutualFriction` builds the force once for both momentum equations, with the cross
+product omega_s x u_ns shared between its two terms rather than built for each.
+"""
+
+from typing import TYPE_CHECKING
+
+import dedalus.public as d3
+import numpy as np
+
+if TYPE_CHECKING:
+    import dedalus
+
+# Regularisation of the unit vector along the superfluid vorticity, where it vanishes.
+UNIT_EPSILON = 1e-14
+
+
+class MutualFriction:
+    """The mutual-friction force, with the superfluid vorticity it depends on."""
+
+    omega_s: "dedalus.core.future.Future"
+    omega_unit: "dedalus.core.future.Future | dedalus.core.field.Field"
+    force: "dedalus.core.future.Future"
+
+    def __init__(
+        self,
+        u_n: "dedalus.core.field.Field",
+        u_s: "dedalus.core.field.Field",
+        ez: "dedalus.core.field.Field",
+        b: float,
+        *,
+        linear: bool = False,
+        normalise: bool = True,
+    ) -> None:
+        """
+        Build the operators.
+
+        :param u_n: Velocity of the normal fluid.
+        :param u_s: Velocity of the superfluid.
+        :param ez: Unit vector along the rotation axis, on the bases of the
+            velocities.
+        :param b: Mutual-friction coefficient B.
+        :param linear: Whether to linearise the force about the background
+            rotation, omega_s = 2 ez (see `gains.utils.linear`).
+        :param normalise: Whether omega_unit is omega_s normalised, or omega_s / 2,
+            its value for the background rotation, which avoids a square root and a
+            division on the grid.
+        """
+        self.b = b
+        self.omega_s = d3.Curl(u_s) + 2 * ez
+        u_ns = u_n - u_s
+        if linear:
+            omega_mf, self.omega_unit = 2 * ez, ez
+        else:
+            omega_mf = self.omega_s
+            self.omega_unit = (
+                self.omega_s
+                / (np.sqrt(d3.DotProduct(self.omega_s, self.omega_s)) + UNIT_EPSILON)
+                if normalise
+                else self.omega_s / 2
+            )
+        # Shared between both terms of the force
+        omega_cross_u = d3.CrossProduct(omega_mf, u_ns)
+        self.force = (
+            b * d3.CrossProduct(self.omega_unit, omega_cross_u) + b / 2 * omega_cross_u
+        )
@@ -0,0 +1,1143 @@
+"""
+Builders for the spin-up problems, each defining one problem for every entry point.
+
+A builder creates the `Distributor`, the bases and the geometric fields once, and
+then builds any number of solvers from parameter dictionaries, so that many
+configurations can run in one process:
+
+    builder = TwoFluidSphereSpinUp({"Nphi": 64, "Ntheta": 32, "Nr": 32, "B": 0.1})
+    for delta_omega in (1e-3, 2e-3, 4e-3):
+        run = builder.build(
+            {"Delta_Omega": delta_omega},
+            logger=logger,
+            output_dir=Path("outputs") / f"delta_omega_{delta_omega}",
+        )
+        run.evolve(logger)
+
+Parameters fixing the bases (`setup_params`) must be the same for every build; any
+other parameter can change between builds. The simulation scripts in `scripts/` are
+command-line wrappers around `run_spin_up`, which builds a single run and adds the
+run-time options of `gains.utils.parsers.SimulationCLI` (checkpoints, wall-clock
+guard, checks, profiling, ...).
+
+Builds with `"linear": True` solve for the linear response to a small glitch (see
+`gains.utils.linear`), stepping with `"linear_timestep"`. Their builder should be
+created with `"dealias": 1`, as no quadratic nonlinearities are left to dealias.
+"""
+
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from contextlib import AbstractContextManager, nullcontext
+from logging import Logger
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, ClassVar
+
+import dedalus.public as d3
+import numpy as np
+from mpi4py import MPI
+
+from gains.exceptions import SetupMismatchError
+from gains.initial_conditions.ekman import add_ekman_layer
+from gains.initial_conditions.single_component_spin_up import mask_angular, mask_r
+from gains.params.single_spin_up_rotating import parameters as single_params
+from gains.params.spherical_shell import parameters as shell_params
+from gains.problems.bases import ShellBasis, SphericalBasis
+from gains.problems.mutual_friction import MutualFriction
+from gains.utils.axisymmetry import AxisymmetryCheck, add_axisymmetry_properties
+from gains.utils.checkpoints import CheckpointManager, load_checkpoint
+from gains.utils.convergence import SteadyStateMonitor
+from gains.utils.linear import (
+    LINEAR_TIMESTEP,
+    FixedTimestep,
+    NonlinearityCheck,
+    add_nonlinearity_properties,
+    advection,
+)
+from gains.utils.loggers import track_reynolds_n, track_vorticity
+from gains.utils.matrix_cache import build_solver
+from gains.utils.misc import mesh_cpus
+from gains.utils.profile import MemoryTracker, PhaseTimer, ProfileWindow, profile
+from gains.utils.rollback import BlowUpRecovery
+from gains.utils.telemetry import LoadBalanceMonitor
+from gains.utils.walltime import WallClockGuard
+
+if TYPE_CHECKING:
+    import dedalus
+
+# Mass fractions of the superfluid neutrons and of the normal fluid (protons and
+# electrons), as in the two-fluid scripts.
+X_S = 0.95
+X_N = 0.05
+
+
+def _phase(timers: PhaseTimer | None, name: str) -> AbstractContextManager:
+    """Time a block as a phase of `timers`, if given."""
+    return nullcontext() if timers is None else timers.phase(name)
+
+
+class SpinUpRun:
+    """A configured solver with its outputs, ready to be evolved."""
+
+    def __init__(
+        self,
+        solver: "dedalus.core.solvers.InitialValueSolver",
+        namespace: dict[str, Any],
+        handlers: dict[str, Any],
+        *,
+        cfl: d3.CFL | FixedTimestep,
+        flow: d3.GlobalFlowProperty,
+        track: Callable[..., None],
+    ) -> None:
+        """
+        Collect the parts of a run.
+
+        :param solver: The IVP solver.
+        :param namespace: Fields and operators the problem was built from, by name.
+        :param handlers: File handlers of the outputs, by name.
+        :param cfl: The CFL condition of the run, or its fixed timestep if linear.
+        :param flow: Flow properties, as tracked by `track`.
+        :param track: Main loop logging the flow properties, from `gains.utils.loggers`.
+        """
+        self.solver = solver
+        self.namespace = namespace
+        self.handlers = handlers
+        self.cfl = cfl
+        self.flow = flow
+        self.track = track
+
+    def evolve(self, logger: Logger, **loop_options) -> None:
+        """
+        Run the main loop until the stop time of the solver.
+
+        :param logger: Logger used to report progress.
+        :param loop_options: Forwarded to `gains.utils.loggers.main_loop`.
+        """
+        self.track(logger, self.flow, self.solver, self.cfl, **loop_options)
+
+
+class SpinUpBuilder(ABC):
+    """
+    Build solvers for one spin-up problem, sharing the distributor and bases.
+
+    Subclasses define the bases and geometric fields (`_build_bases`), the variables
+    and substitutions of each build (`_namespace`), the equations, initial state,
+    outputs and flow properties.
+    """
+
+    sim_name: ClassVar[str]
+    default_params: ClassVar[dict[str, Any]]
+    # Parameters fixing the distributor and bases, shared by all builds.
+    setup_params: ClassVar[tuple[str, ...]] = ("Nphi", "Ntheta", "Nr", "dealias")
+    # Parameters on the left-hand sides of the equations, keying the matrix cache.
+    lhs_params: ClassVar[tuple[str, ...]] = ("Ek", "dealias")
+    # Fields the CFL condition is computed from.
+    velocities: ClassVar[tuple[str, ...]]
+    track: ClassVar[Callable[..., None]]
+    # Flow property watched for blow-ups (see `gains.utils.rollback`).
+    blowup_property: ClassVar[str] = "Re_n"
+    # Whether a flow is imposed on a boundary, with an Ekman layer to start from.
+    boundary_flow: ClassVar[bool] = True
+
+    timestepper: ClassVar[type] = d3.SBDF2
+    max_timestep: ClassVar[float] = 1e-2
+    cfl_safety: ClassVar[float] = 0.3
+    dtype: ClassVar[type] = np.float64
+
+    def __init__(
+        self,
+        params: dict[str, Any] | None = None,
+        *,
+        mesh: list[int] | None = None,
+        comm: MPI.Comm = MPI.COMM_WORLD,
+    ) -> None:
+        """
+        Create the distributor, bases and geometric fields.
+
+        :param params: Parameters overriding `default_params`. Those in
+            `setup_params` are fixed for all builds; the others are defaults for
+            each build.
+        :param mesh: Process mesh. Defaults to `gains.utils.misc.mesh_cpus`, over
+            theta only for axisymmetric problems (Nphi=1).
+        :param comm: Communicator the simulations run on.
+        """
+        self.params = {**self.default_params, **(params or {})}
+        self.setup = {name: self.params[name] for name in self.setup_params}
+        self.mesh = (
+            mesh_cpus(comm.size, axisymmetric=self.params["Nphi"] == 1)
+            if mesh is None
+            else mesh
+        )
+
+        self.coords = d3.SphericalCoordinates("phi", "theta", "r")
+        self.dist = d3.Distributor(
+            self.coords, dtype=self.dtype, mesh=self.mesh, comm=comm
+        )
+        self.er = self.dist.VectorField(self.coords)
+        self.etheta = self.dist.VectorField(self.coords)
+        self.ephi = self.dist.VectorField(self.coords)
+        self.er["g"][2] = 1
+        self.etheta["g"][1] = 1
+        self.ephi["g"][0] = 1
+        self._build_bases()
+
+    @abstractmethod
+    def _build_bases(self) -> None:
+        """Create the bases and the fields that only depend on them."""
+
+    @abstractmethod
+    def _namespace(self, params: dict[str, Any]) -> tuple[list, dict[str, Any]]:
+        """
+        Create the variables and substitutions of one build.
+
+        :param params: Parameters of the build.
+        :returns variables: Problem variables, in order.
+        :returns namespace: Everything the equations and outputs refer to, by name.
+        """
+
+    @abstractmethod
+    def _equations(self, params: dict[str, Any]) -> list[str]:
+        """
+        Equations of the problem, in terms of the names in the namespace.
+
+        The advective terms are left out of linear problems (see
+        `gains.utils.linear.advection`).
+        """
+
+    @abstractmethod
+    def _initial_state(self, namespace: dict[str, Any], params: dict[str, Any]) -> None:
+        """
+        Set the initial state of the variables, in place.
+
+        Problems with an imposed boundary flow add its Ekman layer to the noise if
+        `"initial_condition"` is "ekman" (see `gains.initial_conditions.ekman`).
+        """
+
+    @abstractmethod
+    def _outputs(
+        self,
+        solver: "dedalus.core.solvers.InitialValueSolver",
+        namespace: dict[str, Any],
+        params: dict[str, Any],
+        save_path: Path,
+        mode: str,
+    ) -> dict[str, Any]:
+        """Add the file handlers of the run, returning them by name."""
+
+    @abstractmethod
+    def _flow_properties(
+        self,
+        flow: d3.GlobalFlowProperty,
+        namespace: dict[str, Any],
+        params: dict[str, Any],
+    ) -> None:
+        """Add the flow properties, including the one logged by `track`."""
+
+    def az_avg(self, a: d3.Field) -> d3.Field:
+        """Average over the phi coordinate."""
+        return d3.Average(a, self.coords.coords[0])
+
+    def build(
+        self,
+        params: dict[str, Any] | None = None,
+        *,
+        logger: Logger,
+        output_dir: Path | str | None = None,
+        checkpoint: Path | str | None = None,
+        matrix_cache: Path | str | None = None,
+        timestepper: type | None = None,
+        cfl_safety: float | None = None,
+        max_timestep: float | None = None,
+        timers: PhaseTimer | None = None,
+        memory: MemoryTracker | None = None,
+    ) -> SpinUpRun:
+        """
+        Build a solver for one configuration.
+
+        :param params: Parameters overriding those given to the builder.
+        :param logger: Logger used by the solver build.
+        :param output_dir: Output directory of the run. No outputs are written if
+            not given.
+        :param checkpoint: Checkpoint to start from, instead of the initial state,
+            possibly at a different resolution (see
+            `gains.utils.checkpoints.load_checkpoint`). Outputs are then appended to.
+        :param matrix_cache: Directory of the solver matrix cache (see
+            `gains.utils.matrix_cache`), or None to disable it.
+        :param timestepper: Timestepper class, instead of `timestepper`.
+        :param cfl_safety: Safety factor of the CFL condition, instead of
+            `cfl_safety`.
+        :param max_timestep: Largest and initial timestep, instead of
+            `max_timestep`.
+        :param timers: Optional timers of the setup phases ("fields", "build_solver",
+            "initial_state" and "outputs").
+        :param memory: Optional memory tracker, marked once the fields and the solver
+            are built.
+        :returns run: The configured solver, outputs, CFL and flow properties.
+        """
+        params = {**self.params, **(params or {})}
+        changed = [
+            name for name in self.setup_params if params[name] != self.setup[name]
+        ]
+        if changed:
+            raise SetupMismatchError(changed)
+
+        with _phase(timers, "fields"):
+            variables, namespace = self._namespace(params)
+        if memory is not None:
+            memory.mark("fields")
+
+        problem = d3.IVP(variables, namespace=namespace)
+        for equation in self._equations(params):
+            problem.add_equation(equation)
+        timestepper = timestepper or self.timestepper
+        max_timestep = max_timestep or self.max_timestep
+        with _phase(timers, "build_solver"):
+            solver = build_solver(
+                problem,
+                timestepper,
+                logger,
+                cache_dir=matrix_cache,
+                # Only the parameters on the left-hand sides, so runs that differ in
+                # the forcing share the cached matrices
+                params={name: params[name] for name in self.lhs_params},
+            )
+        if memory is not None:
+            memory.mark("build_solver")
+        solver.stop_sim_time = params["stop_sim_time"]
+        if params.get("stop_iteration") is not None:
+            solver.stop_iteration = params["stop_iteration"]
+
+        with _phase(timers, "initial_state"):
+            if checkpoint is not None:
+                _, timestep = load_checkpoint(solver, checkpoint)
+            else:
+                ekman = params.get("initial_condition") == "ekman"
+                if ekman and not self.boundary_flow:
+                    logger.warning(
+                        "No boundary flow is imposed on this problem, so it has no"
+                        " Ekman layer to start from: starting from noise."
+                    )
+                self._initial_state(namespace, params)
+                timestep = max_timestep
+
+        handlers = {}
+        if output_dir is not None:
+            with _phase(timers, "outputs"):
+                save_path = Path(output_dir) / "su_equator"
+                save_path.mkdir(parents=True, exist_ok=True)
+                # Resumed runs add to the existing outputs instead of overwriting them
+                mode = "overwrite" if checkpoint is None else "append"
+                handlers = self._outputs(solver, namespace, params, save_path, mode)
+
+        if params.get("linear", False):
+            cfl = FixedTimestep(params.get("linear_timestep", LINEAR_TIMESTEP))
+        else:
+            cfl = d3.CFL(
+                solver,
+                timestep,
+                cadence=1,
+                safety=cfl_safety or self.cfl_safety,
+                threshold=0.1,
+                max_dt=max_timestep,
+            )
+        for name in self.velocities:
+            cfl.add_velocity(namespace[name])
+        flow = d3.GlobalFlowProperty(solver, cadence=10)
+        self._flow_properties(flow, namespace, params)
+        return SpinUpRun(
+            solver, namespace, handlers, cfl=cfl, flow=flow, track=type(self).track
+        )
+
+
+class _SphereSpinUp(SpinUpBuilder):
+    """Spin-up problems in a full sphere of unit radius."""
+
+    radius: ClassVar[float] = 1.0
+
+    def _build_bases(self) -> None:
+        self.basis = SphericalBasis(
+            self.coords, self.dist, self.dtype, self.radius, **self.params
+        )
+        self.phi, self.theta, self.r = self.dist.local_grids(self.basis.ball)
+        self.ez = self.dist.VectorField(self.coords, bases=self.basis.ball)
+        self.ez["g"][1] = -np.sin(self.theta)
+        self.ez["g"][2] = np.cos(self.theta)
+        self.sintheta = self.dist.Field(name="sintheta", bases=self.basis.ball)
+        self.sintheta["g"] = np.sin(self.theta)
+        self.rsintheta = self.dist.Field(name="rsintheta", bases=self.basis.ball)
+        self.rsintheta["g"] = self.r * np.sin(self.theta)
+
+    def lift(self, a: d3.Field) -> d3.Field:
+        """Lift operand to derivative basis."""
+        return d3.Lift(a, self.basis.ball, -1)
+
+    def _slices(
+        self,
+        solver: "dedalus.core.solvers.InitialValueSolver",
+        u_n_phi: d3.Field,
+        params: dict[str, Any],
+        save_path: Path,
+        mode: str,
+    ) -> Any:  # noqa: ANN401
+        """Add the equatorial slices of the normal-fluid azimuthal velocity."""
+        slices = solver.evaluator.add_file_handler(
+            str(save_path / "slices"), sim_dt=0.025, max_writes=100, mode=mode
+        )
+        slices.add_task(
+            u_n_phi(theta=np.pi / 2), scales=params["dealias"], name="u_n_phi(equator)"
+        )
+        return slices
+
+
+class SingleFluidSpinUp(_SphereSpinUp):
+    """Single-fluid spin-up in the rotating frame (single_spin_up_rotating_frame.py)."""
+
+    sim_name = "single_spin_up"
+    default_params = single_params
+    velocities = ("u_n",)
+    track = staticmethod(track_reynolds_n)
+    # The rotation is imposed by a forcing near the equator instead
+    boundary_flow = False
+
+    def _build_bases(self) -> None:
+        super()._build_bases()
+        ball = self.basis.ball
+        self.mask_equator = self.dist.Field(name="mask_equator", bases=ball)
+        self.mask_equator["g"] = mask_angular(self.theta, 0.3, 2.0)
+        self.mask_radial = self.dist.Field(name="mask_radial", bases=ball)
+        self.mask_radial["g"] = mask_r(self.r, self.params["Nr"])
+
+    def _namespace(self, params: dict[str, Any]) -> tuple[list, dict[str, Any]]:
+        dist, coords, ball = self.dist, self.coords, self.basis.ball
+        u_n = dist.VectorField(coords, name="u_n", bases=ball)
+        p_n = dist.Field(name="p_n", bases=ball)
+        tau_p_n = dist.Field(name="tau_p_n")
+        tau_u_n = dist.VectorField(coords, name="tau_u_n", bases=self.basis.sphere)
+
+        u_n_target = dist.VectorField(coords, name="u_n_target", bases=ball)
+        u_n_target["g"][0] = params["Delta_Omega"] * self.r * np.sin(self.theta)
+        strain_rate = d3.grad(u_n) + d3.trans(d3.grad(u_n))
+
+        variables = [p_n, u_n, tau_p_n, tau_u_n]
+        return variables, {
+            "u_n": u_n,
+            "p_n": p_n,
+            "tau_p_n": tau_p_n,
+            "tau_u_n": tau_u_n,
+            "u_n_target": u_n_target,
+            "mask_equator": self.mask_equator,
+            "mask_radial": self.mask_radial,
+            "ez": self.ez,
+            "shear_stress": d3.angular(d3.radial(strain_rate(r=1), index=1)),
+            "lift": self.lift,
+            "cross": d3.CrossProduct,
+            "radius": self.radius,
+            "Ek": params["Ek"],
+            "u_n_phi": d3.DotProduct(u_n, self.ephi),
+        }
+
+    def _equations(self, params: dict[str, Any]) -> list[str]:
+        linear = params.get("linear", False)
+        return [
+            "div(u_n) + tau_p_n = 0",
+            (
+                "dt(u_n) + grad(p_n) - Ek*lap(u_n) + lift(tau_u_n) ="
+                f"{advection('u_n', linear=linear)} -2*cross(ez,u_n) "
+                "+100*(mask_equator*mask_radial*(u_n_target - u_n))"
+            ),
+            "radial(u_n(r=radius)) = 0",
+            "integ(p_n) = 0",
+            "shear_stress = 0",
+        ]
+
+    def _initial_state(
+        self,
+        namespace: dict[str, Any],
+        params: dict[str, Any],  # noqa: ARG002
+    ) -> None:
+        namespace["u_n"].fill_random("g", seed=42, distribution="normal", scale=1e-10)
+        namespace["u_n"].low_pass_filter(scales=0.5)
+
+    def _outputs(
+        self,
+        solver: "dedalus.core.solvers.InitialValueSolver",
+        namespace: dict[str, Any],
+        params: dict[str, Any],
+        save_path: Path,
+        mode: str,
+    ) -> dict[str, Any]:
+        u_n = namespace["u_n"]
+        az_avg = solver.evaluator.add_file_handler(
+            str(save_path / "AZ_avg_equator"), sim_dt=0.05, max_writes=100, mode=mode
+        )
+        az_avg.add_task(d3.DotProduct(self.er, u_n), name="u_n_r")
+        az_avg.add_task(d3.DotProduct(self.etheta, u_n), name="u_n_theta")
+        az_avg.add_task(self.az_avg(namespace["u_n_phi"]), name="u_n_phi")
+        slices = self._slices(solver, namespace["u_n_phi"], params, save_path, mode)
+        return {"AZ_avg": az_avg, "slices": slices}
+
+    def _flow_properties(
+        self,
+        flow: d3.GlobalFlowProperty,
+        namespace: dict[str, Any],
+        params: dict[str, Any],
+    ) -> None:
+        u_n = namespace["u_n"]
+        flow.add_property(np.sqrt(u_n @ u_n) * params["Ek"], name="Re_n")
+        flow.add_property(self.rsintheta * namespace["u_n_phi"], name="L_z")
+
+
+class TwoFluidSphereSpinUp(_SphereSpinUp):
+    """HVBK spin-up of a two-fluid sphere (scripts/two_fluid_spin_up.py)."""
+
+    sim_name = "two_fluid_spin_up"
+    default_params = single_params
+    velocities = ("u_n", "u_s")
+    track = staticmethod(track_vorticity)
+    blowup_property = "vorticity_mag"
+
+    def _namespace(self, params: dict[str, Any]) -> tuple[list, dict[str, Any]]:
+        dist, coords, ball, sphere = (
+            self.dist,
+            self.coords,
+            self.basis.ball,
+            self.basis.sphere,
+        )
+        u_n = dist.VectorField(coords, name="u_n", bases=ball)
+        u_s = dist.VectorField(coords, name="u_s", bases=ball)
+        p_n = dist.Field(name="p_n", bases=ball)
+        p_s = dist.Field(name="p_s", bases=ball)
+        tau_p_n = dist.Field(name="tau_p_n")
+        tau_p_s = dist.Field(name="tau_p_s")
+        tau_u_n = dist.VectorField(coords, name="tau_u_n", bases=sphere)
+        tau_u_s = dist.VectorField(coords, name="tau_u_s", bases=sphere)
+
+        mutual_friction = MutualFriction(
+            u_n, u_s, self.ez, params["B"], linear=params.get("linear", False)
+        )
+
+        uang = dist.VectorField(coords, bases=ball)(r=self.radius).evaluate()
+        uang["g"][0, :] = (params["Delta_Omega"] * self.sintheta)(
+            r=self.radius
+        ).evaluate()["g"]
+        strain_rate = d3.grad(u_s) + d3.trans(d3.grad(u_s))
+
+        variables = [u_n, u_s, p_n, p_s, tau_p_n, tau_p_s, tau_u_n, tau_u_s]
+        return variables, {
+            **{var.name: var for var in variables},
+            "ez": self.ez,
+            "F_mf": mutual_friction.force,
+            "omega_s": mutual_friction.omega_s,
+            "x_s": X_S,
+            "x_n": X_N,
+            "uang": uang,
+            "shear_stress": d3.angular(d3.radial(strain_rate(r=1), index=1)),
+            "lift": self.lift,
+            "radius": self.radius,
+            "Ek": params["Ek"],
+            "u_n_phi": d3.DotProduct(u_n, self.ephi),
+        }
+
+    def _equations(self, params: dict[str, Any]) -> list[str]:
+        linear = params.get("linear", False)
+        return [
+            "div(u_n) + tau_p_n = 0",
+            "div(u_s) + tau_p_s = 0",
+            "integ(p_n) = 0",
+            "integ(p_s) = 0",
+            (
+                "dt(u_n) - Ek*lap(u_n) + grad(p_n) + lift(tau_u_n)="
+                f"{advection('u_n', linear=linear)} + x_s/x_n * F_mf- 2*cross(ez,u_n)"
+            ),
+            (
+                "dt(u_s) + grad(p_s) + lift(tau_u_s) ="
+                f"{advection('u_s', linear=linear)} - F_mf - 2*cross(ez, u_s)"
+            ),
+            "radial(u_n(r=radius)) = 0",
+            "radial(u_s(r=radius)) = 0",
+            "angular(u_n(r=radius)) = angular(uang)",
+            "shear_stress = 0",
+        ]
+
+    def _initial_state(self, namespace: dict[str, Any], params: dict[str, Any]) -> None:
+        for name in ("u_n", "u_s"):
+            namespace[name].fill_random(
+                "g", seed=42, distribution="normal", scale=1e-10
+            )
+            namespace[name].low_pass_filter(scales=0.5)
+        if params.get("initial_condition") == "ekman":
+            add_ekman_layer(
+                namespace["u_n"],
+                self.theta,
+                self.r,
+                delta_omega=params["Delta_Omega"],
+                radius=self.radius,
+                viscosity=params["Ek"],
+            )
+
+    def _outputs(
+        self,
+        solver: "dedalus.core.solvers.InitialValueSolver",
+        namespace: dict[str, Any],
+        params: dict[str, Any],
+        save_path: Path,
+        mode: str,
+    ) -> dict[str, Any]:
+        u_n, u_s = namespace["u_n"], namespace["u_s"]
+        az_avg = solver.evaluator.add_file_handler(
+            str(save_path / "AZ_avg_equator"), sim_dt=0.05, max_writes=100, mode=mode
+        )
+        az_avg.add_task(d3.DotProduct(self.er, u_n), name="u_n_r")
+        az_avg.add_task(d3.DotProduct(self.etheta, u_n), name="u_n_theta")
+        az_avg.add_task(self.az_avg(namespace["u_n_phi"]), name="u_n_phi")
+        az_avg.add_task(self.az_avg(d3.DotProduct(self.ephi, u_s)), name="u_s_phi")
+        slices = self._slices(solver, namespace["u_n_phi"], params, save_path, mode)
+        return {"AZ_avg": az_avg, "slices": slices}
+
+    def _flow_properties(
+        self,
+        flow: d3.GlobalFlowProperty,
+        namespace: dict[str, Any],
+        params: dict[str, Any],
+    ) -> None:
+        u_n, u_s, omega_s = namespace["u_n"], namespace["u_s"], namespace["omega_s"]
+        flow.add_property(np.sqrt(u_n @ u_n) * params["Ek"], name="Re_n")
+        flow.add_property(np.sqrt(omega_s @ omega_s), name="vorticity_mag")
+        flow.add_property(
+            self.rsintheta
+            * (
+                X_N * d3.DotProduct(self.ephi, u_n)
+                + X_S * d3.DotProduct(self.ephi, u_s)
+            ),
+            name="L_z",
+        )
+
+
+class TwoFluidShellSpinUp(SpinUpBuilder):
+    """HVBK spin-up of a two-fluid spherical shell (spherical_shell_spin_up.py)."""
+
+    sim_name = "spherical_shell_spin_up"
+    default_params = shell_params
+    setup_params = ("Nphi", "Ntheta", "Nr", "dealias", "Ri", "Ro")
+    lhs_params = ("Ek", "Ri", "Ro", "dealias")
+    velocities = ("u_n_cr", "u_s_cr")
+    track = staticmethod(track_vorticity)
+    blowup_property = "vorticity_mag"
+    cfl_safety = 0.5
+
+    def _build_bases(self) -> None:
+        self.basis = ShellBasis(self.coords, self.dist, self.dtype, **self.params)
+        shell = self.basis.shell
+        self.phi, self.theta, self.r = self.dist.local_grids(shell)
+        self.ez = self.dist.VectorField(self.coords, bases=shell)
+        self.ez["g"][1] = -np.sin(self.theta)
+        self.ez["g"][2] = np.cos(self.theta)
+        self.rvec = self.dist.VectorField(self.coords, bases=shell.radial_basis)
+        self.rvec["g"][2] = self.r
+        self.sintheta = self.dist.Field(name="sintheta", bases=shell)
+        self.sintheta["g"] = np.sin(self.theta)
+        self.rsintheta = self.dist.Field(name="rsintheta", bases=shell)
+        self.rsintheta["g"] = self.r * np.sin(self.theta)
+        self.lift_basis = shell.derivative_basis(1)
+
+    def lift(self, a: d3.Field) -> d3.Field:
+        """Lift operand to the first derivative basis of the shell."""
+        return d3.Lift(a, self.lift_basis, -1)
+
+    def _namespace(self, params: dict[str, Any]) -> tuple[list, dict[str, Any]]:
+        dist, coords = self.dist, self.coords
+        shell, surface = self.basis.shell, self.basis.surface
+        u_n_cr = dist.VectorField(coords, name="u_n_cr", bases=shell)
+        p_n_cr = dist.Field(name="p_n_cr", bases=shell)
+        tau_n_pcr = dist.Field(name="tau_n_pcr")
+        tau_uncr_1 = dist.VectorField(coords, name="tau_nucr_1", bases=surface)
+        tau_uncr_2 = dist.VectorField(coords, name="tau_nucr_2", bases=surface)
+        u_s_cr = dist.VectorField(coords, name="u_s_cr", bases=shell)
+        p_s_cr = dist.Field(name="p_s_cr", bases=shell)
+        tau_s_pcr = dist.Field(name="tau_s_pcr")
+        tau_uscr_1 = dist.VectorField(coords, name="tau_sucr_1", bases=surface)
+        tau_uscr_2 = dist.VectorField(coords, name="tau_sucr_2", bases=surface)
+
+        ri, ro = params["Ri"], params["Ro"]
+        grad_uncr = d3.grad(u_n_cr) + self.rvec * self.lift(tau_uncr_1)
+        grad_uscr = d3.grad(u_s_cr) + self.rvec * self.lift(tau_uscr_1)
+
+        uang = dist.VectorField(coords, bases=shell)(r=ro).evaluate()
+        uang["g"][0, :] = (params["Delta_Omega"] * self.sintheta)(r=ro).evaluate()["g"]
+
+        mutual_friction = MutualFriction(
+            u_n_cr,
+            u_s_cr,
+            self.ez,
+            params["B"],
+            linear=params.get("linear", False),
+            normalise=False,
+        )
+
+        strain_rate_n = grad_uncr + d3.trans(grad_uncr)
+        strain_rate_s = grad_uscr + d3.trans(grad_uscr)
+
+        variables = [
+            u_n_cr,
+            p_n_cr,
+            tau_n_pcr,
+            tau_uncr_1,
+            tau_uncr_2,
+            u_s_cr,
+            p_s_cr,
+            tau_s_pcr,
+            tau_uscr_1,
+            tau_uscr_2,
+        ]
+        return variables, {
+            "u_n_cr": u_n_cr,
+            "p_n_cr": p_n_cr,
+            "tau_n_pcr": tau_n_pcr,
+            "tau_uncr_2": tau_uncr_2,
+            "u_s_cr": u_s_cr,
+            "p_s_cr": p_s_cr,
+            "tau_s_pcr": tau_s_pcr,
+            "tau_uscr_2": tau_uscr_2,
+            "grad_uncr": grad_uncr,
+            "grad_uscr": grad_uscr,
+            "ez_crust": self.ez,
+            "F_mf": mutual_friction.force,
+            "omega_s": mutual_friction.omega_s,
+            "x_s": X_S,
+            "x_n": X_N,
+            "uang": uang,
+            "shear_stress_n_cr": d3.angular(d3.radial(strain_rate_n(r=ri), index=1)),
+            "shear_stress_s_cr_i": d3.angular(d3.radial(strain_rate_s(r=ri), index=1)),
+            "shear_stress_s_cr_o": d3.angular(d3.radial(strain_rate_s(r=ro), index=1)),
+            "lift_crust": self.lift,
+            "Ri": ri,
+            "Ro": ro,
+            "Ek": params["Ek"],
+            "u_n_phi": d3.DotProduct(u_n_cr, self.ephi),
+        }
+
+    def _equations(self, params: dict[str, Any]) -> list[str]:
+        linear = params.get("linear", False)
+        return [
+            "trace(grad_uncr) + tau_n_pcr = 0",
+            "trace(grad_uscr) + tau_s_pcr = 0",
+            "integ(p_n_cr) = 0",
+            "integ(p_s_cr) = 0",
+            (
+                "dt(u_n_cr) - Ek*div(grad_uncr) + grad(p_n_cr) "
+                f"+ lift_crust(tau_uncr_2) ={advection('u_n_cr', linear=linear)} -"
+                " 2*cross(ez_crust,u_n_cr) + x_s/x_n * F_mf"
+            ),
+            (
+                "dt(u_s_cr) + grad(p_s_cr) + lift_crust(tau_uscr_2) ="
+                f"{advection('u_s_cr', linear=linear)} - F_mf"
+                " - 2*cross(ez_crust, u_s_cr)"
+            ),
+            "radial(u_n_cr(r=Ro)) = 0",
+            "angular(u_n_cr(r=Ro)) = angular(uang)",
+            "radial(u_s_cr(r=Ro)) = 0",
+            "shear_stress_s_cr_o = 0",
+            "radial(u_n_cr(r=Ri)) = 0",
+            "shear_stress_n_cr = 0",
+            "radial(u_s_cr(r=Ri)) = 0",
+            "shear_stress_s_cr_i = 0",
+        ]
+
+    def _initial_state(self, namespace: dict[str, Any], params: dict[str, Any]) -> None:
+        for name, seed in (("u_n_cr", 42), ("u_s_cr", 67)):
+            namespace[name].fill_random(
+                "g", seed=seed, distribution="normal", scale=1e-10
+            )
+            namespace[name].low_pass_filter(scales=0.5)
+        if params.get("initial_condition") == "ekman":
+            add_ekman_layer(
+                namespace["u_n_cr"],
+                self.theta,
+                self.r,
+                delta_omega=params["Delta_Omega"],
+                radius=params["Ro"],
+                viscosity=params["Ek"],
+            )
+
+    def _outputs(
+        self,
+        solver: "dedalus.core.solvers.InitialValueSolver",
+        namespace: dict[str, Any],
+        params: dict[str, Any],
+        save_path: Path,
+        mode: str,
+    ) -> dict[str, Any]:
+        u_n, u_s = namespace["u_n_cr"], namespace["u_s_cr"]
+        az_avg = solver.evaluator.add_file_handler(
+            str(save_path / "AZ_avg_equator"), sim_dt=0.05, max_writes=100, mode=mode
+        )
+        az_avg.add_task(d3.DotProduct(self.er, u_n), name="u_n_r")
+        az_avg.add_task(d3.DotProduct(self.etheta, u_n), name="u_n_theta")
+        az_avg.add_task(self.az_avg(namespace["u_n_phi"]), name="u_n_phi")
+        az_avg.add_task(self.az_avg(d3.DotProduct(self.ephi, u_s)), name="u_s_phi")
+        slices = solver.evaluator.add_file_handler(
+            str(save_path / "slices"), sim_dt=0.025, max_writes=100, mode=mode
+        )
+        slices.add_task(
+            namespace["u_n_phi"](theta=np.pi / 2),
+            scales=params["dealias"],
+            name="u_n_phi(equator)",
+        )
+        return {"AZ_avg": az_avg, "slices": slices}
+
+    def _flow_properties(
+        self,
+        flow: d3.GlobalFlowProperty,
+        namespace: dict[str, Any],
+        params: dict[str, Any],
+    ) -> None:
+        u_n, u_s = namespace["u_n_cr"], namespace["u_s_cr"]
+        omega_s = namespace["omega_s"]
+        flow.add_property(np.sqrt(u_n @ u_n) * params["Ek"], name="Re_n")
+        flow.add_property(np.sqrt(omega_s @ omega_s), name="vorticity_mag")
+        flow.add_property(
+            self.rsintheta
+            * (
+                X_N * d3.DotProduct(self.ephi, u_n)
+                + X_S * d3.DotProduct(self.ephi, u_s)
+            ),
+            name="L_z",
+        )
+
+
+class CrustCoreSpinUp(SpinUpBuilder):
+    """Spin-up of a viscous crust coupled to a core (scripts/crust_core.py)."""
+
+    sim_name = "crust_core"
+    default_params = shell_params
+    setup_params = ("Nphi", "Ntheta", "Nr", "dealias", "Ri", "Ro")
+    lhs_params = ("Ek", "Ri", "Ro", "dealias")
+    velocities = ("u_b", "u_s")
+    track = staticmethod(track_reynolds_n)
+    cfl_safety = 0.5
+
+    def _build_bases(self) -> None:
+        ri = self.params["Ri"]
+        self.core = SphericalBasis(
+            self.coords, self.dist, self.dtype, ri, **self.params
+        )
+        self.crust = ShellBasis(self.coords, self.dist, self.dtype, **self.params)
+        shell, ball = self.crust.shell, self.core.ball
+
+        _, self.theta_s, self.r_s = self.dist.local_grids(shell)
+        theta_s, r_s = self.theta_s, self.r_s
+        self.ez_s = self.dist.VectorField(self.coords, bases=shell)
+        self.ez_s["g"][1] = -np.sin(theta_s)
+        self.ez_s["g"][2] = np.cos(theta_s)
+        self.rvec_s = self.dist.VectorField(self.coords, bases=shell.radial_basis)
+        self.rvec_s["g"][2] = r_s
+        self.stheta_s = self.dist.Field(name="stheta", bases=shell)
+        self.stheta_s["g"] = np.sin(theta_s)
+        self.rstheta_s = self.dist.Field(name="rstheta", bases=shell)
+        self.rstheta_s["g"] = r_s * np.sin(theta_s)
+        self.lift_basis_s = shell.derivative_basis(1)
+
+        _, theta_b, r_b = self.dist.local_grids(ball)
+        self.ez_b = self.dist.VectorField(self.coords, bases=ball)
+        self.ez_b["g"][1] = -np.sin(theta_b)
+        self.ez_b["g"][2] = np.cos(theta_b)
+        self.rvec_b = self.dist.VectorField(self.coords, bases=ball.radial_basis)
+        self.rvec_b["g"][2] = r_b
+
+    def lift_s(self, a: d3.Field) -> d3.Field:
+        """Lift operand to the first derivative basis of the crust."""
+        return d3.Lift(a, self.lift_basis_s, -1)
+
+    def lift_b(self, a: d3.Field) -> d3.Field:
+        """Lift operand to the core basis."""
+        return d3.Lift(a, self.core.ball, -1)
+
+    def _namespace(self, params: dict[str, Any]) -> tuple[list, dict[str, Any]]:
+        dist, coords = self.dist, self.coords
+        ball, sphere = self.core.ball, self.core.sphere
+        shell, surface = self.crust.shell, self.crust.surface
+        u_b = dist.VectorField(coords, name="u_b", bases=ball)
+        p_b = dist.Field(name="p_b", bases=ball)
+        tau_p_b = dist.Field(name="tau_p_b")
+        tau_u_b_1 = dist.VectorField(coords, name="tau_u_b_1", bases=sphere)
+        tau_u_b_2 = dist.VectorField(coords, name="tau_u_b_2", bases=sphere)
+        u_s = dist.VectorField(coords, name="u_s", bases=shell)
+        p_s = dist.Field(name="p_s", bases=shell)
+        tau_p_s = dist.Field(name="tau_p_s")
+        tau_u_s_1 = dist.VectorField(coords, name="tau_u_s_1", bases=surface)
+        tau_u_s_2 = dist.VectorField(coords, name="tau_u_s_2", bases=surface)
+
+        ri, ro = params["Ri"], params["Ro"]
+        grad_u_s = d3.grad(u_s) + self.rvec_s * self.lift_s(tau_u_s_1)
+        strain_s = grad_u_s + d3.trans(grad_u_s)
+        grad_u_b = d3.grad(u_b) + self.rvec_b * self.lift_b(tau_u_b_1)
+        strain_b = grad_u_b + d3.trans(grad_u_b)
+
+        uang_s = dist.VectorField(coords, bases=shell)(r=ro).evaluate()
+        uang_s["g"][0, :] = (params["Delta_Omega"] * self.stheta_s)(r=ro).evaluate()[
+            "g"
+        ]
+
+        variables = [
+            u_s,
+            p_s,
+            tau_p_s,
+            tau_u_s_1,
+            tau_u_s_2,
+            u_b,
+            p_b,
+            tau_p_b,
+            tau_u_b_2,
+        ]
+        return variables, {
+            "u_s": u_s,
+            "p_s": p_s,
+            "tau_p_s": tau_p_s,
+            "tau_u_s_2": tau_u_s_2,
+            "u_b": u_b,
+            "p_b": p_b,
+            "tau_p_b": tau_p_b,
+            "tau_u_b_2": tau_u_b_2,
+            "grad_u_s": grad_u_s,
+            "ez_s": self.ez_s,
+            "ez_b": self.ez_b,
+            "uang_s": uang_s,
+            "shear_stress_s_interface": d3.angular(d3.radial(strain_s(r=ri), index=1)),
+            "shear_stress_b_interface": d3.angular(d3.radial(strain_b(r=ri), index=1)),
+            "lift_s": self.lift_s,
+            "lift_b": self.lift_b,
+            "Ri": ri,
+            "Ro": ro,
+            "Ek_shell": params["Ek"] * (ro - ri) ** 2,
+            "Ek_ball": params["Ek"] * ri**2,
+            "u_s_phi": d3.DotProduct(u_s, self.ephi),
+        }
+
+    def _equations(self, params: dict[str, Any]) -> list[str]:
+        linear = params.get("linear", False)
+        return [
+            "trace(grad_u_s) + tau_p_s = 0",
+            "div(u_b) + tau_p_b = 0",
+            "integ(p_b) = 0",
+            "integ(p_s) = 0",
+            (
+                "dt(u_b) - Ek_ball*lap(u_b) + grad(p_b) + lift_b(tau_u_b_2) ="
+                f"{advection('u_b', linear=linear)} - 2*cross(ez_b, u_b)"
+            ),
+            (
+                "dt(u_s) - Ek_shell*div(grad_u_s) + grad(p_s) + lift_s(tau_u_s_2) ="
+                f"{advection('u_s', linear=linear)} - 2*cross(ez_s, u_s)"
+            ),
+            "radial(u_s(r=Ro)) = 0",
+            "angular(u_s(r=Ro)) = angular(uang_s)",
+            "radial(u_s(r=Ri)) = 0",
+            "shear_stress_s_interface = 0",
+            "radial(u_b(r=Ri)) = 0",
+            "angular(u_b(r=Ri)) = angular(u_s(r=Ri))",
+        ]
+
+    def _initial_state(self, namespace: dict[str, Any], params: dict[str, Any]) -> None:
+        for name, seed in (("u_s", 42), ("u_b", 67)):
+            namespace[name].fill_random(
+                "g", seed=seed, distribution="normal", scale=1e-10
+            )
+            namespace[name].low_pass_filter(scales=0.5)
+        if params.get("initial_condition") == "ekman":
+            add_ekman_layer(
+                namespace["u_s"],
+                self.theta_s,
+                self.r_s,
+                delta_omega=params["Delta_Omega"],
+                radius=params["Ro"],
+                viscosity=params["Ek"] * (params["Ro"] - params["Ri"]) ** 2,
+            )
+
+    def _outputs(
+        self,
+        solver: "dedalus.core.solvers.InitialValueSolver",
+        namespace: dict[str, Any],
+        params: dict[str, Any],  # noqa: ARG002
+        save_path: Path,
+        mode: str,
+    ) -> dict[str, Any]:
+        az_avg = solver.evaluator.add_file_handler(
+            str(save_path / "AZ_avg_equator"), sim_dt=0.05, max_writes=100, mode=mode
+        )
+        for name in ("u_b", "u_s"):
+            u = namespace[name]
+            for component, unit in (
+                ("r", self.er),
+                ("theta", self.etheta),
+                ("phi", self.ephi),
+            ):
+                az_avg.add_task(
+                    self.az_avg(d3.DotProduct(u, unit)), name=f"{name}_{component}"
+                )
+        return {"AZ_avg": az_avg}
+
+    def _flow_properties(
+        self,
+        flow: d3.GlobalFlowProperty,
+        namespace: dict[str, Any],
+        params: dict[str, Any],
+    ) -> None:
+        u_s = namespace["u_s"]
+        flow.add_property(np.sqrt(u_s @ u_s) * params["Ek"], name="Re_n")
+        flow.add_property(self.rstheta_s * namespace["u_s_phi"], name="L_z")
+
+
+def run_spin_up(
+    builder_class: type[SpinUpBuilder], params: dict[str, Any], logger: Logger
+) -> None:
+    """
+    Run one spin-up problem, as configured on the command line of a script.
+
+    The run is built by `builder_class`, then evolved with the run-time options of
+    `gains.utils.parsers.SimulationCLI`: rotated checkpoints, the wall-clock guard,
+    load-balance telemetry, steady-state detection, blow-up recovery, the
+    axisymmetry and nonlinearity checks, and profiling. The setup phases and the main
+    loop are timed (see `gains.utils.profile.PhaseTimer`).
+
+    :param builder_class: Builder of the problem.
+    :param params: Parameters of the run, from
+        `gains.utils.parsers.SimulationCLI.parse_args_and_get_params`.
+    :param logger: Logger used by the script.
+    """
+    output_dir = params["output_dir"]
+    memory = MemoryTracker(
+        output_dir,
+        logger,
+        enabled=params["profile_memory"],
+        tracemalloc_top=params["profile_tracemalloc"],
+    )
+    timers = PhaseTimer(output_dir, logger)
+
+    with timers.phase("bases"):
+        builder = builder_class(params)
+    memory.mark("bases")
+    logger.info(f"running on processor mesh={builder.mesh}")
+
+    run = builder.build(
+        logger=logger,
+        output_dir=output_dir,
+        checkpoint=params["checkpoint_path"] if params["use_checkpoint"] else None,
+        matrix_cache=params["matrix_cache"],
+        timers=timers,
+        memory=memory,
+    )
+    with timers.phase("outputs"):
+        # Checkpoints, rotated under the output directory
+        checkpoints = CheckpointManager(
+            run.solver,
+            output_dir,
+            cadence=params["checkpoint_cadence"],
+            keep=params["checkpoint_keep"],
+        )
+
+    # Stop cleanly before the wall-time budget runs out, or when the scheduler asks to
+    guard = WallClockGuard(
+        output_dir,
+        wall_time=params["wall_time"],
+        margin=params["wall_time_margin"],
+        checkpoints=checkpoints,
+        catalog=params["catalog"],
+    )
+
+    # Per-rank timing of the main loop, to measure load imbalance
+    telemetry = (
+        LoadBalanceMonitor(
+            output_dir,
+            logger,
+            cadence=params["load_balance_cadence"],
+            mesh=builder.mesh,
+        )
+        if params["load_balance_cadence"]
+        else None
+    )
+
+    # Stop early once the spin-up has settled
+    steady_state = (
+        SteadyStateMonitor(
+            run.flow,
+            {"L_z": "volume_integral", "Re_n": "max"},
+            rtol=params["steady_rtol"],
+            window=params["steady_window"],
+            hold=params["steady_hold"],
+        )
+        if params["steady_rtol"]
+        else None
+    )
+
+    # Roll back to a recent state with a smaller timestep if the run blows up
+    recovery = (
+        BlowUpRecovery(
+            run.flow,
+            builder.blowup_property,
+            logger,
+            depth=params["rollback_depth"],
+            threshold=params["blowup_threshold"],
+        )
+        if params["rollback_depth"]
+        else None
+    )
+
+    # Check whether --axisymmetric or --linear would be accurate for this run
+    velocities = {name: run.namespace[name] for name in builder.velocities}
+    checks = []
+    if params["axisymmetry_check"] is not None:
+        checks.append(
+            AxisymmetryCheck(
+                run.flow,
+                add_axisymmetry_properties(run.flow, velocities),
+                output_dir,
+                logger,
+                tolerance=params["axisymmetry_check"],
+            )
+        )
+    if params["nonlinearity_check"] is not None:
+        checks.append(
+            NonlinearityCheck(
+                run.flow,
+                add_nonlinearity_properties(run.flow, velocities),
+                output_dir,
+                logger,
+                tolerance=params["nonlinearity_check"],
+            )
+        )
+
+    # Restrict profiling to part of the main loop, if requested
+    profile_window = ProfileWindow.from_params(params)
+
+    @profile(
+        params["profile"],
+        output_dir,
+        aggregate=params["profile_aggregate"],
+        mode=params["profile_mode"],
+        frequency=params["profile_frequency"],
+        window=profile_window,
+    )
+    @timers.phase("main_loop")
+    def evolve() -> None:
+        """Run the main loop, decorated with the profiling function."""
+        run.evolve(
+            logger,
+            guard=guard,
+            telemetry=telemetry,
+            steady_state=steady_state,
+            recovery=recovery,
+            memory=memory,
+            profile_window=profile_window,
+            checkpoints=checkpoints,
+            checks=checks,
+        )
+
+    evolve()
+    timers.report()
+
+
+# Builders by the name used on the command line.
+BUILDERS: dict[str, type[SpinUpBuilder]] = {
+    "single_fluid": SingleFluidSpinUp,
+    "two_fluid_sphere": TwoFluidSphereSpinUp,
+    "two_fluid_shell": TwoFluidShellSpinUp,
+    "crust_core": CrustCoreSpinUp,
+}
@@ -0,0 +1,74 @@
+"""Check that a 3D spin-up stays axisymmetric, so it could be run with Nphi=1."""
+
+from typing import TYPE_CHECKING
+
+from gains.utils.checks import ToleranceCheck
+
+if TYPE_CHECKING:
+    import dedalus
+    import dedalus.public as d3
+
+AXISYMMETRY_SUMMARY = "axisymmetry_check.json"
+
+
+def add_axisymmetry_properties(
+    flow: "d3.GlobalFlowProperty",
+    velocities: dict[str, "dedalus.core.field.Field"],
+) -> list[str]:
+    """
+    Add the total and non-axisymmetric kinetic energy density of velocities to a flow.
+
+    The non-axisymmetric part of each spherical component of a velocity is what is
+    left once its azimuthal average is removed.
+
+    :param flow: dedalus flow object of the run.
+    :param velocities: Velocity fields, by name. The fields may live on different
+        bases, e.g. the core and the crust.
+    :returns names: Names of the velocities, for `AxisymmetryCheck`. The properties
+        are named "E_kin_<name>" and "E_nonaxi_<name>".
+    """
+    import dedalus.public as d3  # noqa: PLC0415 (dedalus is only needed by scripts)
+
+    for name, u in velocities.items():
+        coords = u.tensorsig[0]
+        deviations = []
+        for axis in range(coords.dim):
+            unit = u.dist.VectorField(coords)
+            unit["g"][axis] = 1
+            component = d3.DotProduct(unit, u)
+            deviations.append(
+                (component - d3.Average(component, coords.coords[0])) ** 2
+            )
+        flow.add_property(u @ u, name=f"E_kin_{name}")
+        flow.add_property(sum(deviations[1:], deviations[0]), name=f"E_nonaxi_{name}")
+    return list(velocities)
+
+
+class AxisymmetryCheck(ToleranceCheck):
+    """
+    Track the fraction of the kinetic energy in non-axisymmetric modes of a 3D run.
+
+    The spin-up forcing and all outputs are axisymmetric, so a run with a single
+    azimuthal mode (`--axisymmetric`) is accurate as long as the non-axisymmetric
+    modes of the 3D run stay at noise level. The volume integrals of the energies
+    added by `add_axisymmetry_properties` are summed over the velocities, and their
+    ratio is sampled.
+    """
+
+    summary_file = AXISYMMETRY_SUMMARY
+    quantity = "fraction"
+    description = "non-axisymmetric fraction of the kinetic energy"
+    passed_note = ": --axisymmetric is accurate for this run."
+    failed_note = ": the run is not axisymmetric."
+
+    def sample(self, solver: "dedalus.core.solvers.InitialValueSolver") -> None:
+        """
+        Sample the non-axisymmetric fraction of the energy.
+
+        :param solver: The IVP solver defined by the script.
+        """
+        total = sum(self.flow.volume_integral(f"E_kin_{u}") for u in self.velocities)
+        nonaxisymmetric = sum(
+            self.flow.volume_integral(f"E_nonaxi_{u}") for u in self.velocities
+        )
+        self.add_sample(solver.sim_time, nonaxisymmetric, total)
@@ -0,0 +1,163 @@
+"""Accuracy and cost of time-integration settings, measured against a reference run."""
+
+import time
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+from mpi4py import MPI
+
+if TYPE_CHECKING:
+    import dedalus
+
+    from gains.problems.spin_up import SpinUpRun
+
+# Columns of the Pareto table: result entry, header, alignment, width and format.
+TABLE_COLUMNS = (
+    ("timestepper", "timestepper", "<", 12, ""),
+    ("safety", "safety", ">", 7, ".2f"),
+    ("max_timestep", "max dt", ">", 8, ".1e"),
+    ("iterations", "iterations", ">", 10, "d"),
+    ("cost", "core-s/time", ">", 12, ".4g"),
+    ("error", "error", ">", 10, ".3e"),
+)
+
+
+def snapshot_state(
+    solver: "dedalus.core.solvers.InitialValueSolver",
+) -> dict[str, np.ndarray]:
+    """
+    Copy the local coefficients of the state of a solver.
+
+    :param solver: The IVP solver.
+    :returns state: Coefficients of each state field on this rank, by name.
+    """
+    return {field.name: np.copy(field["c"]) for field in solver.state}
+
+
+def state_error(
+    state: dict[str, np.ndarray],
+    reference: dict[str, np.ndarray],
+    comm: MPI.Comm = MPI.COMM_WORLD,
+) -> float:
+    """
+    Compute the relative L2 error of a state, over all its fields and all ranks.
+
+    Both states must have the same resolution and distribution, e.g. both taken from
+    solvers built by the same `gains.problems.spin_up` builder.
+
+    :param state: Local coefficients of each field, as from `snapshot_state`.
+    :param reference: Local coefficients of the reference state.
+    :param comm: Communicator the simulations run on.
+    :returns error: Norm of the difference over the norm of the reference.
+    """
+    local = np.array(
+        [
+            sum(
+                np.sum(np.abs(state[name] - ref) ** 2)
+                for name, ref in reference.items()
+            ),
+            sum(np.sum(np.abs(ref) ** 2) for ref in reference.values()),
+        ]
+    )
+    difference, norm = comm.allreduce(local, op=MPI.SUM)
+    return float(np.sqrt(difference / norm)) if norm > 0 else float(np.sqrt(difference))
+
+
+def integrate_to(
+    run: "SpinUpRun",
+    times: Sequence[float],
+    comm: MPI.Comm = MPI.COMM_WORLD,
+) -> tuple[list[dict[str, np.ndarray]], float]:
+    """
+    Step a run through each of the given output times, taking a snapshot at each.
+
+    Timesteps are set by the CFL condition of the run, but shortened to land exactly
+    on each output time. Integration stops early, with fewer snapshots, if the state
+    stops being finite.
+
+    :param run: The run to step, from a `gains.problems.spin_up` builder.
+    :param times: Increasing simulation times at which to take snapshots.
+    :param comm: Communicator the simulation runs on.
+    :returns snapshots: State at each output time reached, as from `snapshot_state`.
+    :returns wall_time: Wall time spent stepping.
+    """
+    solver = run.solver
+    snapshots = []
+    start = time.monotonic()
+    for t in times:
+        while t - solver.sim_time > 1e-12 * max(abs(t), 1.0):
+            solver.step(min(run.cfl.compute_timestep(), t - solver.sim_time))
+        state = snapshot_state(solver)
+        finite = all(np.isfinite(data).all() for data in state.values())
+        if not comm.allreduce(finite, op=MPI.LAND):
+            break
+        snapshots.append(state)
+    return snapshots, time.monotonic() - start
+
+
+def max_error(
+    snapshots: Sequence[dict[str, np.ndarray]],
+    references: Sequence[dict[str, np.ndarray]],
+    comm: MPI.Comm = MPI.COMM_WORLD,
+) -> float:
+    """
+    Compute the largest error over the output times of a run.
+
+    :param snapshots: State at each output time reached by the run.
+    :param references: Reference state at every output time.
+    :param comm: Communicator the simulations run on.
+    :returns error: Largest `state_error` over the output times, infinite if the run
+        did not reach all of them.
+    """
+    if len(snapshots) < len(references):
+        return float("inf")
+    return max(
+        state_error(state, reference, comm)
+        for state, reference in zip(snapshots, references, strict=True)
+    )
+
+
+def pareto_front(results: Sequence[dict[str, Any]]) -> list[bool]:
+    """
+    Flag the results no other result beats on both cost and error.
+
+    :param results: Results with "cost" and "error" entries.
+    :returns optimal: Whether each result is on the Pareto front.
+    """
+    return [
+        not any(
+            other["cost"] <= result["cost"]
+            and other["error"] <= result["error"]
+            and (other["cost"] < result["cost"] or other["error"] < result["error"])
+            for other in results
+        )
+        for result in results
+    ]
+
+
+def pareto_table(results: Sequence[dict[str, Any]]) -> str:
+    """
+    Format results as a table sorted by cost, marking the Pareto-optimal ones.
+
+    :param results: Results with an entry for each of `TABLE_COLUMNS`.
+    :returns table: The table, one line per result after a header line. Results on
+        the Pareto front are marked with an asterisk.
+    """
+    optimal = pareto_front(results)
+    rows = sorted(zip(results, optimal, strict=True), key=lambda row: row[0]["cost"])
+    lines = [
+        "  "
+        + " ".join(
+            f"{header:{align}{width}}" for _, header, align, width, _ in TABLE_COLUMNS
+        )
+    ]
+    lines.extend(
+        ("* " if is_optimal else "  ")
+        + " ".join(
+            f"{result[name]:{align}{width}{fmt}}"
+            for name, _, align, width, fmt in TABLE_COLUMNS
+        )
+        for result, is_optimal in rows
+    )
+    return "\n".join(lines)
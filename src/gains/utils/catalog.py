@@ -0,0 +1,273 @@
+"""A local SQLite catalog of simulation runs, their parameters and outcomes."""
+
+import json
+import re
+import sqlite3
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from datetime import datetime
+from numbers import Number
+from pathlib import Path
+from typing import Any
+
+# Name of the catalog file, placed by default under the directory holding all outputs.
+CATALOG_FILE = "catalog.sqlite"
+
+# Columns of the runs table that can be filtered on directly. Any other name in a
+# filter is looked up among the parameters of the runs.
+RUN_COLUMNS = (
+    "id",
+    "output_dir",
+    "sim_name",
+    "script",
+    "status",
+    "started",
+    "updated",
+    "sim_time",
+    "iteration",
+    "timestep",
+    "wall_time",
+    "runs",
+    "checkpoint",
+)
+
+OPERATORS = ("<=", ">=", "!=", "=", "<", ">")
+_FILTER = re.compile(r"^\s*(\w+)\s*(<=|>=|!=|=|<|>)\s*(.*?)\s*$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    output_dir TEXT UNIQUE NOT NULL,
+    sim_name TEXT,
+    script TEXT,
+    status TEXT,
+    started TEXT,
+    updated TEXT,
+    sim_time REAL,
+    iteration INTEGER,
+    timestep REAL,
+    wall_time REAL DEFAULT 0,
+    runs INTEGER DEFAULT 0,
+    checkpoint TEXT,
+    params TEXT
+);
+CREATE TABLE IF NOT EXISTS params (
+    run_id INTEGER REFERENCES runs(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value_real REAL,
+    value_text TEXT,
+    PRIMARY KEY (run_id, name)
+);
+CREATE INDEX IF NOT EXISTS runs_sim_name ON runs(sim_name);
+CREATE INDEX IF NOT EXISTS runs_status ON runs(status);
+CREATE INDEX IF NOT EXISTS params_real ON params(name, value_real);
+CREATE INDEX IF NOT EXISTS params_text ON params(name, value_text);
+"""
+
+
+def _now() -> str:
+    """Return the current local time, as stored in the catalog."""
+    return datetime.now().astimezone().isoformat()
+
+
+def _parse_value(text: str) -> float | str:
+    """Read a filter value as a number if possible, and as text otherwise."""
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def parse_filter(spec: str) -> tuple[str, str, float | str]:
+    """
+    Parse a filter on runs from the command line, e.g. "Ek<1e-3" or "status=failed".
+
+    :param spec: Filter of the form NAME OP VALUE, where OP is one of `OPERATORS`.
+    :returns name: Run column or parameter name.
+    :returns op: Comparison operator.
+    :returns value: Value compared with, as a number where possible.
+    """
+    match = _FILTER.match(spec)
+    if match is None:
+        msg = f"expected a filter of the form NAME<OP>VALUE, got {spec!r}"
+        raise ValueError(msg)
+    name, op, value = match.groups()
+    return name, op, _parse_value(value)
+
+
+class RunCatalog:
+    """
+    Registry of runs, keyed by their output directory.
+
+    Each run has one row in the `runs` table, holding its status, timings and final
+    solver state, and one row per parameter in the `params` table, indexed by name
+    and value so that runs can be selected by their parameters without reading any
+    output files. A run restarted in the same output directory updates its existing
+    row, accumulating its wall time and number of invocations.
+
+    Connections are short-lived and wait for locks, so that many runs of a sweep can
+    share one catalog.
+    """
+
+    def __init__(self, path: Path | str, *, timeout: float = 30.0) -> None:
+        """
+        Open the catalog, creating it if needed.
+
+        :param path: Path to the SQLite file.
+        :param timeout: Seconds to wait for another process to release the database.
+        """
+        self.path = Path(path)
+        self.timeout = timeout
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection, committing on success and closing it afterwards."""
+        db = sqlite3.connect(self.path, timeout=self.timeout)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA foreign_keys = ON")
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def register(
+        self,
+        output_dir: Path | str,
+        params: dict[str, Any],
+        *,
+        sim_name: str | None = None,
+        script: str | None = None,
+    ) -> int:
+        """
+        Record the start of a run, or the restart of a known run.
+
+        :param output_dir: Output directory of the run, which identifies it.
+        :param params: Parameters of the run.
+        :param sim_name: Name of the simulation (e.g. "two_fluid_spin_up").
+        :param script: Path to the script that was run.
+        :returns run_id: Identifier of the run in the catalog.
+        """
+        output_dir = str(Path(output_dir).resolve())
+        now = _now()
+        with self._connect() as db:
+            db.execute(
+                "INSERT INTO runs (output_dir, sim_name, script, status, started,"
+                " updated, runs, params) VALUES (?, ?, ?, 'running', ?, ?, 1, ?)"
+                " ON CONFLICT(output_dir) DO UPDATE SET status = 'running',"
+                " updated = excluded.updated, runs = runs.runs + 1,"
+                " params = excluded.params",
+                (
+                    output_dir,
+                    sim_name,
+                    script,
+                    now,
+                    now,
+                    json.dumps(params, default=str),
+                ),
+            )
+            (run_id,) = db.execute(
+                "SELECT id FROM runs WHERE output_dir = ?", (output_dir,)
+            ).fetchone()
+            db.execute("DELETE FROM params WHERE run_id = ?", (run_id,))
+            db.executemany(
+                "INSERT INTO params (run_id, name, value_real, value_text)"
+                " VALUES (?, ?, ?, ?)",
+                [
+                    (
+                        run_id,
+                        name,
+                        float(value) if isinstance(value, Number) else None,
+                        value
+                        if isinstance(value, str)
+                        else json.dumps(value, default=str),
+                    )
+                    for name, value in params.items()
+                ],
+            )
+        return run_id
+
+    def update(
+        self,
+        output_dir: Path | str,
+        status: str,
+        *,
+        sim_time: float | None = None,
+        iteration: int | None = None,
+        timestep: float | None = None,
+        elapsed: float = 0.0,
+        checkpoint: str | None = None,
+    ) -> None:
+        """
+        Record how a run ended.
+
+        :param output_dir: Output directory of the run.
+        :param status: "interrupted", "completed" or "failed".
+        :param sim_time: Final simulation time.
+        :param iteration: Final solver iteration.
+        :param timestep: Last timestep taken.
+        :param elapsed: Wall time of this invocation, added to that of earlier ones.
+        :param checkpoint: Newest checkpoint of the run.
+        """
+        with self._connect() as db:
+            db.execute(
+                "UPDATE runs SET status = ?, updated = ?, sim_time = ?, iteration = ?,"
+                " timestep = ?, wall_time = wall_time + ?, checkpoint = ?"
+                " WHERE output_dir = ?",
+                (
+                    status,
+                    _now(),
+                    sim_time,
+                    iteration,
+                    timestep,
+                    elapsed,
+                    checkpoint,
+                    str(Path(output_dir).resolve()),
+                ),
+            )
+
+    def query(
+        self, filters: Sequence[tuple[str, str, float | str]] = ()
+    ) -> list[dict[str, Any]]:
+        """
+        Select runs matching all of the given filters.
+
+        :param filters: (name, operator, value) triples, e.g. from `parse_filter`.
+            Names in `RUN_COLUMNS` compare the run record, any other name compares
+            the parameter of that name; runs without the parameter never match.
+        :returns runs: Matching run records, oldest first, with their parameters
+            under "params".
+        """
+        joins: list[str] = []
+        join_values: list[Any] = []
+        conditions: list[str] = []
+        values: list[Any] = []
+        for i, (name, op, value) in enumerate(filters):
+            if op not in OPERATORS:
+                msg = f"unknown operator {op!r}"
+                raise ValueError(msg)
+            if name in RUN_COLUMNS:
+                conditions.append(f"runs.{name} {op} ?")
+                values.append(value)
+            else:
+                column = "value_real" if isinstance(value, Number) else "value_text"
+                joins.append(
+                    f"JOIN params p{i} ON p{i}.run_id = runs.id AND p{i}.name = ?"
+                    f" AND p{i}.{column} {op} ?"
+                )
+                join_values.extend([name, value])
+
+        sql = " ".join(
+            [
+                "SELECT runs.* FROM runs",
+                *joins,
+                f"WHERE {' AND '.join(conditions)}" if conditions else "",
+                "ORDER BY runs.id",
+            ]
+        )
+        with self._connect() as db:
+            rows = db.execute(sql, [*join_values, *values]).fetchall()
+        return [{**dict(row), "params": json.loads(row["params"])} for row in rows]
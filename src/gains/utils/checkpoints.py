@@ -0,0 +1,230 @@
+"""Rotating checkpoints, written atomically under the output directory of a run."""
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import h5py
+import numpy as np
+from mpi4py import MPI
+
+from gains.exceptions import CoefficientLayoutError
+from gains.utils.misc import extract_numerical_suffix
+
+if TYPE_CHECKING:
+    # Kept out of the runtime imports, so the CLI can find checkpoints without dedalus.
+    import dedalus
+
+# Directory, under the output directory of a run, holding its checkpoints.
+CHECKPOINT_DIR = "checkpoints"
+# Directory, under `CHECKPOINT_DIR`, that dedalus writes checkpoints into.
+STAGING_DIR = "staging"
+CHECKPOINT_NAME = "checkpoint"
+
+
+def is_valid_checkpoint(path: Path | str) -> bool:
+    """
+    Check that a checkpoint file is complete enough to restart from.
+
+    :param path: Path to a dedalus checkpoint set.
+    :returns valid: Whether the file can be opened and holds at least one write of
+        at least one task.
+    """
+    try:
+        with h5py.File(path, "r") as f:
+            return len(f["tasks"]) > 0 and f["scales"]["sim_time"].shape[0] > 0
+    except (OSError, KeyError):
+        return False
+
+
+def checkpoint_sets(checkpoint_dir: Path | str) -> list[Path]:
+    """
+    List the checkpoint sets in a directory, oldest first.
+
+    :param checkpoint_dir: Directory holding `<name>_s<N>.h5` checkpoint sets.
+    :returns sets: Paths to the sets, ordered by set number.
+    """
+    return sorted(Path(checkpoint_dir).glob("*_s*.h5"), key=extract_numerical_suffix)
+
+
+def latest_valid_checkpoint(checkpoint_dir: Path | str) -> Path | None:
+    """
+    Find the newest checkpoint in a directory that can be restarted from.
+
+    :param checkpoint_dir: Directory holding `<name>_s<N>.h5` checkpoint sets.
+    :returns path: Path to the valid set with the highest set number, or None if
+        there is none.
+    """
+    return next(
+        (
+            path
+            for path in reversed(checkpoint_sets(checkpoint_dir))
+            if is_valid_checkpoint(path)
+        ),
+        None,
+    )
+
+
+class CheckpointManager:
+    """
+    Write checkpoints at a fixed wall-clock cadence, keeping only the newest few.
+
+    Checkpoints are written by a dedalus file handler (gathered to rank 0) into a
+    staging directory. Once a write has finished, rank 0 checks the file and moves it
+    into `CHECKPOINT_DIR` under the output directory with an atomic rename, numbering
+    the sets consecutively across restarts. A job killed mid-write therefore leaves
+    at most an incomplete file in the staging directory, never in `CHECKPOINT_DIR`.
+    Only the `keep` newest checkpoints are kept.
+    """
+
+    def __init__(
+        self,
+        solver: "dedalus.core.solvers.InitialValueSolver",
+        output_dir: Path | str,
+        *,
+        cadence: float = 3600,
+        keep: int = 3,
+        comm: MPI.Comm = MPI.COMM_WORLD,
+    ) -> None:
+        """
+        Add the checkpoint handler to the solver.
+
+        :param solver: The IVP solver defined by the script.
+        :param output_dir: Output directory of the run.
+        :param cadence: Wall-clock seconds between checkpoints.
+        :param keep: Number of checkpoints to keep.
+        :param comm: Communicator the simulation runs on.
+        """
+        self.directory = Path(output_dir) / CHECKPOINT_DIR
+        self.keep = keep
+        self.comm = comm
+
+        self.handler = solver.evaluator.add_file_handler(
+            str(self.directory / STAGING_DIR / CHECKPOINT_NAME),
+            wall_dt=cadence,
+            max_writes=1,
+            parallel="gather",
+            mode="overwrite",
+        )
+        # Stored as coefficients, so their spectra can be checked after the fact
+        # (see `gains.analysis.resolution.check_resolution`)
+        self.handler.add_tasks(solver.state, layout="c")
+
+        self._writes = 0
+
+    @property
+    def latest(self) -> Path | None:
+        """Newest valid checkpoint of the run."""
+        return latest_valid_checkpoint(self.directory)
+
+    def update(self) -> None:
+        """
+        Move checkpoints written since the last call into place, and rotate them.
+
+        Only does any work on rank 0, and only after the handler has written, so it
+        can be called on every iteration.
+        """
+        if self.handler.total_write_num == self._writes:
+            return
+        self._writes = self.handler.total_write_num
+        if self.comm.rank != 0:
+            return
+
+        sets = checkpoint_sets(self.directory)
+        number = extract_numerical_suffix(sets[-1]) if sets else 0
+        for staged in checkpoint_sets(self.handler.base_path):
+            if not is_valid_checkpoint(staged):
+                continue
+            number += 1
+            staged.replace(self.directory / f"{CHECKPOINT_NAME}_s{number}.h5")
+
+        for old in checkpoint_sets(self.directory)[: -self.keep]:
+            old.unlink()
+
+    def write(
+        self,
+        solver: "dedalus.core.solvers.InitialValueSolver",
+        timestep: float,
+    ) -> Path | None:
+        """
+        Write a checkpoint now, regardless of the cadence.
+
+        Must be called by all ranks.
+
+        :param solver: The IVP solver defined by the script.
+        :param timestep: Current timestep, stored with the checkpoint.
+        :returns path: The new checkpoint on rank 0, None on all other ranks.
+        """
+        solver.evaluate_handlers([self.handler], dt=timestep)
+        self.update()
+        return self.latest if self.comm.rank == 0 else None
+
+
+def resize_coefficients(coeffs: np.ndarray, shape: tuple[int, ...]) -> np.ndarray:
+    """
+    Pad or truncate spectral coefficients to a new resolution.
+
+    Coefficients are indexed by mode number along each axis, for the Fourier, SWSH,
+    Zernike and Chebyshev bases alike, so modes present at both resolutions keep
+    their values, new modes are zero and modes beyond the new resolution are
+    dropped. Padding is therefore exact spectral interpolation onto the finer grid.
+
+    :param coeffs: Coefficients, with any tensor components leading.
+    :param shape: New shape, with the same number of dimensions.
+    :returns resized: Coefficients at the new resolution.
+    """
+    resized = np.zeros(shape, dtype=coeffs.dtype)
+    common = tuple(
+        slice(0, min(old, new)) for old, new in zip(coeffs.shape, shape, strict=True)
+    )
+    resized[common] = coeffs[common]
+    return resized
+
+
+def load_checkpoint(
+    solver: "dedalus.core.solvers.InitialValueSolver",
+    path: Path | str,
+    index: int = -1,
+) -> tuple[int, float]:
+    """
+    Load the solver state from a checkpoint, at any resolution or processor count.
+
+    Checkpoints matching the resolution of the solver are loaded by dedalus. Others
+    must have been written in coefficient space and gathered into a single file, as
+    `CheckpointManager` does. The global coefficients of each state field are then
+    padded or truncated to the resolution of the solver (see
+    `resize_coefficients`), and each rank keeps its own part. This allows a run to be
+    continued at a higher resolution, e.g. after its early transients were computed
+    at a coarse one, or on a different number of processes.
+
+    :param solver: The IVP solver, whose state is set.
+    :param path: Path to the checkpoint file.
+    :param index: Index of the write to load.
+    :returns write: Write number of the loaded state.
+    :returns timestep: Timestep stored with the state.
+    """
+    with h5py.File(path, "r") as f:
+        tasks = f["tasks"]
+        shapes = {field.name: _coeff_shape(field) for field in solver.state}
+        if all(tasks[name].shape[1:] == shape for name, shape in shapes.items()):
+            return solver.load_state(path, index)
+
+        for field in solver.state:
+            dset = tasks[field.name]
+            if any(dset.attrs.get("grid_space", [False])):
+                raise CoefficientLayoutError(field.name)
+            coeffs = resize_coefficients(dset[index], shapes[field.name])
+            local = field.dist.coeff_layout.slices(field.domain, scales=1)
+            field["c"] = coeffs[(..., *local)]
+
+        scales = f["scales"]
+        solver.iteration = solver.initial_iteration = int(scales["iteration"][index])
+        solver.sim_time = solver.initial_sim_time = float(scales["sim_time"][index])
+        return int(scales["write_number"][index]), float(scales["timestep"][index])
+
+
+def _coeff_shape(field: "dedalus.core.field.Field") -> tuple[int, ...]:
+    """Global shape of the coefficients of a field, tensor components first."""
+    return (
+        *(cs.dim for cs in field.tensorsig),
+        *field.dist.coeff_layout.global_shape(field.domain, scales=1),
+    )
@@ -0,0 +1,140 @@
+"""Checks that a quantity sampled during a run stays below a tolerance."""
+
+import json
+from abc import ABC, abstractmethod
+from logging import Logger
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from mpi4py import MPI
+
+if TYPE_CHECKING:
+    import dedalus
+    import dedalus.public as d3
+
+
+class ToleranceCheck(ABC):
+    """
+    Track the largest value of a ratio of flow properties over a run.
+
+    Every `cadence` iterations, subclasses sample properties of the flow in `sample`
+    and pass them to `add_sample`. The largest ratio seen is compared with
+    `tolerance` when the run ends. Since the flow properties are global reductions,
+    all ranks hold the same values.
+
+    Subclasses set `summary_file`, the name of the ratio in the summary (`quantity`),
+    a `description` of it for the log, and what passing or failing means
+    (`passed_note`, `failed_note`).
+    """
+
+    summary_file: str
+    quantity: str
+    description: str
+    passed_note: str = "."
+    failed_note: str = "."
+
+    max_value: float
+    max_time: float | None
+
+    def __init__(
+        self,
+        flow: "d3.GlobalFlowProperty",
+        velocities: list[str],
+        output_dir: Path | str,
+        logger: Logger,
+        *,
+        tolerance: float,
+        cadence: int = 10,
+        comm: MPI.Comm = MPI.COMM_WORLD,
+    ) -> None:
+        """
+        Configure the check.
+
+        :param flow: dedalus flow object tracking the sampled properties.
+        :param velocities: Names of the velocities the properties were added for.
+        :param output_dir: Output directory of the run, where the summary is written.
+        :param logger: Logger used by the script.
+        :param tolerance: Largest acceptable value of the ratio.
+        :param cadence: Number of iterations between samples. Should be a multiple of
+            the cadence of `flow`.
+        :param comm: Communicator the simulation runs on.
+        """
+        self.flow = flow
+        self.velocities = velocities
+        self.output_dir = Path(output_dir)
+        self.logger = logger
+        self.tolerance = tolerance
+        self.cadence = cadence
+        self.comm = comm
+        self.max_value = 0.0
+        self.max_time = None
+
+    def update(self, solver: "dedalus.core.solvers.InitialValueSolver") -> None:
+        """
+        Sample the flow, if due.
+
+        Must be called by all ranks on every iteration.
+
+        :param solver: The IVP solver defined by the script.
+        """
+        if solver.iteration % self.cadence == 0:
+            self.sample(solver)
+
+    @abstractmethod
+    def sample(self, solver: "dedalus.core.solvers.InitialValueSolver") -> None:
+        """
+        Read the flow properties, and record them with `add_sample`.
+
+        :param solver: The IVP solver defined by the script.
+        """
+
+    def add_sample(self, sim_time: float, value: float, reference: float) -> None:
+        """
+        Record a value at one time, relative to a reference.
+
+        Samples with a reference of zero, e.g. a fluid at rest, are left out.
+
+        :param sim_time: Simulation time of the sample.
+        :param value: Size of the quantity being checked.
+        :param reference: Size it is compared with.
+        """
+        if reference <= 0:
+            return
+        ratio = value / reference
+        if ratio >= self.max_value:
+            self.max_value = ratio
+            self.max_time = sim_time
+
+    @property
+    def passed(self) -> bool:
+        """Whether the ratio has stayed below the tolerance."""
+        return self.max_value <= self.tolerance
+
+    def report(self) -> dict | None:
+        """
+        Log the outcome of the check, and write it to the output directory on rank 0.
+
+        :returns summary: The tolerance, the largest ratio and when it occurred, and
+            whether the check passed. None on ranks other than 0.
+        """
+        if self.comm.rank != 0:
+            return None
+        summary = {
+            "tolerance": self.tolerance,
+            f"max_{self.quantity}": self.max_value,
+            "max_time": self.max_time,
+            "passed": self.passed,
+        }
+        message = (
+            f"Largest {self.description} {self.max_value:.3e} (at Time={self.max_time})"
+        )
+        if self.passed:
+            self.logger.info(f"{message}, below {self.tolerance:.1e}{self.passed_note}")
+        else:
+            self.logger.warning(
+                f"{message}, above {self.tolerance:.1e}{self.failed_note}"
+            )
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        with (self.output_dir / self.summary_file).open("w") as f:
+            json.dump(summary, f, indent=2)
+        return summary
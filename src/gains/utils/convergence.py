@@ -0,0 +1,132 @@
+"""Detection of steady states, so runs can stop once the flow stops evolving."""
+
+from collections import deque
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import dedalus
+    import dedalus.public as d3
+
+
+def relative_change(values: np.ndarray) -> np.ndarray:
+    """
+    Compute the relative spread of each quantity over a window of samples.
+
+    :param values: Samples with shape (number of samples, number of quantities).
+    :returns change: (max - min) / max(|max|, |min|) per quantity. Quantities that
+        are identically zero over the window have a change of 0, and quantities with
+        a NaN or infinite sample, e.g. after a blow-up, an infinite change.
+    """
+    finite = np.isfinite(values).all(axis=0)
+    spread = values[:, finite].max(axis=0) - values[:, finite].min(axis=0)
+    scale = np.abs(values[:, finite]).max(axis=0)
+    change = np.full(values.shape[1], np.inf)
+    change[finite] = np.divide(
+        spread, scale, out=np.zeros_like(spread), where=scale > 0
+    )
+    return change
+
+
+class SteadyStateMonitor:
+    """
+    Watch global flow quantities and flag when they have stopped changing.
+
+    Every `cadence` iterations the chosen quantities are sampled from a dedalus
+    `GlobalFlowProperty`. The flow is considered steady once, over a sliding window
+    of `window` simulation time units, the relative change of every quantity is below
+    `rtol`, and the run should stop once it has stayed steady for `hold` further time
+    units. Since the flow properties are global reductions, all ranks reach the same
+    decision on the same iteration.
+    """
+
+    changes: np.ndarray | None
+    steady_since: float | None
+
+    def __init__(
+        self,
+        flow: "d3.GlobalFlowProperty",
+        quantities: dict[str, str],
+        *,
+        rtol: float,
+        window: float,
+        hold: float = 0.0,
+        cadence: int = 10,
+    ) -> None:
+        """
+        Configure the monitor.
+
+        :param flow: dedalus flow object tracking the watched properties.
+        :param quantities: Names of the flow properties to watch, mapped to the
+            `GlobalFlowProperty` reduction to apply to them ("max", "min",
+            "grid_average" or "volume_integral").
+        :param rtol: Tolerance on the relative change over the window.
+        :param window: Length in simulation time of the sliding window.
+        :param hold: Simulation time the tolerance must hold for before stopping.
+        :param cadence: Number of iterations between samples. Should be a multiple of
+            the cadence of `flow`.
+        """
+        self.flow = flow
+        self.quantities = quantities
+        self.rtol = rtol
+        self.window = window
+        self.hold = hold
+        self.cadence = cadence
+        self.changes = None
+        self.steady_since = None
+
+        self._samples: deque[tuple[float, np.ndarray]] = deque()
+
+    def reset(self) -> None:
+        """Forget all samples, e.g. after the run is rolled back to an earlier time."""
+        self._samples.clear()
+        self.changes = None
+        self.steady_since = None
+
+    def update(self, solver: "dedalus.core.solvers.InitialValueSolver") -> bool:
+        """
+        Sample the watched quantities, if due, and report whether to stop.
+
+        Must be called by all ranks on every iteration.
+
+        :param solver: The IVP solver defined by the script.
+        :returns stop: True once the flow has been steady for `hold` time units.
+        """
+        if solver.iteration % self.cadence != 0:
+            return False
+        values = np.array(
+            [
+                getattr(self.flow, reduction)(name)
+                for name, reduction in self.quantities.items()
+            ]
+        )
+        return self.add_sample(solver.sim_time, values)
+
+    def add_sample(self, sim_time: float, values: np.ndarray) -> bool:
+        """
+        Add a sample of the watched quantities to the window.
+
+        :param sim_time: Simulation time of the sample.
+        :param values: Value of each watched quantity, in the order of `quantities`.
+        :returns stop: True once the flow has been steady for `hold` time units. A NaN
+            or infinite sample is never steady, so a run that blows up is not stopped
+            as converged.
+        """
+        self._samples.append((sim_time, np.asarray(values, dtype=float)))
+        # Drop samples that are no longer needed to span the window
+        while len(self._samples) > 1 and self._samples[1][0] <= sim_time - self.window:
+            self._samples.popleft()
+
+        if sim_time - self._samples[0][0] < self.window:
+            self.steady_since = None
+            return False
+
+        self.changes = relative_change(np.array([v for _, v in self._samples]))
+        if np.any(self.changes > self.rtol):
+            self.steady_since = None
+            return False
+
+        if self.steady_since is None:
+            self.steady_since = sim_time
+        return sim_time - self.steady_since >= self.hold
@@ -0,0 +1,230 @@
+"""Least-damped modes of the linear spin-up, from its evolution over a fixed time."""
+
+from collections.abc import Callable, Sequence
+from logging import Logger
+from typing import TYPE_CHECKING
+
+import numpy as np
+from mpi4py import MPI
+
+from gains.utils.rollback import restart_timestepper
+
+if TYPE_CHECKING:
+    from gains.problems.spin_up import SpinUpRun
+
+# Default time over which the linear problem is propagated between Krylov vectors.
+# Frequencies are only recovered modulo 2 pi / period, and inertial modes have
+# frequencies up to twice the (unit) rotation rate, so the period must be below
+# pi / 2 to resolve them unambiguously.
+MODE_PERIOD = 1.0
+
+
+def arnoldi(
+    apply: Callable[[np.ndarray], np.ndarray],
+    start: np.ndarray,
+    n_krylov: int,
+    comm: MPI.Comm = MPI.COMM_WORLD,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Build an orthonormal basis of the Krylov space of a linear map.
+
+    Each rank holds its own slice of the vectors, and the inner products are reduced
+    over `comm`. The basis is orthogonalised twice at each step (modified
+    Gram-Schmidt), which keeps it orthonormal to rounding error. The iteration stops
+    early if the Krylov space is invariant.
+
+    :param apply: The linear map, acting on the local slice of a vector.
+    :param start: Local slice of the starting vector.
+    :param n_krylov: Largest dimension of the Krylov space.
+    :param comm: Communicator the vectors are distributed over.
+    :returns basis: Local slices of the m + 1 basis vectors, one per row, where m is
+        the dimension of the Krylov space reached.
+    :returns hessenberg: The (m + 1, m) upper Hessenberg matrix of the map in the
+        basis, such that apply(basis[:m].T) = basis.T @ hessenberg.
+    """
+
+    def dot(a: np.ndarray, b: np.ndarray) -> float:
+        return comm.allreduce(float(np.dot(a, b)), op=MPI.SUM)
+
+    basis = np.zeros((n_krylov + 1, start.size))
+    hessenberg = np.zeros((n_krylov + 1, n_krylov))
+    basis[0] = start / np.sqrt(dot(start, start))
+    for j in range(n_krylov):
+        w = apply(basis[j])
+        scale = np.sqrt(dot(w, w))
+        for _ in range(2):
+            for i in range(j + 1):
+                h = dot(basis[i], w)
+                hessenberg[i, j] += h
+                w -= h * basis[i]
+        hessenberg[j + 1, j] = np.sqrt(dot(w, w))
+        if hessenberg[j + 1, j] <= 1e-12 * scale:
+            hessenberg[j + 1, j] = 0.0
+            return basis[: j + 2], hessenberg[: j + 2, : j + 1]
+        basis[j + 1] = w / hessenberg[j + 1, j]
+    return basis, hessenberg
+
+
+def ritz_pairs(
+    basis: np.ndarray, hessenberg: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Approximate the eigenpairs of a linear map from its Krylov space.
+
+    :param basis: Local slices of the basis vectors, from `arnoldi`.
+    :param hessenberg: Hessenberg matrix of the map, from `arnoldi`.
+    :returns eigenvalues: Ritz values, by decreasing magnitude.
+    :returns vectors: Local slices of the corresponding Ritz vectors, one per row.
+    :returns residuals: Norm of the residual of each pair, relative to the magnitude
+        of its eigenvalue.
+    """
+    m = hessenberg.shape[1]
+    eigenvalues, y = np.linalg.eig(hessenberg[:m])
+    order = np.argsort(-np.abs(eigenvalues))
+    eigenvalues, y = eigenvalues[order], y[:, order]
+    residuals = (
+        np.abs(hessenberg[m, m - 1] * y[-1])
+        / np.linalg.norm(y, axis=0)
+        / np.maximum(np.abs(eigenvalues), np.finfo(float).tiny)
+    )
+    return eigenvalues, (basis[:m].T @ y).T, residuals
+
+
+def growth_rates(multipliers: np.ndarray, period: float) -> np.ndarray:
+    """
+    Convert eigenvalues of the evolution over a period into those of the generator.
+
+    :param multipliers: Eigenvalues of the map advancing the linear problem by
+        `period`.
+    :param period: Time the map advances the problem by.
+    :returns rates: Complex growth rates. The real part is minus the decay rate, and
+        the imaginary part the angular frequency, modulo 2 pi / period.
+    """
+    return np.log(np.asarray(multipliers, dtype=complex)) / period
+
+
+class LinearPropagator:
+    """
+    Advance a linear spin-up run by a fixed time, as a map on its velocities.
+
+    The vector the map acts on is the local coefficients of the velocity fields,
+    flattened and concatenated. The pressures and tau variables of the problem are
+    set to zero before each evolution, as they are fixed by the constraints.
+    """
+
+    def __init__(
+        self,
+        run: "SpinUpRun",
+        velocities: Sequence[str],
+        period: float,
+        timestep: float,
+        *,
+        logger: Logger,
+    ) -> None:
+        """
+        Configure the map.
+
+        :param run: A linear run, from a `gains.problems.spin_up` builder with
+            `"linear": True` and `"Delta_Omega": 0`.
+        :param velocities: Names of the velocity fields of the run.
+        :param period: Time the map advances the run by.
+        :param timestep: Largest timestep of the evolution. Reduced so that a whole
+            number of steps spans the period.
+        :param logger: Logger used by the script, warned if the timestepper cannot
+            be restarted (see `gains.utils.rollback.restart_timestepper`).
+        """
+        self.solver = run.solver
+        self.logger = logger
+        self.fields = [run.namespace[name] for name in velocities]
+        self.period = period
+        self.steps = max(1, int(np.ceil(period / timestep)))
+        self.timestep = period / self.steps
+        self._shapes = [field["c"].shape for field in self.fields]
+        self._sizes = [int(np.prod(shape)) for shape in self._shapes]
+
+    @property
+    def size(self) -> int:
+        """Length of the local slice of the vectors the map acts on."""
+        return sum(self._sizes)
+
+    def get_state(self) -> np.ndarray:
+        """Return the local coefficients of the velocities, as one vector."""
+        return np.concatenate([np.ravel(field["c"]) for field in self.fields])
+
+    def set_state(self, vector: np.ndarray) -> None:
+        """Set the local coefficients of the velocities, and zero the other fields."""
+        for field in self.solver.state:
+            field["c"] = 0
+        chunks = np.split(vector, np.cumsum(self._sizes)[:-1])
+        for field, chunk, shape in zip(self.fields, chunks, self._shapes, strict=True):
+            field["c"] = chunk.reshape(shape)
+
+    def __call__(self, vector: np.ndarray) -> np.ndarray:
+        """
+        Advance the velocities by the period.
+
+        :param vector: Local coefficients of the velocities.
+        :returns vector: Local coefficients of the velocities one period later.
+        """
+        self.set_state(vector)
+        self.solver.sim_time = 0.0
+        # Restart multistep schemes at first order, as their history is unrelated
+        restart_timestepper(self.solver, self.logger)
+        for _ in range(self.steps):
+            self.solver.step(self.timestep)
+        return self.get_state()
+
+
+def least_damped_modes(
+    propagator: Callable[[np.ndarray], np.ndarray],
+    start: np.ndarray,
+    period: float,
+    *,
+    n_modes: int = 6,
+    n_krylov: int = 40,
+    comm: MPI.Comm = MPI.COMM_WORLD,
+) -> tuple[list[dict[str, float]], np.ndarray]:
+    """
+    Find the least-damped modes of a linear problem from its evolution.
+
+    The modes of the linear problem with growth rate s are the eigenvectors of its
+    evolution over the period with eigenvalue exp(s period). The exponential maps
+    the least-damped modes to the eigenvalues of largest magnitude and squeezes the
+    strongly damped ones towards zero, so the Arnoldi iteration converges on the
+    former first, without assembling or factorising the operator. The propagator
+    acts on real states, so oscillatory modes come in complex-conjugate pairs; only
+    one of each pair is returned, with a non-negative frequency.
+
+    :param propagator: Map advancing the local slice of a state by `period`, e.g. a
+        `LinearPropagator`.
+    :param start: Local slice of the starting vector. It is propagated once before
+        the iteration, so that the Krylov space satisfies the constraints of the
+        problem.
+    :param period: Time `propagator` advances the state by.
+    :param n_modes: Number of modes to return.
+    :param n_krylov: Largest dimension of the Krylov space. Increase it if the
+        residuals of the modes are too large.
+    :param comm: Communicator the states are distributed over.
+    :returns modes: For each mode, by increasing decay rate, its "decay_rate",
+        non-negative angular "frequency" and relative "residual".
+    :returns vectors: Local slices of the (complex) state of each mode, one per row.
+    """
+    basis, hessenberg = arnoldi(propagator, propagator(start), n_krylov, comm)
+    multipliers, vectors, residuals = ritz_pairs(basis, hessenberg)
+    # Drop the conjugate of each oscillatory mode
+    selected = np.flatnonzero(multipliers.imag >= 0)[:n_modes]
+    multipliers, vectors, residuals = (
+        multipliers[selected],
+        vectors[selected],
+        residuals[selected],
+    )
+    rates = growth_rates(multipliers, period)
+    modes = [
+        {
+            "decay_rate": float(-rate.real),
+            "frequency": float(rate.imag),
+            "residual": float(residual),
+        }
+        for rate, residual in zip(rates, residuals, strict=True)
+    ]
+    return modes, vectors
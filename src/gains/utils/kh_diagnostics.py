@@ -0,0 +1,166 @@
+"""
+In-situ diagnostics of the growth of the Kelvin-Helmholtz instability.
+
+Rather than writing full snapshots often enough to follow the instability, the run
+writes a few scalars, each a global integral evaluated by dedalus, into a small file
+handler at high cadence:
+
+- the amplitude of the y-velocity in the seeded mode, as defined by McNally et al.
+  2012, ApJ, 201, 18. The y-velocity is projected onto sin(k x) and cos(k x),
+  weighted by exp(-k d), where d is the distance to the nearest shear layer, so
+  that only the perturbation of the layers is picked up;
+- the width of each mixing layer, the area where the density is mixed between
+  rho_1 and rho_2 per unit length of layer, measured by 4 chi (1 - chi) with chi the
+  fraction of the density contrast;
+- the kinetic energy in each velocity component.
+
+The growth rate can then be fitted to the mode amplitude once the run is over.
+"""
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import h5py
+import numpy as np
+
+from gains.initial_conditions.mcnally import bounds
+from gains.utils.virtual_dataset import update_virtual_dataset, virtual_path
+
+if TYPE_CHECKING:
+    import dedalus
+    import dedalus.public as d3
+
+# Positions of the shear layers of the McNally et al. 2012 initial condition.
+SHEAR_LAYERS = (bounds[0], bounds[2])
+
+# Name of the file handler holding the diagnostics.
+DIAGNOSTICS_HANDLER = "diagnostics"
+
+
+def mode_weight(
+    y: np.ndarray, wavenumber: float, layers: tuple[float, ...] = SHEAR_LAYERS
+) -> np.ndarray:
+    """
+    Compute the weight of the mode projection, decaying away from the shear layers.
+
+    :param y: y-coordinates.
+    :param wavenumber: Wavenumber k of the seeded mode.
+    :param layers: y-coordinates of the shear layers.
+    :returns weight: exp(-k d), with d the distance to the nearest layer.
+    """
+    distance = np.min([np.abs(y - layer) for layer in layers], axis=0)
+    return np.exp(-wavenumber * distance)
+
+
+def mixedness(
+    rho: "np.ndarray | d3.Operand", rho_1: float, rho_2: float
+) -> "np.ndarray | d3.Operand":
+    """
+    Measure how mixed the density is, between 0 for pure rho_1 or rho_2 and 1.
+
+    Only uses arithmetic, so applies to grid data and to dedalus operands alike.
+
+    :param rho: Density.
+    :param rho_1: Density of one fluid.
+    :param rho_2: Density of the other fluid.
+    :returns mixedness: 4 chi (1 - chi), with chi = (rho - rho_1) / (rho_2 - rho_1).
+    """
+    chi = (rho - rho_1) / (rho_2 - rho_1)
+    return 4 * chi * (1 - chi)
+
+
+def add_growth_diagnostics(
+    handler: "dedalus.core.evaluator.FileHandler",
+    u: "dedalus.core.field.Field",
+    rho: "dedalus.core.field.Field",
+    *,
+    wavenumber: float,
+    length: float,
+    rho_1: float,
+    rho_2: float,
+    layers: tuple[float, ...] = SHEAR_LAYERS,
+) -> None:
+    """
+    Add the growth diagnostics to a file handler, as integrals over the domain.
+
+    The tasks are "vy_mode_amplitude", "mixing_width", "KE_x" and "KE_y".
+
+    :param handler: File handler the diagnostics are written to.
+    :param u: Velocity field, on Cartesian coordinates (x, y).
+    :param rho: Density field.
+    :param wavenumber: Wavenumber k of the seeded mode, along x.
+    :param length: Length of the domain along x, i.e. of each shear layer.
+    :param rho_1: Density of one fluid.
+    :param rho_2: Density of the other fluid.
+    :param layers: y-coordinates of the shear layers.
+    """
+    import dedalus.public as d3  # noqa: PLC0415 (dedalus is only needed by scripts)
+
+    coords = u.tensorsig[0]
+    components = []
+    for axis in range(coords.dim):
+        unit = u.dist.VectorField(coords)
+        unit["g"][axis] = 1
+        components.append(d3.DotProduct(unit, u))
+    u_x, u_y = components
+
+    # Projections of the y-velocity onto the seeded mode, near the shear layers
+    x, y = u.dist.local_grids(*rho.domain.bases)
+    projections = []
+    for function in (np.ones_like, np.sin, np.cos):
+        field = u.dist.Field(bases=rho.domain.bases)
+        field["g"] = function(wavenumber * x) * mode_weight(y, wavenumber, layers)
+        projections.append(field)
+    weight, sin_weight, cos_weight = projections
+    sin_part = d3.Integrate(u_y * sin_weight, coords)
+    cos_part = d3.Integrate(u_y * cos_weight, coords)
+    handler.add_task(
+        2 * np.sqrt(sin_part**2 + cos_part**2) / d3.Integrate(weight, coords),
+        name="vy_mode_amplitude",
+    )
+
+    handler.add_task(
+        d3.Integrate(mixedness(rho, rho_1, rho_2), coords) / (len(layers) * length),
+        name="mixing_width",
+    )
+    handler.add_task(d3.Integrate(rho * u_x**2, coords) / 2, name="KE_x")
+    handler.add_task(d3.Integrate(rho * u_y**2, coords) / 2, name="KE_y")
+
+
+def read_growth_diagnostics(handler_dir: Path | str) -> dict[str, np.ndarray]:
+    """
+    Read the diagnostics written by a run, over all its sets.
+
+    The sets are read through the virtual file of the handler (see
+    `gains.utils.virtual_dataset`), which is updated first.
+
+    :param handler_dir: Directory of the diagnostics file handler.
+    :returns diagnostics: "sim_time" and each diagnostic, as 1D arrays over writes.
+    """
+    update_virtual_dataset(handler_dir)
+    with h5py.File(virtual_path(handler_dir), "r") as f:
+        return {
+            "sim_time": f["scales/sim_time"][:],
+            **{name: dset[:].reshape(-1) for name, dset in f["tasks"].items()},
+        }
+
+
+def growth_rate(
+    times: np.ndarray,
+    amplitude: np.ndarray,
+    window: tuple[float, float] | None = None,
+) -> float:
+    """
+    Fit an exponential growth rate to the amplitude of a mode.
+
+    :param times: Times of the samples.
+    :param amplitude: Amplitude of the mode at each time.
+    :param window: Interval of time over which the growth is exponential, i.e. after
+        the initial transient and before saturation. Defaults to all samples.
+    :returns rate: Least-squares slope of the logarithm of the amplitude.
+    """
+    times, amplitude = np.asarray(times), np.asarray(amplitude)
+    if window is not None:
+        selected = (times >= window[0]) & (times <= window[1])
+        times, amplitude = times[selected], amplitude[selected]
+    return float(np.polyfit(times, np.log(amplitude), 1)[0])
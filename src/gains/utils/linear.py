@@ -0,0 +1,108 @@
+"""Linear-response mode of the spin-up problems, for small changes in rotation."""
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from gains.utils.checks import ToleranceCheck
+
+if TYPE_CHECKING:
+    import dedalus
+    import dedalus.public as d3
+
+NONLINEARITY_SUMMARY = "nonlinearity_check.json"
+
+# Default timestep of linear runs, resolving the inertial period pi of the rotating
+# frame with about 60 steps.
+LINEAR_TIMESTEP = 0.05
+
+
+def advection(u: str, *, linear: bool) -> str:
+    """
+    Write the advective term of the momentum equation of a velocity.
+
+    :param u: Name of the velocity in the namespace of the problem.
+    :param linear: Whether the problem is linearised, dropping the term.
+    :returns term: The term as it appears on the right-hand side, with its sign, or
+        an empty string for linear problems.
+    """
+    return "" if linear else f" - {u}@grad({u})"
+
+
+class FixedTimestep:
+    """
+    Stand-in for `d3.CFL` in linear runs, where the timestep is set by accuracy.
+
+    The flow of a small glitch is slow, so the CFL condition places no useful limit
+    on the timestep. The timestep is instead fixed, to resolve the inertial waves and
+    the outputs. `gains.utils.rollback.BlowUpRecovery` reduces it like a CFL.
+    """
+
+    def __init__(self, timestep: float) -> None:
+        """
+        Set the timestep.
+
+        :param timestep: Timestep of every iteration.
+        """
+        self.max_dt = timestep
+        self.stored_dt = timestep
+        self.safety = 1.0
+
+    def add_velocity(self, velocity: "dedalus.core.field.Field") -> None:
+        """Ignore the velocity, which does not limit the timestep."""
+
+    def compute_timestep(self) -> float:
+        """Return the timestep."""
+        return self.stored_dt
+
+
+def add_nonlinearity_properties(
+    flow: "d3.GlobalFlowProperty",
+    velocities: dict[str, "dedalus.core.field.Field"],
+) -> list[str]:
+    """
+    Add the size of the advective and Coriolis accelerations of velocities to a flow.
+
+    In the rotating frame (with unit rotation rate) the Coriolis acceleration is at
+    most 2|u|, so the ratio of the two is a local Rossby number, which measures the
+    terms a linear run leaves out.
+
+    :param flow: dedalus flow object of the run.
+    :param velocities: Velocity fields, by name.
+    :returns names: Names of the velocities, for `NonlinearityCheck`. The properties
+        are named "advection_<name>" and "coriolis_<name>".
+    """
+    import dedalus.public as d3  # noqa: PLC0415 (dedalus is only needed by scripts)
+
+    for name, u in velocities.items():
+        advective = u @ d3.grad(u)
+        flow.add_property(np.sqrt(advective @ advective), name=f"advection_{name}")
+        flow.add_property(2 * np.sqrt(u @ u), name=f"coriolis_{name}")
+    return list(velocities)
+
+
+class NonlinearityCheck(ToleranceCheck):
+    """
+    Track how large the nonlinear terms left out of a linear run would be.
+
+    The largest advective and Coriolis accelerations of each velocity (see
+    `add_nonlinearity_properties`) are sampled, and so their ratio.
+    """
+
+    summary_file = NONLINEARITY_SUMMARY
+    quantity = "ratio"
+    description = "ratio of the advective to the Coriolis acceleration"
+    failed_note = ": the response is not linear."
+
+    def sample(self, solver: "dedalus.core.solvers.InitialValueSolver") -> None:
+        """
+        Sample the ratio of the advective to the Coriolis acceleration of each velocity.
+
+        :param solver: The IVP solver defined by the script.
+        """
+        for u in self.velocities:
+            self.add_sample(
+                solver.sim_time,
+                self.flow.max(f"advection_{u}"),
+                self.flow.max(f"coriolis_{u}"),
+            )
@@ -1,43 +1,153 @@
 """Stores custom logging/main loops."""
 
+from collections.abc import Callable, Sequence
 from logging import Logger
 
 import dedalus
 import dedalus.public as d3
 
+from gains.utils.checkpoints import CheckpointManager
+from gains.utils.checks import ToleranceCheck
+from gains.utils.convergence import SteadyStateMonitor
+from gains.utils.profile import MemoryTracker, ProfileWindow
+from gains.utils.rollback import BlowUpRecovery
+from gains.utils.telemetry import LoadBalanceMonitor
+from gains.utils.walltime import WallClockGuard
 
-def track_vorticity(
+
+def main_loop(  # noqa: C901, PLR0912, PLR0915 (dispatches to the optional helpers)
     logger: Logger,
-    flow: d3.GlobalFlowProperty,
     solver: dedalus.core.solvers.InitialValueSolver,
     cfl: d3.CFL,
+    log_progress: Callable[[float], None],
+    *,
+    log_cadence: int = 10,
+    guard: WallClockGuard | None = None,
+    telemetry: LoadBalanceMonitor | None = None,
+    steady_state: SteadyStateMonitor | None = None,
+    recovery: BlowUpRecovery | None = None,
+    memory: MemoryTracker | None = None,
+    profile_window: ProfileWindow | None = None,
+    checkpoints: CheckpointManager | None = None,
+    checks: Sequence[ToleranceCheck] = (),
 ) -> None:
     """
-    Create main loop that tracks and logs the maximum superfluid vorticity.
+    Step the solver until it stops, logging progress every `log_cadence` iterations.
 
     Should be called as an alternative to solver.evolve.
 
     :param logger: Logger used by the script.
-    :param flow: dedalus flow object. Must track the maximum vorticity as vorticity_mag.
     :param solver: The IVP solver defined by the script.
     :param cfl: The CFL condition used by the script.
+    :param log_progress: Called with the current timestep whenever progress should be
+        logged.
+    :param log_cadence: Number of iterations between calls to `log_progress`.
+    :param guard: Optional wall-clock guard. The loop stops early, writing a final
+        checkpoint, once the guard requests it, and the state of the run is recorded
+        when the loop ends.
+    :param telemetry: Optional load-balance monitor, timing every iteration on each
+        rank.
+    :param steady_state: Optional steady-state monitor. Once it reports a steady
+        flow, all file handlers (including checkpoints) are evaluated a final time
+        and the loop stops.
+    :param recovery: Optional blow-up recovery, rolling the solver back to a recent
+        state with a reduced timestep when the run goes unstable. The steady-state
+        monitor is reset on each rollback.
+    :param memory: Optional memory tracker. The first step and, periodically, steady
+        stepping are marked, and the tracker reports once the loop ends.
+    :param profile_window: Optional window of the loop to profile, updated before
+        each step (see `gains.utils.profile.profile`).
+    :param checkpoints: Optional checkpoint manager, moving checkpoints into place
+        and rotating them as they are written.
+    :param checks: Checks of the run, e.g. of the size of the terms left out by
+        `--axisymmetric` or `--linear`. Each is updated every iteration and reports
+        once the loop ends.
     """
+    timestep = 0.0
+    status = "failed"
+    first_iteration = solver.iteration + 1
     try:
         logger.info("Starting main loop")
         while solver.proceed:
-            timestep = cfl.compute_timestep()
-            solver.step(timestep)
-            if (solver.iteration - 1) % 10 == 0:
-                max_omega = flow.max("vorticity_mag")
+            if profile_window is not None:
+                profile_window.update(solver)
+            if telemetry is None:
+                timestep = cfl.compute_timestep()
+                solver.step(timestep)
+            else:
+                timestep = telemetry.step(solver, cfl)
+            rolled_back = recovery is not None and recovery.update(solver, cfl)
+            if rolled_back and steady_state is not None:
+                # Its samples are from the abandoned trajectory
+                steady_state.reset()
+            if checkpoints is not None:
+                checkpoints.update()
+            for check in checks:
+                check.update(solver)
+            if memory is not None:
+                if solver.iteration == first_iteration:
+                    memory.mark("first_step")
+                elif solver.iteration % memory.cadence == 0:
+                    memory.mark("stepping")
+            if (solver.iteration - 1) % log_cadence == 0:
+                log_progress(timestep)
+            if guard is not None and guard.should_stop(solver.iteration):
+                logger.info(f"Stopping main loop early ({guard.reason}).")
+                status = "interrupted"
+                break
+            if steady_state is not None and steady_state.update(solver):
                 logger.info(
-                    "Iteration=%i, Time=%e, dt=%e, max(omega_s)=%f"
-                    % (solver.iteration, solver.sim_time, timestep, max_omega)
+                    "Steady state reached at Time=%e, stopping main loop."
+                    % solver.sim_time
                 )
+                solver.evaluate_handlers(dt=timestep)
+                status = "completed"
+                break
+        else:
+            status = "completed"
     except:
         logger.exception("Exception raised, triggering end of main loop.")
         raise
     finally:
         solver.log_stats()
+        if checkpoints is not None:
+            checkpoints.update()
+        if guard is not None:
+            guard.finish(solver, timestep, status, logger=logger)
+        if status != "failed":
+            if memory is not None:
+                memory.report()
+            for check in checks:
+                check.report()
+
+
+def track_vorticity(
+    logger: Logger,
+    flow: d3.GlobalFlowProperty,
+    solver: dedalus.core.solvers.InitialValueSolver,
+    cfl: d3.CFL,
+    **loop_options,
+) -> None:
+    """
+    Create main loop that tracks and logs the maximum superfluid vorticity.
+
+    Should be called as an alternative to solver.evolve.
+
+    :param logger: Logger used by the script.
+    :param flow: dedalus flow object. Must track the maximum vorticity as vorticity_mag.
+    :param solver: The IVP solver defined by the script.
+    :param cfl: The CFL condition used by the script.
+    :param loop_options: Forwarded to `main_loop`.
+    """
+
+    def log_progress(timestep: float) -> None:
+        max_omega = flow.max("vorticity_mag")
+        logger.info(
+            "Iteration=%i, Time=%e, dt=%e, max(omega_s)=%f"
+            % (solver.iteration, solver.sim_time, timestep, max_omega)
+        )
+
+    main_loop(logger, solver, cfl, log_progress, **loop_options)
 
 
 def track_reynolds_n(
@@ -45,6 +155,7 @@ def track_reynolds_n(
     flow: d3.GlobalFlowProperty,
     solver: dedalus.core.solvers.InitialValueSolver,
     cfl: d3.CFL,
+    **loop_options,
 ) -> None:
     """
     Create main loop that tracks and logs the maximum reynolds number.
@@ -56,20 +167,14 @@ def track_reynolds_n(
     reynlods number as Re_n.
     :param solver: The IVP solver defined by the script.
     :param CFL: The CFL condition used by the script.
+    :param loop_options: Forwarded to `main_loop`.
     """
-    try:
-        logger.info("Starting main loop")
-        while solver.proceed:
-            timestep = cfl.compute_timestep()
-            solver.step(timestep)
-            if (solver.iteration - 1) % 10 == 0:
-                re = flow.max("Re_n")
-                logger.info(
-                    "Iteration=%i, Time=%e, dt=%e, max(Re)=%f"
-                    % (solver.iteration, solver.sim_time, timestep, re)
-                )
-    except:
-        logger.exception("Exception raised, triggering end of main loop.")
-        raise
-    finally:
-        solver.log_stats()
+
+    def log_progress(timestep: float) -> None:
+        re = flow.max("Re_n")
+        logger.info(
+            "Iteration=%i, Time=%e, dt=%e, max(Re)=%f"
+            % (solver.iteration, solver.sim_time, timestep, re)
+        )
+
+    main_loop(logger, solver, cfl, log_progress, **loop_options)
@@ -0,0 +1,237 @@
+"""On-disk cache of the assembled subproblem matrices of a dedalus solver."""
+
+import hashlib
+import importlib.metadata
+import itertools
+import json
+import pickle
+from collections.abc import Iterator
+from contextlib import contextmanager
+from logging import Logger
+from numbers import Number
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import scipy.sparse
+from mpi4py import MPI
+
+if TYPE_CHECKING:
+    import dedalus
+
+# Written alongside the matrices, so the contents of the cache can be identified.
+DESCRIPTION_FILE = "description.json"
+
+
+def _dedalus_version() -> str:
+    """Installed version of dedalus, which the layout of the matrices depends on."""
+    try:
+        return importlib.metadata.version("dedalus")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def describe_problem(
+    problem: "dedalus.core.problems.IVP",
+    timestepper: type,
+    params: dict[str, Any],
+    comm: MPI.Comm = MPI.COMM_WORLD,
+) -> dict[str, Any]:
+    """
+    Describe everything the left-hand-side matrices of a problem depend on.
+
+    Parameters only enter through the string form of the equations when they are
+    plain numbers, and not at all when they set the values of non-constant
+    coefficient fields, so every parameter the left-hand sides depend on must be
+    given in `params`. Parameters that only enter the right-hand sides or boundary
+    values (e.g. `Delta_Omega`) should be left out, so runs differing only in them
+    share the cache.
+
+    :param problem: The problem the solver is built from.
+    :param timestepper: Timestepper class the solver is built with.
+    :param params: Parameters the left-hand-side matrices depend on.
+    :param comm: Communicator the simulation runs on.
+    :returns description: JSON-serialisable description of the problem.
+    """
+    return {
+        "equations": [
+            [str(eqn["LHS"]), str(eqn.get("condition", True))]
+            for eqn in problem.equations
+        ],
+        "variables": [
+            [var.name, [[type(b).__name__, list(b.shape)] for b in var.domain.bases]]
+            for var in problem.variables
+        ],
+        "mesh": [int(n) for n in (problem.variables[0].dist.mesh or [])],
+        "ranks": comm.size,
+        "timestepper": timestepper.__name__,
+        "params": params,
+        "dedalus": _dedalus_version(),
+    }
+
+
+def cache_key(description: dict[str, Any]) -> str:
+    """
+    Hash a problem description into the name of its cache entry.
+
+    :param description: Output of `describe_problem`.
+    :returns key: Hex digest identifying the description.
+    """
+    text = json.dumps(description, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def _is_matrix_data(value: object) -> bool:
+    """Whether an attribute set while building matrices should be cached."""
+    return (
+        value is None
+        or isinstance(value, Number | np.ndarray)
+        or scipy.sparse.issparse(value)
+    )
+
+
+class MatrixCache:
+    """
+    Store and restore the matrices built for each subproblem on each rank.
+
+    Building an IVP solver assembles sparse matrices for each subproblem (the
+    `M` and `L` matrices with their preconditioners). These only depend on the
+    equations, bases, process mesh and the parameters on the left-hand side, so they
+    can be reused by restarts and by runs changing only the forcing. Each rank
+    pickles the matrices of its own subproblems to `<cache_dir>/<key>/rank_<r>.pkl`.
+
+    The LU factorizations used by the timestepper depend on the timestep and are not
+    picklable, so they are not cached; they are cheap next to the assembly.
+    """
+
+    def __init__(
+        self, cache_dir: Path | str, key: str, *, comm: MPI.Comm = MPI.COMM_WORLD
+    ) -> None:
+        """
+        Locate the cache entry.
+
+        :param cache_dir: Directory holding the cache, shared between runs.
+        :param key: Key of the entry, from `cache_key`.
+        :param comm: Communicator the simulation runs on.
+        """
+        self.directory = Path(cache_dir) / key
+        self.comm = comm
+        self.path = self.directory / f"rank_{comm.rank}.pkl"
+
+    def load(self) -> list[dict[str, Any]] | None:
+        """
+        Read the matrices of this rank, if every rank has them.
+
+        Must be called by all ranks.
+
+        :returns matrices: Attributes of each subproblem, in build order, or None if
+            the entry is missing or unreadable on any rank.
+        """
+        try:
+            with self.path.open("rb") as f:
+                # Only ever written by `save`, into a directory the user controls.
+                matrices = pickle.load(f)  # noqa: S301
+        except (OSError, pickle.UnpicklingError, EOFError):
+            matrices = None
+        if not self.comm.allreduce(matrices is not None, op=MPI.LAND):
+            return None
+        return matrices
+
+    def save(self, matrices: list[dict[str, Any]], description: dict[str, Any]) -> None:
+        """
+        Write the matrices of this rank atomically.
+
+        :param matrices: Attributes of each subproblem, in build order.
+        :param description: Output of `describe_problem`, written by rank 0.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with tmp.open("wb") as f:
+            pickle.dump(matrices, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(self.path)
+        if self.comm.rank == 0:
+            with (self.directory / DESCRIPTION_FILE).open("w") as f:
+                json.dump(description, f, indent=2, default=str)
+
+    @staticmethod
+    @contextmanager
+    def intercept(
+        subproblem_class: type,
+        stored: list[dict[str, Any]] | None,
+        built: list[dict[str, Any]],
+    ) -> Iterator[None]:
+        """
+        Replace the matrix building of subproblems while the solver is built.
+
+        :param subproblem_class: Class whose `build_matrices` method is replaced.
+        :param stored: Attributes to restore on each subproblem in turn, instead of
+            building its matrices. None builds them as usual.
+        :param built: Filled with the attributes set by building the matrices of
+            each subproblem, when `stored` is None.
+        """
+        original = subproblem_class.build_matrices
+        index = itertools.count()
+
+        def build_matrices(subproblem: object, names: list[str]) -> None:
+            if stored is not None:
+                vars(subproblem).update(stored[next(index)])
+                return
+            before = dict(vars(subproblem))
+            original(subproblem, names)
+            built.append(
+                {
+                    name: value
+                    for name, value in vars(subproblem).items()
+                    if (name not in before or value is not before[name])
+                    and _is_matrix_data(value)
+                }
+            )
+
+        subproblem_class.build_matrices = build_matrices
+        try:
+            yield
+        finally:
+            subproblem_class.build_matrices = original
+
+
+def build_solver(
+    problem: "dedalus.core.problems.IVP",
+    timestepper: type,
+    logger: Logger,
+    *,
+    cache_dir: Path | str | None = None,
+    params: dict[str, Any] | None = None,
+    comm: MPI.Comm = MPI.COMM_WORLD,
+) -> "dedalus.core.solvers.InitialValueSolver":
+    """
+    Build the solver of a problem, reusing cached matrices when possible.
+
+    :param problem: The problem to build the solver for.
+    :param timestepper: Timestepper class.
+    :param logger: Logger used to report cache hits and misses.
+    :param cache_dir: Directory holding the matrix cache. None disables the cache.
+    :param params: Parameters the left-hand-side matrices depend on (see
+        `describe_problem`).
+    :param comm: Communicator the simulation runs on.
+    :returns solver: The IVP solver.
+    """
+    if cache_dir is None:
+        return problem.build_solver(timestepper)
+
+    # Imported here, so the cache can be inspected and tested without dedalus
+    from dedalus.core.subsystems import Subproblem  # noqa: PLC0415
+
+    description = describe_problem(problem, timestepper, params or {}, comm)
+    key = cache_key(description)
+    cache = MatrixCache(cache_dir, key, comm=comm)
+    stored = cache.load()
+    built: list[dict[str, Any]] = []
+    with MatrixCache.intercept(Subproblem, stored, built):
+        solver = problem.build_solver(timestepper)
+
+    if stored is None:
+        cache.save(built, description)
+        logger.info(f"Cached solver matrices under {cache.directory}")
+    else:
+        logger.info(f"Loaded solver matrices from {cache.directory}")
+    return solver
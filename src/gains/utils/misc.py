@@ -78,7 +78,7 @@ def read_logfile(path: Path, quantity: str) -> tuple[list[float], list[float]]:
     return times, vals
 
 
-def mesh_cpus(ncpu: int) -> list[int] | None:
+def mesh_cpus(ncpu: int, *, axisymmetric: bool = False) -> list[int] | None:
     """
     Distribute the number of cores in a 2D mesh.
 
@@ -86,9 +86,15 @@ def mesh_cpus(ncpu: int) -> list[int] | None:
     an efficient discretisation by dedalus. Raises an error if the number
     of available cpus is not a power of 2.
 
+    Axisymmetric problems have a single azimuthal mode, so all cpus are placed along
+    the second (theta) axis of the mesh, and any number of cpus is allowed.
+
     :param ncpu: The number of available cpus.
+    :param axisymmetric: Whether the problem has a single azimuthal mode (Nphi=1).
     :returns mesh: The 2D mesh to be passed to a dedalus distributor object.
     """
+    if axisymmetric:
+        return [1, ncpu]
     log2 = np.log2(ncpu)
     if log2 == int(log2):
         return [int(2 ** np.ceil(log2 / 2)), int(2 ** np.floor(log2 / 2))]
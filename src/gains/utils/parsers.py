@@ -2,16 +2,57 @@
 
 import argparse
 import json
+import sqlite3
 from datetime import datetime
 from logging import FileHandler, Logger
 from pathlib import Path
 from typing import Any
 
+from mpi4py import MPI
+
+from gains.initial_conditions.ekman import INITIAL_CONDITIONS
+from gains.utils.catalog import CATALOG_FILE, RunCatalog
+from gains.utils.checkpoints import CHECKPOINT_DIR, latest_valid_checkpoint
+from gains.utils.linear import LINEAR_TIMESTEP
+from gains.utils.walltime import resume_checkpoint
+
+
+def _boolean(value: str) -> bool:
+    """
+    Parse a boolean from the command line.
+
+    :param value: One of true/false, yes/no or 1/0, in any case.
+    :returns flag: The boolean value.
+    """
+    if value.lower() in {"true", "yes", "1"}:
+        return True
+    if value.lower() in {"false", "no", "0"}:
+        return False
+    msg = f"expected a boolean (true/false), got {value!r}"
+    raise argparse.ArgumentTypeError(msg)
+
+
+def _bounds(spec: str) -> tuple[float | None, float | None]:
+    """
+    Parse a "start:stop" range from the command line.
+
+    :param spec: Range with either bound optionally left empty, e.g. "500:1500" or
+        "500:".
+    :returns bounds: The start and stop values, None where left empty.
+    """
+    start, sep, stop = spec.partition(":")
+    if not sep:
+        msg = f"expected a range of the form start:stop, got {spec!r}"
+        raise argparse.ArgumentTypeError(msg)
+    try:
+        return (float(start) if start else None, float(stop) if stop else None)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from e
+
 
 class SimulationCLI(argparse.ArgumentParser):
     """Command-line interface for simulation scripts."""
 
-    _default_checkpoint_path: str
     _default_output_dir: str
 
     is_profiling: bool
@@ -50,8 +91,6 @@ class SimulationCLI(argparse.ArgumentParser):
         self.place_all_outputs_under = Path(place_all_outputs_under)
         self.sim_name = str(sim_name)
         self._default_output_dir = self._default_dir_name()
-        # Should this be auto-generated by the class, like _default_output_dir?
-        self._default_checkpoint_path = "checkpoints/checkpoints_sNumber.h5"
 
         self._add_standard_args()
 
@@ -65,15 +104,17 @@ class SimulationCLI(argparse.ArgumentParser):
         """Add arguments that all simulation CLIs accept to the instance."""
         self.add_argument(
             "--use_checkpoint",
-            type=bool,
+            type=_boolean,
             default=False,
-            help="Boolean argument to determine if to use a checkpoint file.",
+            help="Whether to restart from a checkpoint (true/false).",
         )
         self.add_argument(
             "--checkpoint_path",
             type=str,
-            default=str(self.place_all_outputs_under / self._default_checkpoint_path),
-            help="Path to the checkpoint file you want to use.",
+            default=None,
+            help="Path to the checkpoint file you want to use. Defaults to the newest"
+            " valid checkpoint of the run in --output_dir. Checkpoints written in"
+            " coefficient space can be at a different resolution or process count.",
         )
         self.add_argument(
             "--output_dir",
@@ -94,11 +135,145 @@ class SimulationCLI(argparse.ArgumentParser):
             default=None,
             help="Name of logfile, if you want to create one.",
         )
+        self.add_argument(
+            "--catalog",
+            type=Path,
+            default=None,
+            help="SQLite catalog the run is registered in. Defaults to"
+            f" {CATALOG_FILE} in the directory holding all outputs.",
+        )
+        self.add_argument(
+            "--no_catalog",
+            action="store_true",
+            help="Do not register the run in a catalog.",
+        )
         self.add_argument(
             "--checkpoint_cadence",
             type=int,
             default=3600,
-            help="Time in seconds between checkpoint saves.",
+            help="Wall-clock time in seconds between checkpoint saves.",
+        )
+        self.add_argument(
+            "--checkpoint_keep",
+            type=int,
+            default=3,
+            help="Number of most recent checkpoints to keep.",
+        )
+        self.add_argument(
+            "--matrix_cache",
+            type=Path,
+            default=None,
+            help="Directory caching the assembled solver matrices, shared between"
+            " runs. Restarts and runs with the same left-hand sides load them instead"
+            " of rebuilding them. Disabled if not given.",
+        )
+        self.add_argument(
+            "--wall_time",
+            type=float,
+            default=None,
+            help="Wall-time budget of the job in seconds. The run writes a final"
+            " checkpoint and stops cleanly before the budget runs out.",
+        )
+        self.add_argument(
+            "--wall_time_margin",
+            type=float,
+            default=600,
+            help="Seconds reserved for writing the final checkpoint before the"
+            " wall-time budget runs out.",
+        )
+        self.add_argument(
+            "--stop_iteration",
+            type=int,
+            default=None,
+            help="Iteration to stop at, if reached before the stop time, e.g. to run"
+            " a fixed number of steps when benchmarking. Disabled if not given.",
+        )
+        self.add_argument(
+            "--steady_rtol",
+            type=float,
+            default=None,
+            help="Stop once the watched global quantities change by less than this"
+            " relative tolerance over --steady_window. Disabled if not given.",
+        )
+        self.add_argument(
+            "--steady_window",
+            type=float,
+            default=1.0,
+            help="Sliding window in simulation time for steady-state detection.",
+        )
+        self.add_argument(
+            "--steady_hold",
+            type=float,
+            default=1.0,
+            help="Simulation time the steady-state tolerance must hold for before"
+            " the run stops.",
+        )
+        self.add_argument(
+            "--rollback_depth",
+            type=int,
+            default=None,
+            help="Number of recent solver states kept in memory to roll back to if"
+            " the run blows up. Disabled if not given.",
+        )
+        self.add_argument(
+            "--blowup_threshold",
+            type=float,
+            default=float("inf"),
+            help="Value of the watched diagnostic beyond which the run is treated as"
+            " blown up. Non-finite states are always treated as blown up.",
+        )
+        axisymmetry = self.add_mutually_exclusive_group()
+        axisymmetry.add_argument(
+            "--axisymmetric",
+            action="store_true",
+            help="Keep only the axisymmetric azimuthal mode (Nphi=1), solving for the"
+            " flow in the meridional plane. The processes are then spread over"
+            " theta only.",
+        )
+        axisymmetry.add_argument(
+            "--axisymmetry_check",
+            type=float,
+            default=None,
+            help="Track the fraction of the kinetic energy in non-axisymmetric modes"
+            " of a 3D run, and report whether it stayed below this tolerance, i.e."
+            " whether --axisymmetric would have been accurate. Disabled if not given.",
+        )
+        self.add_argument(
+            "--linear",
+            action="store_true",
+            help="Solve for the linear response to the change in rotation: drop the"
+            " advective terms, linearise the mutual friction about the background"
+            " rotation, set dealias to 1 and step with --linear_timestep instead of"
+            " a CFL condition. Accurate for small Delta_Omega.",
+        )
+        self.add_argument(
+            "--linear_timestep",
+            type=float,
+            default=LINEAR_TIMESTEP,
+            help="Timestep of linear runs, set by the accuracy required.",
+        )
+        self.add_argument(
+            "--nonlinearity_check",
+            type=float,
+            default=None,
+            help="Track the ratio of the advective to the Coriolis acceleration, and"
+            " report whether it stayed below this tolerance, i.e. whether --linear is"
+            " accurate. Disabled if not given.",
+        )
+        self.add_argument(
+            "--initial_condition",
+            choices=INITIAL_CONDITIONS,
+            default="noise",
+            help="Start from random noise, or add the quasi-steady Ekman layer of the"
+            " imposed boundary flow to it, skipping the start-up transients. Only"
+            " used by problems with an imposed boundary flow.",
+        )
+        self.add_argument(
+            "--load_balance_cadence",
+            type=int,
+            default=None,
+            help="Iterations between per-rank load-imbalance summaries. Disabled if"
+            " not given.",
         )
 
     def _default_dir_name(self) -> str:
@@ -117,6 +292,53 @@ class SimulationCLI(argparse.ArgumentParser):
                 type=str,
                 help="Output directory for profiling results.",
             )
+            self.add_argument(
+                "--profile_aggregate",
+                action="store_true",
+                help="Merge the per-rank profiles on rank 0 at the end of the run and"
+                " write a hot-spot report and folded stacks.",
+            )
+            self.add_argument(
+                "--profile_mode",
+                choices=["cprofile", "sampling"],
+                default="cprofile",
+                help="Profile every call with cProfile, or sample the call stack at"
+                " --profile_frequency with low overhead.",
+            )
+            self.add_argument(
+                "--profile_frequency",
+                type=float,
+                default=100.0,
+                help="Samples per second on each rank in sampling mode.",
+            )
+            self.add_argument(
+                "--profile_memory",
+                action="store_true",
+                help="Record the current and peak memory of each rank at each phase of"
+                " the run and write a summary.",
+            )
+            self.add_argument(
+                "--profile_tracemalloc",
+                type=int,
+                default=0,
+                help="Number of top Python allocation sites to record at each phase"
+                " with --profile_memory. 0 disables tracemalloc.",
+            )
+            window = self.add_mutually_exclusive_group()
+            window.add_argument(
+                "--profile_iterations",
+                type=_bounds,
+                default=None,
+                help="Only profile the main loop from iteration start to stop, given as"
+                " start:stop. Either bound may be omitted.",
+            )
+            window.add_argument(
+                "--profile_sim_time",
+                type=_bounds,
+                default=None,
+                help="Only profile the main loop from simulation time start to stop,"
+                " given as start:stop. Either bound may be omitted.",
+            )
         else:
             self.is_profiling = False
 
@@ -133,6 +355,18 @@ class SimulationCLI(argparse.ArgumentParser):
         Note that the input `logger` will be edited by this method, having a handler
         added to the given instance in the event a `logfile` was specified.
 
+        If the output directory holds a run that was interrupted (see
+        `gains.utils.walltime.WallClockGuard`) and no checkpoint was requested
+        explicitly, the run is resumed from the checkpoint it recorded.
+        When `--use_checkpoint` is given without `--checkpoint_path`, the newest valid
+        checkpoint of the run in the output directory is used.
+
+        Unless `--no_catalog` is given, the run is registered in the catalog given by
+        `--catalog` (see `gains.utils.catalog.RunCatalog`), from where its outcome is
+        later updated by `gains.utils.walltime.WallClockGuard`. If the catalog cannot
+        be written to, e.g. on a filesystem without locking, a warning is logged and
+        the run goes on without it.
+
         `*args` and `**kwargs` are forwarded to `argparse.ArgumentParser.parse_args()`.
 
         :param logger: Logger instance that is handling main simulation.
@@ -153,7 +387,43 @@ class SimulationCLI(argparse.ArgumentParser):
         params["use_checkpoint"] = parsed_args["use_checkpoint"]
         params["checkpoint_path"] = parsed_args["checkpoint_path"]
         params["profile"] = parsed_args.get("profile")
-        params["checkpoint_cadence"] = parsed_args["checkpoint_cadence"]
+        params["profile_aggregate"] = parsed_args.get("profile_aggregate", False)
+        params["profile_mode"] = parsed_args.get("profile_mode", "cprofile")
+        params["profile_frequency"] = parsed_args.get("profile_frequency", 100.0)
+        params["profile_memory"] = parsed_args.get("profile_memory", False)
+        params["profile_tracemalloc"] = parsed_args.get("profile_tracemalloc", 0)
+        params["profile_iterations"] = parsed_args.get("profile_iterations")
+        params["profile_sim_time"] = parsed_args.get("profile_sim_time")
+        params["catalog"] = (
+            None
+            if parsed_args["no_catalog"]
+            else parsed_args["catalog"] or self.place_all_outputs_under / CATALOG_FILE
+        )
+        for name in (
+            "checkpoint_cadence",
+            "checkpoint_keep",
+            "matrix_cache",
+            "wall_time",
+            "wall_time_margin",
+            "stop_iteration",
+            "load_balance_cadence",
+            "rollback_depth",
+            "blowup_threshold",
+            "steady_rtol",
+            "steady_window",
+            "steady_hold",
+            "axisymmetric",
+            "axisymmetry_check",
+            "linear",
+            "linear_timestep",
+            "nonlinearity_check",
+            "initial_condition",
+        ):
+            params[name] = parsed_args[name]
+        if params["axisymmetric"]:
+            params["Nphi"] = 1
+        if params["linear"]:
+            params["dealias"] = 1
 
         params["output_dir"] = self.place_all_outputs_under / (
             parsed_args["output_dir"]
@@ -166,8 +436,40 @@ class SimulationCLI(argparse.ArgumentParser):
             self.log_path.parent.mkdir(exist_ok=True, parents=True)
             logger.addHandler(FileHandler(self.log_path))
 
+        if params["use_checkpoint"] and params["checkpoint_path"] is None:
+            checkpoint_dir = params["output_dir"] / CHECKPOINT_DIR
+            latest = latest_valid_checkpoint(checkpoint_dir)
+            if latest is None:
+                self.error(f"no valid checkpoint found in {checkpoint_dir}")
+            params["checkpoint_path"] = str(latest)
+        elif not params["use_checkpoint"]:
+            resume_from = resume_checkpoint(params["output_dir"])
+            if resume_from is not None:
+                logger.info(f"Resuming interrupted run from {resume_from}")
+                params["use_checkpoint"] = True
+                params["checkpoint_path"] = str(resume_from)
+
+        if MPI.COMM_WORLD.rank == 0 and params["catalog"] is not None:
+            self._register(logger, params)
+
         return params
 
+    def _register(self, logger: Logger, params: dict[str, Any]) -> None:
+        """Register the run in its catalog, going on without one if that fails."""
+        try:
+            RunCatalog(params["catalog"]).register(
+                params["output_dir"],
+                params,
+                sim_name=self.sim_name,
+                script=self.prog,
+            )
+        except (sqlite3.Error, OSError) as err:
+            logger.warning(
+                f"Could not register the run in {params['catalog']} ({err}),"
+                " going on without the catalog."
+            )
+            params["catalog"] = None
+
 
 def create_parser_analysis() -> argparse.ArgumentParser:
     """Create parser for command line arguments in plotting code."""
@@ -1,23 +1,74 @@
 """Wrappers and decorators for profiling runs."""
 
 import cProfile
-from collections.abc import Callable
+import json
+import pstats
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from logging import Logger
 from pathlib import Path
+from types import CodeType
+from typing import TYPE_CHECKING
 
+import numpy as np
 from mpi4py import MPI
 
+if TYPE_CHECKING:
+    import dedalus
 
-def profile(dirname: str | None, run_output_dir: Path | str) -> Callable:
+# Key pstats uses for a function: (filename, line number, function name).
+FunctionKey = tuple[str, int, str]
+
+PROFILE_PREFIX = "time_profile"
+SAMPLE_PREFIX = "sample_profile"
+MERGED_PROFILE = "merged.prof"
+FOLDED_STACKS = "profile.folded"
+HOT_SPOT_REPORT = "hot_spots.txt"
+MEMORY_SUMMARY = "memory_summary.json"
+PHASE_SUMMARY = "phase_times.json"
+
+
+def profile(
+    dirname: str | None,
+    run_output_dir: Path | str,
+    *,
+    aggregate: bool = False,
+    mode: str = "cprofile",
+    frequency: float = 100.0,
+    window: "ProfileWindow | None" = None,
+) -> Callable:
     """
-    Provide a decorator to use cProfile to profile an function running in parallel.
+    Provide a decorator to profile a function running in parallel.
+
+    In the default "cprofile" mode, cProfile records every function call. The stats
+    are optionally saved in a subdirectory of the overall output directory for the
+    simulation, and saved using the dump_stats method in a format readable by
+    snakeviz.
+
+    In "sampling" mode, a `StackSampler` records the call stack on each rank at
+    `frequency` Hz instead, which costs far less than cProfile and is suitable for
+    production runs. The samples of each rank are written as folded stacks, and
+    rank 0 also writes the stacks summed over all ranks.
 
-    The stats are optionally saved in a subdirectory of the overall
-    output directory for the simulation, and saved using the dump_stats
-    method in a format readable by snakeviz.
+    By default the whole decorated function is profiled. Given a `window`, the
+    profiler is instead handed to it, and only enabled while the main loop is inside
+    the window, so that startup costs such as matrix factorisation do not swamp the
+    cost of steady stepping.
 
     :param dirname: The name of the directory to save the profiles to.
     :param run_output_dir: The super-directory to which all outputs from the currently
         running script should be saved.
+    :param aggregate: If True, rank 0 merges the cProfile profiles of all ranks once
+        they have been saved (see `aggregate_profiles`).
+    :param mode: "cprofile" or "sampling".
+    :param frequency: Samples per second in "sampling" mode.
+    :param window: Optional window of the main loop to restrict profiling to. Must
+        also be passed to the main loop.
     """
     comm = MPI.COMM_WORLD
 
@@ -26,10 +77,16 @@ def profile(dirname: str | None, run_output_dir: Path | str) -> Callable:
 
     def prof_decorator(f: Callable) -> Callable:
         def wrap_f(*args: object, **kwargs: object) -> object:
-            pr = cProfile.Profile()
-            pr.enable()
+            pr = StackSampler(frequency) if mode == "sampling" else cProfile.Profile()
+            if window is None:
+                pr.enable()
+            else:
+                window.profiler = pr
             result = f(*args, **kwargs)
-            pr.disable()
+            if window is None:
+                pr.disable()
+            else:
+                window.close()
 
             output_dir = Path(run_output_dir) / dirname
             # Only rank 0 creates directory to avoid race conditions
@@ -38,11 +95,651 @@ def profile(dirname: str | None, run_output_dir: Path | str) -> Callable:
             # All ranks wait until directory exists
             comm.Barrier()
 
-            filename = output_dir / Path(f"time_profile.{comm.rank}")
+            if isinstance(pr, StackSampler):
+                _save_samples(pr.stacks, output_dir, comm)
+                return result
+
+            filename = output_dir / Path(f"{PROFILE_PREFIX}.{comm.rank}")
             pr.dump_stats(filename)
 
+            if aggregate:
+                # All profiles must be on disk before rank 0 reads them
+                comm.Barrier()
+                if comm.rank == 0:
+                    aggregate_profiles(output_dir)
+
             return result
 
         return wrap_f
 
     return prof_decorator
+
+
+class ProfileWindow:
+    """
+    Window of iterations, or of simulation time, of the main loop to profile.
+
+    `profile` hands its profiler to the window instead of enabling it, and the main
+    loop calls `update` before every step. The profiler is enabled once the clock
+    reaches `start` and disabled once it reaches `stop`, so the profile covers the
+    steps taken in between. As the iteration and simulation time are the same on all
+    ranks, every rank profiles the same steps.
+    """
+
+    profiler: "cProfile.Profile | StackSampler | None"
+
+    def __init__(
+        self,
+        start: float | None = None,
+        stop: float | None = None,
+        *,
+        sim_time: bool = False,
+    ) -> None:
+        """
+        Set the bounds of the window.
+
+        :param start: Iteration, or simulation time, from which to profile. None to
+            profile from the first step.
+        :param stop: Iteration, or simulation time, at which to stop profiling. None
+            to profile until the main loop ends.
+        :param sim_time: Whether the bounds are simulation times rather than
+            iterations.
+        """
+        self.start = start
+        self.stop = stop
+        self.sim_time = sim_time
+        self.profiler = None
+        self.active = False
+
+    @classmethod
+    def from_params(cls, params: dict) -> "ProfileWindow | None":
+        """
+        Create the window requested on the command line, if any.
+
+        :param params: Simulation parameters from `SimulationCLI`.
+        :returns window: The window set by `--profile_iterations` or
+            `--profile_sim_time`, or None if neither was given.
+        """
+        if params.get("profile_iterations"):
+            return cls(*params["profile_iterations"])
+        if params.get("profile_sim_time"):
+            return cls(*params["profile_sim_time"], sim_time=True)
+        return None
+
+    def contains(self, clock: float) -> bool:
+        """Check whether an iteration, or simulation time, is inside the window."""
+        return (self.start is None or clock >= self.start) and (
+            self.stop is None or clock < self.stop
+        )
+
+    def update(self, solver: "dedalus.core.solvers.InitialValueSolver") -> None:
+        """
+        Enable or disable the profiler, depending on where the solver is.
+
+        :param solver: The IVP solver defined by the script.
+        """
+        if self.profiler is None:
+            return
+        inside = self.contains(solver.sim_time if self.sim_time else solver.iteration)
+        if inside and not self.active:
+            self.profiler.enable()
+            self.active = True
+        elif not inside and self.active:
+            self.profiler.disable()
+            self.active = False
+
+    def close(self) -> None:
+        """Disable the profiler if the main loop ended inside the window."""
+        if self.active:
+            self.profiler.disable()
+            self.active = False
+
+
+class StackSampler:
+    """
+    Statistical profiler sampling the call stack of a thread at a fixed frequency.
+
+    A background thread wakes up every 1/`frequency` seconds and records the current
+    stack of the profiled thread, so the cost is independent of how many Python calls
+    the profiled code makes. Time spent in C extensions that hold the GIL is
+    attributed to the sample taken once the GIL is released.
+
+    The interface mirrors `cProfile.Profile`'s `enable`/`disable`.
+    """
+
+    stacks: dict[str, int]
+
+    def __init__(self, frequency: float = 100.0, thread_id: int | None = None) -> None:
+        """
+        Configure the sampler.
+
+        :param frequency: Samples per second.
+        :param thread_id: Identifier of the thread to sample. Defaults to the thread
+            creating the sampler.
+        """
+        self.interval = 1 / frequency
+        self.thread_id = threading.get_ident() if thread_id is None else thread_id
+        self.stacks = {}
+
+        self._labels: dict[CodeType, str] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _label(self, code: CodeType) -> str:
+        """Label of a code object, matching the labels of cProfile functions."""
+        label = self._labels.get(code)
+        if label is None:
+            label = function_label(
+                (code.co_filename, code.co_firstlineno, code.co_name)
+            )
+            self._labels[code] = label
+        return label
+
+    def _sample(self) -> None:
+        """Record the current stack of the profiled thread."""
+        frame = sys._current_frames().get(self.thread_id)  # noqa: SLF001
+        labels = []
+        while frame is not None:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        if labels:
+            stack = ";".join(reversed(labels))
+            self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def enable(self) -> None:
+        """Start sampling in a background thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def disable(self) -> None:
+        """Stop sampling, waiting for the background thread to finish."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def merge_folded_stacks(rank_stacks: list[dict[str, float]]) -> dict[str, float]:
+    """
+    Sum folded stacks from several ranks.
+
+    :param rank_stacks: Folded stacks of each rank.
+    :returns merged: Sum of the counts of each stack over ranks.
+    """
+    merged: dict[str, float] = {}
+    for stacks in rank_stacks:
+        for stack, count in stacks.items():
+            merged[stack] = merged.get(stack, 0) + count
+    return merged
+
+
+def _save_samples(stacks: dict[str, int], output_dir: Path, comm: MPI.Comm) -> None:
+    """Write the samples of each rank, and their sum over ranks from rank 0."""
+    write_folded_stacks(
+        stacks, output_dir / f"{SAMPLE_PREFIX}.{comm.rank}.folded", scale=1
+    )
+    rank_stacks = comm.gather(stacks, root=0)
+    if comm.rank == 0:
+        write_folded_stacks(
+            merge_folded_stacks(rank_stacks), output_dir / FOLDED_STACKS, scale=1
+        )
+
+
+def load_rank_profiles(profile_dir: Path | str) -> list[pstats.Stats]:
+    """
+    Load the per-rank profiles written by `profile`, ordered by rank.
+
+    :param profile_dir: Directory holding the `time_profile.<rank>` files.
+    :returns stats: One `pstats.Stats` per rank.
+    """
+    paths = [
+        path
+        for path in Path(profile_dir).glob(f"{PROFILE_PREFIX}.*")
+        if path.suffix[1:].isdigit()
+    ]
+    paths.sort(key=lambda path: int(path.suffix[1:]))
+    return [pstats.Stats(str(path)) for path in paths]
+
+
+def merge_profiles(rank_stats: list[pstats.Stats]) -> pstats.Stats:
+    """
+    Merge per-rank profiles into one, summing the times of each function.
+
+    :param rank_stats: One `pstats.Stats` per rank.
+    :returns merged: The combined profile.
+    """
+    merged = pstats.Stats()
+    merged.add(*rank_stats)
+    return merged
+
+
+def function_label(func: FunctionKey) -> str:
+    """
+    Format a pstats function key as a short, single-line label.
+
+    :param func: pstats key of the function.
+    :returns label: "name (file:line)" for Python functions, the name for built-ins.
+    """
+    filename, line, name = func
+    label = name if filename == "~" else f"{name} ({Path(filename).name}:{line})"
+    # ";" separates frames in folded stacks
+    return label.replace(";", ":")
+
+
+def hot_spots(
+    rank_stats: list[pstats.Stats], top: int = 20, sort: str = "cumulative"
+) -> list[dict]:
+    """
+    Find the most expensive functions and how their cost varies across ranks.
+
+    :param rank_stats: One `pstats.Stats` per rank.
+    :param top: Number of functions to report.
+    :param sort: Rank functions by "cumulative" or "self" time, summed over ranks.
+    :returns rows: For each function, its label, the self and cumulative time summed
+        over ranks, and the min/median/max over ranks of both, along with the rank
+        on which it is slowest.
+    """
+    column = {"self": 2, "cumulative": 3}[sort]
+    merged = merge_profiles(rank_stats)
+    ranked = sorted(merged.stats, key=lambda func: -merged.stats[func][column])
+
+    rows = []
+    for func in ranked[:top]:
+        per_rank = np.array(
+            [stats.stats.get(func, (0, 0, 0.0, 0.0))[2:4] for stats in rank_stats]
+        )
+        self_time, cum_time = per_rank[:, 0], per_rank[:, 1]
+        rows.append(
+            {
+                "function": function_label(func),
+                "calls": merged.stats[func][1],
+                "self": float(self_time.sum()),
+                "cumulative": float(cum_time.sum()),
+                "self_spread": _spread(self_time),
+                "cumulative_spread": _spread(cum_time),
+                "slowest_rank": int(cum_time.argmax()),
+            }
+        )
+    return rows
+
+
+def _spread(values: np.ndarray) -> tuple[float, float, float]:
+    """Min, median and max of a per-rank quantity."""
+    return float(values.min()), float(np.median(values)), float(values.max())
+
+
+def _caller_paths(
+    stats: dict,
+    func: FunctionKey,
+    weight: float,
+    seen: tuple[FunctionKey, ...],
+    min_weight: float,
+) -> Iterator[tuple[tuple[FunctionKey, ...], float]]:
+    """
+    Expand a function into the call paths leading to it.
+
+    cProfile only records caller/callee pairs, not full stacks, so the weight of a
+    function is split among its callers in proportion to the time spent in it when
+    called from each of them. Recursion and negligible paths are cut short.
+    """
+    callers = {
+        caller: edge
+        for caller, edge in stats[func][4].items()
+        if caller not in seen and caller in stats
+    }
+    total = sum(edge[3] for edge in callers.values())
+    if not callers or total <= 0:
+        yield (func,), weight
+        return
+    for caller, edge in callers.items():
+        share = weight * edge[3] / total
+        if share < min_weight:
+            continue
+        for path, path_weight in _caller_paths(
+            stats, caller, share, (*seen, func), min_weight
+        ):
+            yield (*path, func), path_weight
+
+
+def folded_stacks(stats: pstats.Stats, min_fraction: float = 1e-4) -> dict[str, float]:
+    """
+    Convert a profile into folded stacks, as read by flame graph tools.
+
+    Each function's self time is attributed to the call paths leading to it (see
+    `_caller_paths`), so the stacks are a reconstruction rather than a sample.
+
+    :param stats: Profile to convert, for example the output of `merge_profiles`.
+    :param min_fraction: Paths carrying less than this fraction of the total time
+        are dropped.
+    :returns stacks: Self time in seconds of each ";"-separated call path.
+    """
+    min_weight = min_fraction * stats.total_tt
+    stacks: dict[str, float] = {}
+    for func, (_, _, self_time, _, _) in stats.stats.items():
+        if self_time < min_weight:
+            continue
+        for path, weight in _caller_paths(stats.stats, func, self_time, (), min_weight):
+            key = ";".join(function_label(f) for f in path)
+            stacks[key] = stacks.get(key, 0.0) + weight
+    return stacks
+
+
+def write_folded_stacks(
+    stacks: dict[str, float], path: Path | str, scale: float = 1e6
+) -> None:
+    """
+    Write folded stacks with integer counts, one stack per line.
+
+    :param stacks: Weight (time or number of samples) of each ";"-separated call
+        path.
+    :param path: File to write.
+    :param scale: Factor turning the weights into integer counts. The default turns
+        seconds into microseconds.
+    """
+    with Path(path).open("w") as f:
+        for stack, weight in sorted(stacks.items()):
+            count = round(weight * scale)
+            if count > 0:
+                f.write(f"{stack} {count}\n")
+
+
+def format_hot_spots(rows: list[dict], sort: str, nranks: int) -> str:
+    """
+    Format the output of `hot_spots` as a plain-text table.
+
+    :param rows: Output of `hot_spots`.
+    :param sort: Column the rows were sorted by, for the title.
+    :param nranks: Number of ranks the profiles came from.
+    :returns table: The formatted table.
+    """
+    lines = [
+        (
+            f"Top {len(rows)} functions by {sort} time over {nranks} ranks "
+            "(seconds; spread is min/median/max over ranks)"
+        ),
+        (
+            f"{'cumulative':>11} {'self':>11} {'cumulative spread':>29} "
+            f"{'self spread':>29} {'slowest':>7}  function"
+        ),
+    ]
+    for row in rows:
+        cum_spread = "/".join(f"{t:9.3g}" for t in row["cumulative_spread"])
+        self_spread = "/".join(f"{t:9.3g}" for t in row["self_spread"])
+        lines.append(
+            f"{row['cumulative']:11.4g} {row['self']:11.4g} {cum_spread:>29} "
+            f"{self_spread:>29} {row['slowest_rank']:7d}  {row['function']}"
+        )
+    return "\n".join(lines)
+
+
+def aggregate_profiles(profile_dir: Path | str, top: int = 20) -> str:
+    """
+    Merge the per-rank profiles in a directory and report the hot spots.
+
+    Writes, next to the per-rank profiles, a merged profile (`MERGED_PROFILE`, readable
+    by snakeviz or pstats), folded stacks for flame graphs (`FOLDED_STACKS`) and the
+    hot-spot report (`HOT_SPOT_REPORT`).
+
+    :param profile_dir: Directory holding the `time_profile.<rank>` files.
+    :param top: Number of functions to report for each ordering.
+    :returns report: The hot-spot report.
+    """
+    profile_dir = Path(profile_dir)
+    rank_stats = load_rank_profiles(profile_dir)
+    merged = merge_profiles(rank_stats)
+    merged.dump_stats(profile_dir / MERGED_PROFILE)
+    write_folded_stacks(folded_stacks(merged), profile_dir / FOLDED_STACKS)
+
+    report = "\n\n".join(
+        format_hot_spots(hot_spots(rank_stats, top, sort), sort, len(rank_stats))
+        for sort in ("cumulative", "self")
+    )
+    (profile_dir / HOT_SPOT_REPORT).write_text(report + "\n")
+    return report
+
+
+def memory_usage() -> tuple[int, int]:
+    """
+    Return the current and peak resident set size (RSS) of this process.
+
+    Reads `/proc/self/status` where available (Linux). Elsewhere only the peak is
+    known, from `resource.getrusage`, and is also returned as the current RSS.
+
+    :returns rss: Current RSS in bytes.
+    :returns peak: Peak RSS in bytes since process start.
+    """
+    try:
+        with Path("/proc/self/status").open() as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return (
+            int(fields["VmRSS"].split()[0]) * 1024,
+            int(fields["VmHWM"].split()[0]) * 1024,
+        )
+    except (OSError, KeyError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux, but in bytes on macOS
+        peak = peak if sys.platform == "darwin" else peak * 1024
+        return peak, peak
+
+
+class MemoryTracker:
+    """
+    Record the memory used by each rank at the phases of a simulation.
+
+    Scripts call `mark` after each phase of the setup (bases, fields, building the
+    solver, ...), and the main loop marks the first step and, every `cadence`
+    iterations, steady stepping. Each mark stores the current and peak RSS of the
+    rank and, if `tracemalloc_top` is set, the top Python allocation sites from a
+    `tracemalloc` snapshot. `report` gathers the marks to rank 0, which logs a compact
+    table and writes `MEMORY_SUMMARY` to the output directory.
+
+    When disabled, all methods return immediately, so scripts can call them
+    unconditionally.
+    """
+
+    marks: dict[str, dict]
+
+    def __init__(
+        self,
+        output_dir: Path | str,
+        logger: Logger,
+        *,
+        enabled: bool = True,
+        cadence: int = 1000,
+        tracemalloc_top: int = 0,
+        comm: MPI.Comm = MPI.COMM_WORLD,
+    ) -> None:
+        """
+        Configure the tracker, starting `tracemalloc` if requested.
+
+        Create the tracker as early as possible, as `tracemalloc` only sees
+        allocations made after it is started.
+
+        :param output_dir: Output directory of the run, where the summary is written.
+        :param logger: Logger used by the script.
+        :param enabled: Whether to record anything at all.
+        :param cadence: Number of iterations between marks while stepping.
+        :param tracemalloc_top: Number of top allocation sites to store at each mark.
+            0 disables `tracemalloc`, which slows down allocations noticeably.
+        :param comm: Communicator the simulation runs on.
+        """
+        self.output_dir = Path(output_dir)
+        self.logger = logger
+        self.enabled = enabled
+        self.cadence = cadence
+        self.tracemalloc_top = tracemalloc_top
+        self.comm = comm
+        self.marks = {}
+
+        if enabled and tracemalloc_top > 0:
+            tracemalloc.start()
+
+    def mark(self, phase: str) -> None:
+        """
+        Record the memory use of this rank at the end of a phase.
+
+        Marking the same phase again replaces the earlier record.
+
+        :param phase: Name of the phase.
+        """
+        if not self.enabled:
+            return
+        rss, peak = memory_usage()
+        record: dict = {"rss": rss, "peak": peak}
+        if self.tracemalloc_top > 0:
+            stats = tracemalloc.take_snapshot().statistics("lineno")
+            record["top_allocations"] = [
+                str(stat) for stat in stats[: self.tracemalloc_top]
+            ]
+        self.marks[phase] = record
+
+    def report(self) -> dict | None:
+        """
+        Gather the marks of all ranks and summarise them on rank 0.
+
+        Must be called by all ranks.
+
+        :returns summary: For each phase, the min/mean/max over ranks of the current
+            and peak RSS in bytes, the rank using the most memory and, if recorded,
+            that rank's top allocation sites. None on ranks other than 0, or if
+            disabled.
+        """
+        if not self.enabled:
+            return None
+        rank_marks = self.comm.gather(self.marks, root=0)
+        if self.comm.rank != 0:
+            return None
+
+        summary = {}
+        for phase in self.marks:
+            rss = np.array([marks[phase]["rss"] for marks in rank_marks])
+            peak = np.array([marks[phase]["peak"] for marks in rank_marks])
+            largest = int(peak.argmax())
+            summary[phase] = {
+                "rss": _stats(rss),
+                "peak": _stats(peak),
+                "largest_rank": largest,
+            }
+            if "top_allocations" in rank_marks[largest][phase]:
+                summary[phase]["top_allocations"] = rank_marks[largest][phase][
+                    "top_allocations"
+                ]
+
+        table = "\n".join(
+            f"{phase:>16}: rss {_format_mib(s['rss'])}, peak {_format_mib(s['peak'])}"
+            f" (largest on rank {s['largest_rank']})"
+            for phase, s in summary.items()
+        )
+        self.logger.info(f"Memory per rank (MiB, min/mean/max):\n{table}")
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        with (self.output_dir / MEMORY_SUMMARY).open("w") as f:
+            json.dump(summary, f, indent=2)
+        return summary
+
+
+class PhaseTimer:
+    """
+    Time the phases of a simulation on every rank.
+
+    Scripts wrap each phase (building the bases, the fields, the solver, setting up
+    the outputs, the main loop, ...) in `phase`, used either as a context manager or
+    as a decorator. Time spent in a phase entered several times is accumulated.
+    `report` reduces the timings over ranks and writes `PHASE_SUMMARY` to the output
+    directory from rank 0, together with the total time since the timer was created,
+    so that the fraction of a job spent on setup can be read off directly.
+
+    Timing a phase costs two calls to `time.perf_counter`, with no communication, so
+    the timer is always enabled.
+    """
+
+    times: dict[str, float]
+
+    def __init__(
+        self,
+        output_dir: Path | str,
+        logger: Logger,
+        *,
+        comm: MPI.Comm = MPI.COMM_WORLD,
+    ) -> None:
+        """
+        Start the clock for the whole job.
+
+        :param output_dir: Output directory of the run, where the summary is written.
+        :param logger: Logger used by the script.
+        :param comm: Communicator the simulation runs on.
+        """
+        self.output_dir = Path(output_dir)
+        self.logger = logger
+        self.comm = comm
+        self.times = {}
+
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Time the enclosed block, or the decorated function, as the phase `name`.
+
+        :param name: Name of the phase.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[name] = self.times.get(name, 0.0) + time.perf_counter() - start
+
+    def report(self) -> dict | None:
+        """
+        Gather the phase timings of all ranks and summarise them on rank 0.
+
+        Must be called by all ranks, once all phases are over.
+
+        :returns summary: The number of ranks, the min/mean/max over ranks of the
+            total time and, for each phase, the min/mean/max over ranks of the time
+            spent in it and the fraction of the mean total time this represents. None
+            on ranks other than 0.
+        """
+        total = time.perf_counter() - self._start
+        rank_times = self.comm.gather((total, self.times), root=0)
+        if self.comm.rank != 0:
+            return None
+
+        totals = _stats(np.array([t for t, _ in rank_times]))
+        phases = {}
+        for phase in self.times:
+            times = _stats(np.array([times[phase] for _, times in rank_times]))
+            phases[phase] = {**times, "fraction": times["mean"] / totals["mean"]}
+        summary = {"ranks": len(rank_times), "total": totals, "phases": phases}
+
+        table = "\n".join(
+            f"{phase:>16}: {t['min']:.3e}/{t['mean']:.3e}/{t['max']:.3e}"
+            f" ({100 * t['fraction']:.1f}%)"
+            for phase, t in phases.items()
+        )
+        self.logger.info(
+            f"Time per phase (s, min/mean/max over ranks, % of total "
+            f"{totals['mean']:.3e} s):\n{table}"
+        )
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        with (self.output_dir / PHASE_SUMMARY).open("w") as f:
+            json.dump(summary, f, indent=2)
+        return summary
+
+
+def _stats(values: np.ndarray) -> dict[str, float]:
+    """Min, mean and max of a per-rank quantity."""
+    return {
+        "min": float(values.min()),
+        "mean": float(values.mean()),
+        "max": float(values.max()),
+    }
+
+
+def _format_mib(stats: dict[str, float]) -> str:
+    """Format min/mean/max byte counts in MiB."""
+    return "/".join(f"{value / 2**20:.0f}" for value in stats.values())
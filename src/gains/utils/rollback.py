@@ -0,0 +1,191 @@
+"""In-memory rollback of the solver state when a run goes unstable."""
+
+from collections import deque
+from logging import Logger
+from typing import TYPE_CHECKING
+
+import numpy as np
+from mpi4py import MPI
+
+from gains.exceptions import BlowUpError
+
+if TYPE_CHECKING:
+    import dedalus
+    import dedalus.public as d3
+
+
+def _is_multistep(timestepper: object) -> bool:
+    """Whether a dedalus timestepper is a multistep scheme, keeping a history."""
+    return any(cls.__name__ == "MultistepIMEX" for cls in type(timestepper).__mro__)
+
+
+def restart_timestepper(
+    solver: "dedalus.core.solvers.InitialValueSolver", logger: Logger
+) -> None:
+    """
+    Restart a multistep timestepper at first order, discarding its history.
+
+    dedalus has no public way to do this, so the private iteration count of the
+    timestepper is reset. If it is missing, e.g. after a change to dedalus, a
+    multistep scheme keeps its history and a warning is logged. Runge-Kutta schemes
+    keep no history and are left as they are.
+
+    :param solver: The IVP solver defined by the script.
+    :param logger: Logger used by the script.
+    """
+    timestepper = solver.timestepper
+    if hasattr(timestepper, "_iteration"):
+        timestepper._iteration = 0  # noqa: SLF001
+    elif _is_multistep(timestepper):
+        logger.warning(
+            f"Cannot restart {type(timestepper).__name__} at first order: it keeps"
+            " the history of steps that are no longer part of the run."
+        )
+
+
+class _Snapshot:
+    """Copy of the solver state and clock at a given iteration."""
+
+    def __init__(self, solver: "dedalus.core.solvers.InitialValueSolver") -> None:
+        self.iteration = solver.iteration
+        self.sim_time = solver.sim_time
+        self.coeffs = [field["c"].copy() for field in solver.state]
+
+
+class BlowUpRecovery:
+    """
+    Keep recent solver states in memory and roll back to them when a run blows up.
+
+    Every `cadence` iterations the state is checked on all ranks. A blow-up is a
+    non-finite value anywhere in the state, or the watched flow property exceeding
+    `threshold`. On a blow-up the newest stored state is restored, the CFL safety
+    factor and maximum timestep are multiplied by `reduction`, and the run
+    continues. Healthy states are stored every `snapshot_cadence` iterations, keeping
+    the `depth` most recent ones. A state that is rolled back to is dropped from the
+    buffer, so repeated failures go further back in time. Once the buffer is empty,
+    or after `max_rollbacks` interventions, `BlowUpError` is raised.
+
+    Multistep timesteppers keep a history of previous steps, which is discarded on a
+    rollback: they restart at first order from the restored state. Outputs written
+    between the restored state and the blow-up are not removed, so file handlers may
+    contain repeated simulation times after an intervention.
+    """
+
+    def __init__(
+        self,
+        flow: "d3.GlobalFlowProperty",
+        name: str,
+        logger: Logger,
+        *,
+        depth: int = 3,
+        threshold: float = np.inf,
+        reduction: float = 0.5,
+        cadence: int = 10,
+        snapshot_cadence: int = 100,
+        max_rollbacks: int = 10,
+        comm: MPI.Comm = MPI.COMM_WORLD,
+    ) -> None:
+        """
+        Configure the checks and the state buffer.
+
+        :param flow: dedalus flow object tracking the watched property.
+        :param name: Name of the flow property whose maximum is watched.
+        :param logger: Logger used by the script, to record each intervention.
+        :param depth: Number of states kept in memory.
+        :param threshold: Maximum of the watched property beyond which the run is
+            considered to have blown up.
+        :param reduction: Factor applied to the CFL safety and maximum timestep on
+            each rollback.
+        :param cadence: Number of iterations between checks. Should be a multiple of
+            the cadence of `flow`.
+        :param snapshot_cadence: Number of iterations between stored states. Should
+            be a multiple of `cadence`.
+        :param max_rollbacks: Number of rollbacks after which the run is abandoned.
+        :param comm: Communicator the simulation runs on.
+        """
+        self.flow = flow
+        self.name = name
+        self.logger = logger
+        self.threshold = threshold
+        self.reduction = reduction
+        self.cadence = cadence
+        self.snapshot_cadence = snapshot_cadence
+        self.max_rollbacks = max_rollbacks
+        self.comm = comm
+        self.rollbacks = 0
+
+        self._snapshots: deque[_Snapshot] = deque(maxlen=depth)
+
+    def _is_finite(self, solver: "dedalus.core.solvers.InitialValueSolver") -> bool:
+        """Check, on all ranks, that the state holds no NaN or inf."""
+        local = all(np.isfinite(field.data).all() for field in solver.state)
+        return self.comm.allreduce(local, op=MPI.LAND)
+
+    def update(
+        self,
+        solver: "dedalus.core.solvers.InitialValueSolver",
+        cfl: "d3.CFL",
+    ) -> bool:
+        """
+        Check the state, if due, storing it when healthy and rolling back if not.
+
+        Must be called by all ranks on every iteration.
+
+        :param solver: The IVP solver defined by the script.
+        :param cfl: The CFL condition used by the script.
+        :returns rolled_back: Whether the solver was rolled back, so its simulation
+            time went backwards.
+        """
+        if solver.iteration % self.cadence != 0:
+            return False
+        if not self._is_finite(solver):
+            self.rollback(solver, cfl, "non-finite state")
+            return True
+        value = self.flow.max(self.name)
+        if not value <= self.threshold:
+            self.rollback(solver, cfl, f"max({self.name})={value:e}")
+            return True
+        if not self._snapshots or solver.iteration % self.snapshot_cadence == 0:
+            self._snapshots.append(_Snapshot(solver))
+        return False
+
+    def rollback(
+        self,
+        solver: "dedalus.core.solvers.InitialValueSolver",
+        cfl: "d3.CFL",
+        reason: str,
+    ) -> None:
+        """
+        Restore the newest stored state and reduce the timestep.
+
+        :param solver: The IVP solver defined by the script.
+        :param cfl: The CFL condition used by the script.
+        :param reason: Description of the blow-up, for the log.
+        """
+        if not self._snapshots or self.rollbacks >= self.max_rollbacks:
+            raise BlowUpError(solver.iteration, reason)
+        snapshot = self._snapshots.pop()
+        for field, coeffs in zip(solver.state, snapshot.coeffs, strict=True):
+            field["c"] = coeffs
+        failed_at = solver.iteration
+        solver.iteration = snapshot.iteration
+        solver.sim_time = snapshot.sim_time
+        # Restart multistep schemes, as their history is now invalid
+        restart_timestepper(solver, self.logger)
+
+        cfl.safety *= self.reduction
+        cfl.max_dt *= self.reduction
+        cfl.stored_dt = min(cfl.stored_dt, cfl.max_dt)
+        self.rollbacks += 1
+        self.logger.warning(
+            "Blow-up at Iteration=%i (%s): rolled back to Iteration=%i, Time=%e "
+            "with CFL safety=%f, max_dt=%e"
+            % (
+                failed_at,
+                reason,
+                snapshot.iteration,
+                snapshot.sim_time,
+                cfl.safety,
+                cfl.max_dt,
+            )
+        )
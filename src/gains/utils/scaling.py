@@ -0,0 +1,355 @@
+"""Strong- and weak-scaling benchmarks of the simulation scripts, on local cores."""
+
+import argparse
+import importlib.metadata
+import json
+import math
+import platform
+from collections.abc import Callable, Hashable, Sequence
+from logging import Logger
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+import gains
+from gains.utils.profile import MEMORY_SUMMARY, PHASE_SUMMARY
+from gains.utils.sweep import ArgumentSweep, Sweep
+from gains.utils.telemetry import LOAD_BALANCE_FILE
+
+# Parameters setting the resolution of the Cartesian scripts (kelvin_helmholtz), in
+# the order they are given on the command line.
+PLANE_RESOLUTION = ("Nx", "Ny")
+
+
+def parse_plane_resolution(spec: str) -> dict[str, int]:
+    """
+    Parse the resolution of a Cartesian script from the command line.
+
+    :param spec: Resolution of the form NX,NY.
+    :returns resolution: The resolution, by parameter name.
+    """
+    try:
+        return dict(zip(PLANE_RESOLUTION, map(int, spec.split(",")), strict=True))
+    except ValueError:
+        msg = f"expected NX,NY, got {spec!r}"
+        raise argparse.ArgumentTypeError(msg) from None
+
+
+def _read_json(path: Path) -> Any:  # noqa: ANN401
+    """Load a JSON file, or return None if it was not written."""
+    try:
+        with path.open() as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def steady_step_time(output_dir: Path | str) -> tuple[float, int] | None:
+    """
+    Read the wall time per iteration of a run, once stepping has settled.
+
+    The time per iteration of each rank is its time in `solver.step` plus its wait
+    for the slowest rank, from the summaries of `LoadBalanceMonitor`. The first
+    summary is left out, as it includes the first steps, where the timestepper
+    builds up its history and the matrices are factorised.
+
+    :param output_dir: Output directory of the run.
+    :returns step_time: Mean wall time per iteration over the later summaries,
+        weighted by the number of iterations each covers.
+    :returns iterations: Number of iterations it is measured over. None if the run
+        wrote fewer than two summaries.
+    """
+    try:
+        with (Path(output_dir) / LOAD_BALANCE_FILE).open() as f:
+            summaries = [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return None
+    if len(summaries) < 2:  # noqa: PLR2004
+        return None
+
+    iterations = np.diff([summary["iteration"] for summary in summaries])
+    times = [summary["mean_step"] + summary["mean_wait"] for summary in summaries[1:]]
+    return float(np.average(times, weights=iterations)), int(iterations.sum())
+
+
+def setup_time(output_dir: Path | str) -> float | None:
+    """
+    Read the wall time a run spent before its main loop, from `PHASE_SUMMARY`.
+
+    :param output_dir: Output directory of the run.
+    :returns setup_time: Total time of the slowest rank, less its time in the main
+        loop. None if the run wrote no summary.
+    """
+    summary = _read_json(Path(output_dir) / PHASE_SUMMARY)
+    if summary is None:
+        return None
+    return summary["total"]["max"] - summary["phases"]["main_loop"]["max"]
+
+
+def peak_memory(output_dir: Path | str, ranks: int) -> dict[str, int] | None:
+    """
+    Read the peak memory of a run, from `MEMORY_SUMMARY`.
+
+    :param output_dir: Output directory of the run.
+    :param ranks: Number of ranks of the run.
+    :returns memory: Peak RSS in bytes of the rank using the most memory, and summed
+        over ranks. None if the run wrote no summary.
+    """
+    summary = _read_json(Path(output_dir) / MEMORY_SUMMARY)
+    if not summary:
+        return None
+    # The peak RSS only grows, so the last phase marked holds the peak of the run
+    peak = summary[list(summary)[-1]]["peak"]
+    return {"peak_memory": int(peak["max"]), "total_memory": int(peak["mean"] * ranks)}
+
+
+def run_metrics(output_dir: Path | str, ranks: int) -> dict[str, Any]:
+    """
+    Collect the measurements of a benchmark run.
+
+    :param output_dir: Output directory of the run.
+    :param ranks: Number of ranks of the run.
+    :returns metrics: Setup time, steady-state time per iteration (and the number of
+        iterations it is measured over) and peak memory. Missing measurements are
+        None.
+    """
+    steady = steady_step_time(output_dir)
+    memory = peak_memory(output_dir, ranks) or {
+        "peak_memory": None,
+        "total_memory": None,
+    }
+    return {
+        "setup_time": setup_time(output_dir),
+        "step_time": steady[0] if steady is not None else None,
+        "timed_iterations": steady[1] if steady is not None else None,
+        **memory,
+    }
+
+
+def _measured(results: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Keep the runs that completed with a steady-state time per iteration."""
+    return [
+        result
+        for result in results
+        if result["status"] == "completed" and result["step_time"] is not None
+    ]
+
+
+def _points_per_rank(result: dict[str, Any]) -> float:
+    """Count the grid points of a run per rank."""
+    return math.prod(result["resolution"].values()) / result["ranks"]
+
+
+def _group(
+    results: list[dict[str, Any]], key: Callable[[dict[str, Any]], Hashable]
+) -> list[list[dict[str, Any]]]:
+    """Group the runs of each script by a key, ordered by number of ranks."""
+    groups: dict[tuple[str, Hashable], list[dict[str, Any]]] = {}
+    for result in sorted(results, key=lambda result: result["ranks"]):
+        groups.setdefault((result["script"], key(result)), []).append(result)
+    return list(groups.values())
+
+
+def _resolution_key(result: dict[str, Any]) -> str:
+    """Express the resolution of a run as a hashable key."""
+    return json.dumps(result["resolution"], sort_keys=True)
+
+
+def strong_scaling(results: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Compute the strong-scaling efficiency of the runs at each resolution.
+
+    At a fixed resolution, the efficiency on n ranks relative to the run on the
+    fewest ranks n0 is t(n0) n0 / (t(n) n), with t the time per iteration.
+
+    :param results: Benchmark runs, each with its script, resolution, ranks, status
+        and time per iteration.
+    :returns scaling: Speedup and efficiency of each completed run, relative to the
+        run of the same script and resolution on the fewest ranks.
+    """
+    scaling = []
+    for runs in _group(_measured(results), _resolution_key):
+        base = runs[0]
+        for run in runs:
+            speedup = base["step_time"] / run["step_time"]
+            scaling.append(
+                {
+                    "script": run["script"],
+                    "resolution": run["resolution"],
+                    "ranks": run["ranks"],
+                    "base_ranks": base["ranks"],
+                    "step_time": run["step_time"],
+                    "speedup": speedup,
+                    "efficiency": speedup * base["ranks"] / run["ranks"],
+                }
+            )
+    return scaling
+
+
+def weak_scaling(results: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Compute the weak-scaling efficiency of runs with the same grid points per rank.
+
+    At a fixed number of grid points per rank, the efficiency on n ranks relative to
+    the run on the fewest ranks n0 is t(n0) / t(n). The cost of spectral transforms
+    grows faster than the number of grid points, so even perfect parallel scaling
+    gives efficiencies somewhat below 1.
+
+    :param results: Benchmark runs, each with its script, resolution, ranks, status
+        and time per iteration.
+    :returns scaling: Efficiency of each completed run, relative to the run of the
+        same script and grid points per rank on the fewest ranks. Only groups of more
+        than one run are included.
+    """
+    scaling = []
+    for runs in _group(_measured(results), _points_per_rank):
+        if len(runs) < 2:  # noqa: PLR2004
+            continue
+        base = runs[0]
+        scaling.extend(
+            {
+                "script": run["script"],
+                "points_per_rank": _points_per_rank(run),
+                "resolution": run["resolution"],
+                "ranks": run["ranks"],
+                "base_ranks": base["ranks"],
+                "step_time": run["step_time"],
+                "efficiency": base["step_time"] / run["step_time"],
+            }
+            for run in runs
+        )
+    return scaling
+
+
+def compare_results(
+    baseline: dict[str, Any], results: dict[str, Any]
+) -> list[dict[str, Any]]:
+    """
+    Compare the runs of two benchmarks, e.g. of two versions of the code.
+
+    :param baseline: Contents of an earlier result file.
+    :param results: Contents of the new result file.
+    :returns comparison: For each run measured in both, the ratio of the new to the
+        baseline time per iteration, setup time and peak memory (below 1 is an
+        improvement).
+    """
+
+    def key(run: dict[str, Any]) -> tuple[str, str, int]:
+        return run["script"], _resolution_key(run), run["ranks"]
+
+    earlier = {key(run): run for run in _measured(baseline["runs"])}
+    comparison = []
+    for run in _measured(results["runs"]):
+        if key(run) not in earlier:
+            continue
+        ratios = {
+            f"{name}_ratio": run[name] / earlier[key(run)][name]
+            if run[name] and earlier[key(run)][name]
+            else None
+            for name in ("step_time", "setup_time", "peak_memory")
+        }
+        comparison.append(
+            {
+                "script": run["script"],
+                "resolution": run["resolution"],
+                "ranks": run["ranks"],
+                **ratios,
+            }
+        )
+    return comparison
+
+
+def versions() -> dict[str, str]:
+    """Versions of the code and of its main dependencies, stored with the results."""
+
+    def installed(package: str) -> str:
+        try:
+            return importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            return "unknown"
+
+    return {
+        "gains": gains.__version__,
+        "dedalus": installed("dedalus"),
+        "numpy": np.__version__,
+        "mpi4py": installed("mpi4py"),
+        "python": platform.python_version(),
+    }
+
+
+def run_scaling_benchmark(
+    script: Path | str,
+    base_params: dict[str, Any] | None,
+    resolutions: list[dict[str, int]],
+    benchmark_dir: Path | str,
+    logger: Logger,
+    *,
+    ranks: Sequence[int],
+    iterations: int = 200,
+    load_balance_cadence: int = 50,
+    launcher: Sequence[str] | None = ("mpiexec", "-n", "{ranks}"),
+    poll_interval: float = 1.0,
+) -> list[dict[str, Any]]:
+    """
+    Run a simulation script for a fixed number of iterations over resolutions and ranks.
+
+    Every resolution is run on every number of ranks, one run at a time so that runs
+    do not compete for cores, as a `Sweep` per number of ranks under
+    `benchmark_dir/<script>/ranks_<n>`. Runs already completed by an earlier
+    benchmark in the same directory are not run again. Each run writes the phase
+    timings, memory summary and load-balance summaries the measurements are read
+    from, with a summary every `load_balance_cadence` iterations.
+
+    :param script: Simulation script to run.
+    :param base_params: Parameters the resolutions are applied to, for scripts taking
+        a parameter file (see `SimulationCLI`). None for scripts taking their
+        parameters as arguments, as `kelvin_helmholtz` does.
+    :param resolutions: Resolutions to run at, by parameter name.
+    :param benchmark_dir: Directory under which the runs are written.
+    :param logger: Logger used to report progress.
+    :param ranks: Numbers of MPI ranks to run on.
+    :param iterations: Number of iterations of each run.
+    :param load_balance_cadence: Iterations between load-balance summaries. The time
+        per iteration is measured from the second summary on, so should be at most
+        half of `iterations`.
+    :param launcher: Command prefix launching the script in parallel, in which
+        "{ranks}" is replaced by the number of ranks. None runs the script directly.
+    :param poll_interval: Seconds between checks on the running subprocess.
+    :returns results: For each run, the script, resolution, ranks, status, wall time
+        and the measurements of `run_metrics`.
+    """
+    script = Path(script)
+    sweep_class = Sweep if base_params is not None else ArgumentSweep
+    results = []
+    for n in ranks:
+        sweep = sweep_class(
+            script,
+            base_params or {},
+            resolutions,
+            Path(benchmark_dir) / script.stem / f"ranks_{n}",
+            logger,
+            ranks_per_run=n,
+            max_concurrent=1,
+            script_args=[
+                "--stop_iteration",
+                str(iterations),
+                "--load_balance_cadence",
+                str(load_balance_cadence),
+                "--profile_memory",
+            ],
+            launcher=launcher,
+            poll_interval=poll_interval,
+        )
+        results.extend(
+            {
+                "script": script.stem,
+                "resolution": run.overrides,
+                "ranks": n,
+                "status": run.status,
+                "wall_time": run.wall_time,
+                **run_metrics(run.run_dir, n),
+            }
+            for run in sweep.run()
+        )
+    return results
@@ -0,0 +1,361 @@
+"""Parameter sweeps run as local `mpiexec` subprocesses, without a batch scheduler."""
+
+import argparse
+import importlib
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+from collections.abc import Sequence
+from logging import Logger
+from pathlib import Path
+from typing import Any
+
+from gains.utils.walltime import read_run_state
+
+PARAMETER_FILE = "parameters.json"
+SWEEP_SUMMARY = "sweep_summary.json"
+STDOUT_FILE = "stdout.txt"
+
+# Statuses after which a run is given another attempt, if any retries are left.
+# Interrupted runs resume from their checkpoint when relaunched.
+RETRY_STATUSES = ("failed", "interrupted")
+
+# Parameters setting the resolution, in the order they are given on the command line.
+RESOLUTION = ("Nphi", "Ntheta", "Nr")
+
+
+def expand_grid(grid: dict[str, Sequence]) -> list[dict[str, Any]]:
+    """
+    Expand a grid of parameter values into one set of overrides per grid point.
+
+    :param grid: Values taken by each swept parameter.
+    :returns overrides: Every combination of the values, in row-major order (the last
+        parameter varies fastest).
+    """
+    names = list(grid)
+    return [
+        dict(zip(names, values, strict=True))
+        for values in itertools.product(*(grid[name] for name in names))
+    ]
+
+
+def parse_grid_axis(spec: str) -> tuple[str, list[Any]]:
+    """
+    Parse one axis of a parameter grid from the command line.
+
+    :param spec: Axis of the form NAME=VALUE,VALUE,... Each value is read as JSON
+        where possible (so numbers become numbers), and kept as a string otherwise.
+    :returns name: Name of the parameter.
+    :returns values: Values taken by the parameter.
+    """
+    name, sep, values = spec.partition("=")
+    if not sep:
+        msg = f"expected NAME=VALUE,VALUE,..., got {spec!r}"
+        raise argparse.ArgumentTypeError(msg)
+
+    def parse(value: str) -> Any:  # noqa: ANN401
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            return value
+
+    return name, [parse(value) for value in values.split(",")]
+
+
+def parse_resolution(spec: str) -> dict[str, int]:
+    """
+    Parse a resolution from the command line.
+
+    :param spec: Resolution of the form NPHI,NTHETA,NR.
+    :returns resolution: The resolution, by parameter name.
+    """
+    try:
+        return dict(zip(RESOLUTION, map(int, spec.split(",")), strict=True))
+    except ValueError:
+        msg = f"expected NPHI,NTHETA,NR, got {spec!r}"
+        raise argparse.ArgumentTypeError(msg) from None
+
+
+def load_base_params(spec: str | Path) -> dict[str, Any]:
+    """
+    Load the parameters that the overrides of a sweep are applied on top of.
+
+    :param spec: Path to a JSON parameter file, or the name of a module in
+        `gains.params` (e.g. "spherical_shell").
+    :returns params: Copy of the parameters.
+    """
+    if str(spec).endswith(".json"):
+        with Path(spec).open() as f:
+            return json.load(f)
+    return dict(importlib.import_module(f"gains.params.{spec}").parameters)
+
+
+class SweepRun:
+    """A single run of a sweep, and the record of its attempts."""
+
+    process: subprocess.Popen | None
+
+    def __init__(self, name: str, run_dir: Path, overrides: dict[str, Any]) -> None:
+        """
+        Describe the run.
+
+        :param name: Name of the run, unique within the sweep.
+        :param run_dir: Output directory of the run.
+        :param overrides: Parameters changed from the base parameters of the sweep.
+        """
+        self.name = name
+        self.run_dir = run_dir
+        self.overrides = overrides
+        self.status = "pending"
+        self.attempts = 0
+        self.wall_time = 0.0
+        self.returncode: int | None = None
+        self.process = None
+        self.started = 0.0
+
+    def summary(self) -> dict[str, Any]:
+        """Record of the run, as stored in `SWEEP_SUMMARY`."""
+        return {
+            "name": self.name,
+            "status": self.status,
+            "attempts": self.attempts,
+            "wall_time": self.wall_time,
+            "returncode": self.returncode,
+            "overrides": self.overrides,
+        }
+
+
+class Sweep:
+    """
+    Run a simulation script once per set of parameter overrides, on local cores.
+
+    Each run gets its own directory under `sweep_dir`, holding the parameter file it
+    was launched with (the base parameters with its overrides applied) and all of
+    its outputs. Runs are launched as `mpiexec -n <ranks_per_run>` subprocesses,
+    packed onto `cores` cores, and at most `max_concurrent` run at once. A run that
+    exits with an error, or that stops early and records itself as interrupted (see
+    `gains.utils.walltime`), is relaunched up to `retries` times. Runs already
+    recorded as completed are skipped, so an interrupted sweep can be relaunched.
+
+    The status and wall time of every run are written to `SWEEP_SUMMARY` in
+    `sweep_dir` whenever a run finishes.
+    """
+
+    runs: list[SweepRun]
+
+    def __init__(
+        self,
+        script: Path | str,
+        base_params: dict[str, Any],
+        overrides: list[dict[str, Any]],
+        sweep_dir: Path | str,
+        logger: Logger,
+        *,
+        ranks_per_run: int = 1,
+        cores: int | None = None,
+        max_concurrent: int | None = None,
+        retries: int = 0,
+        script_args: Sequence[str] = (),
+        launcher: Sequence[str] | None = ("mpiexec", "-n", "{ranks}"),
+        poll_interval: float = 1.0,
+    ) -> None:
+        """
+        Configure the sweep.
+
+        :param script: Simulation script to run, which must accept the standard
+            `SimulationCLI` arguments.
+        :param base_params: Parameters shared by all runs.
+        :param overrides: Parameters changed by each run.
+        :param sweep_dir: Directory under which each run gets its own directory.
+        :param logger: Logger used to report progress.
+        :param ranks_per_run: Number of MPI ranks of each run.
+        :param cores: Number of cores to pack the runs onto. Defaults to all cores
+            of the machine.
+        :param max_concurrent: Maximum number of runs at once, on top of the limit
+            set by `cores`.
+        :param retries: Number of times a failed or interrupted run is relaunched.
+        :param script_args: Additional arguments passed to every run of the script.
+        :param launcher: Command prefix launching the script in parallel, in which
+            "{ranks}" is replaced by `ranks_per_run`. None runs the script directly.
+        :param poll_interval: Seconds between checks on the running subprocesses.
+        """
+        self.script = Path(script)
+        self.base_params = base_params
+        self.sweep_dir = Path(sweep_dir).resolve()
+        self.logger = logger
+        self.ranks_per_run = ranks_per_run
+        self.retries = retries
+        self.script_args = list(script_args)
+        self.launcher = launcher
+        self.poll_interval = poll_interval
+
+        if cores is None:
+            cores = os.cpu_count() or 1
+        self.slots = max(cores // ranks_per_run, 1)
+        if max_concurrent is not None:
+            self.slots = min(self.slots, max_concurrent)
+
+        width = len(str(max(len(overrides) - 1, 0)))
+        self.runs = [
+            SweepRun(f"run_{i:0{width}d}", self.sweep_dir / f"run_{i:0{width}d}", o)
+            for i, o in enumerate(overrides)
+        ]
+
+    def command(self, run: SweepRun) -> list[str]:
+        """
+        Build the command launching a run.
+
+        :param run: The run to launch.
+        :returns command: Arguments of the subprocess.
+        """
+        prefix = [arg.format(ranks=self.ranks_per_run) for arg in (self.launcher or ())]
+        return [
+            *prefix,
+            sys.executable,
+            str(self.script),
+            "--parameter_file",
+            str(run.run_dir / PARAMETER_FILE),
+            "--output_dir",
+            str(run.run_dir),
+            "--logfile",
+            "log",
+            *self.script_args,
+        ]
+
+    def prepare(self) -> None:
+        """Write the parameter file of each run, and mark completed runs."""
+        for run in self.runs:
+            run.run_dir.mkdir(parents=True, exist_ok=True)
+            with (run.run_dir / PARAMETER_FILE).open("w") as f:
+                json.dump({**self.base_params, **run.overrides}, f, indent=2)
+            state = read_run_state(run.run_dir)
+            if state is not None and state["status"] == "completed":
+                run.status = "completed"
+
+    def _launch(self, run: SweepRun) -> None:
+        """Start a subprocess for the next attempt of a run."""
+        run.attempts += 1
+        run.status = "running"
+        run.started = time.monotonic()
+        with (run.run_dir / STDOUT_FILE).open("a") as stdout:
+            run.process = subprocess.Popen(  # noqa: S603
+                self.command(run), stdout=stdout, stderr=subprocess.STDOUT
+            )
+        self.logger.info(
+            f"Launched {run.name} (attempt {run.attempts}): {run.overrides}"
+        )
+
+    def _collect(self, run: SweepRun) -> bool:
+        """
+        Check whether the subprocess of a run has exited, and record the outcome.
+
+        :param run: A running run.
+        :returns finished: Whether the subprocess has exited.
+        """
+        returncode = run.process.poll()
+        if returncode is None:
+            return False
+        run.wall_time += time.monotonic() - run.started
+        run.returncode = returncode
+        run.process = None
+        state = read_run_state(run.run_dir)
+        if returncode != 0:
+            run.status = "failed"
+        elif state is not None and state["status"] in RETRY_STATUSES:
+            run.status = state["status"]
+        else:
+            run.status = "completed"
+        if run.status in RETRY_STATUSES and run.attempts <= self.retries:
+            self.logger.warning(f"{run.name} {run.status}, relaunching it.")
+            run.status = "pending"
+        else:
+            self.logger.info(f"{run.name} {run.status} in {run.wall_time:.1f} s.")
+        return True
+
+    def run(self) -> list[SweepRun]:
+        """
+        Run every pending run, keeping as many running as the slots allow.
+
+        :returns runs: All runs of the sweep, with their final status.
+        """
+        self.prepare()
+        self.write_summary()
+        running: list[SweepRun] = []
+        while True:
+            for run in list(running):
+                if self._collect(run):
+                    running.remove(run)
+                    self.write_summary()
+            pending = [run for run in self.runs if run.status == "pending"]
+            while pending and len(running) < self.slots:
+                run = pending.pop(0)
+                self._launch(run)
+                running.append(run)
+            if not running:
+                break
+            time.sleep(self.poll_interval)
+        self.write_summary()
+        return self.runs
+
+    def write_summary(self) -> None:
+        """Write the record of every run to `SWEEP_SUMMARY`."""
+        self.sweep_dir.mkdir(parents=True, exist_ok=True)
+        with (self.sweep_dir / SWEEP_SUMMARY).open("w") as f:
+            json.dump(
+                {
+                    "script": str(self.script),
+                    "ranks_per_run": self.ranks_per_run,
+                    "runs": [run.summary() for run in self.runs],
+                },
+                f,
+                indent=2,
+            )
+
+    def format_summary(self) -> str:
+        """
+        Tabulate the status and wall time of each run.
+
+        :returns table: One row per run, with its overrides.
+        """
+        rows = [
+            f"{run.name:<10} {run.status:<12} {run.attempts:>8} {run.wall_time:>12.1f}"
+            f"  {json.dumps(run.overrides)}"
+            for run in self.runs
+        ]
+        header = f"{'run':<10} {'status':<12} {'attempts':>8} {'wall time/s':>12}"
+        return "\n".join([header, *rows])
+
+
+class ArgumentSweep(Sweep):
+    """
+    A sweep of a script that takes its parameters as command-line arguments.
+
+    For scripts without a parameter file (e.g. `kelvin_helmholtz`), each run is
+    launched with its parameters (the base parameters with its overrides applied)
+    as `--NAME VALUE` arguments, and its output directory as `--output_dir`. The
+    parameter file is still written, as a record of the run.
+    """
+
+    def command(self, run: SweepRun) -> list[str]:
+        """
+        Build the command launching a run.
+
+        :param run: The run to launch.
+        :returns command: Arguments of the subprocess.
+        """
+        prefix = [arg.format(ranks=self.ranks_per_run) for arg in (self.launcher or ())]
+        params = {**self.base_params, **run.overrides}
+        return [
+            *prefix,
+            sys.executable,
+            str(self.script),
+            *itertools.chain.from_iterable(
+                (f"--{name}", str(value)) for name, value in params.items()
+            ),
+            "--output_dir",
+            str(run.run_dir),
+            *self.script_args,
+        ]
@@ -0,0 +1,146 @@
+"""Per-rank timing of the main loop, to measure load imbalance between ranks."""
+
+import json
+import time
+from logging import Logger
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+from mpi4py import MPI
+
+if TYPE_CHECKING:
+    import dedalus
+    import dedalus.public as d3
+
+LOAD_BALANCE_FILE = "load_balance.jsonl"
+
+# Phases of an iteration timed on every rank, in the order they are stored.
+PHASES = ("cfl", "step", "wait")
+
+
+def summarise_imbalance(times: np.ndarray) -> dict[str, Any]:
+    """
+    Summarise how evenly the work of an iteration is spread over the ranks.
+
+    :param times: Mean time per iteration of each phase in `PHASES`, with shape
+        (number of ranks, number of phases).
+    :returns summary: Mean, min and max step time over ranks, the max/mean imbalance
+        ratio and slowest rank, and the time spent waiting for the other ranks.
+    """
+    step = times[:, PHASES.index("step")]
+    wait = times[:, PHASES.index("wait")]
+    mean_step = float(step.mean())
+    return {
+        "ranks": len(step),
+        "mean_step": mean_step,
+        "min_step": float(step.min()),
+        "max_step": float(step.max()),
+        "imbalance": float(step.max() / mean_step) if mean_step > 0 else 1.0,
+        "slowest_rank": int(step.argmax()),
+        "mean_wait": float(wait.mean()),
+        "max_wait": float(wait.max()),
+        "wait_fraction": float(wait.sum() / times.sum()) if times.sum() > 0 else 0.0,
+    }
+
+
+class LoadBalanceMonitor:
+    """
+    Time each rank's share of the main loop and summarise the imbalance on rank 0.
+
+    Each iteration, the time every rank spends computing the timestep (which includes
+    the CFL reduction), inside `solver.step` and waiting at a barrier placed after the
+    step is accumulated. The barrier wait is the time a rank idles until the slowest
+    rank has finished its step. Every `cadence` iterations the mean times are gathered
+    to rank 0, which logs a summary and appends it to `LOAD_BALANCE_FILE` in the output
+    directory.
+
+    The barrier synchronises the ranks once per iteration, so the monitor is intended
+    for diagnostic runs rather than production.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path | str,
+        logger: Logger,
+        *,
+        cadence: int = 100,
+        mesh: list[int] | None = None,
+        comm: MPI.Comm = MPI.COMM_WORLD,
+    ) -> None:
+        """
+        Set up the per-rank accumulators.
+
+        :param output_dir: Output directory of the run, where summaries are written.
+        :param logger: Logger used by the script.
+        :param cadence: Number of iterations between summaries.
+        :param mesh: Processor mesh of the distributor, stored with each summary.
+        :param comm: Communicator the simulation runs on.
+        """
+        self.path = Path(output_dir) / LOAD_BALANCE_FILE
+        self.logger = logger
+        self.cadence = cadence
+        self.mesh = mesh
+        self.comm = comm
+
+        self._times = np.zeros(len(PHASES))
+        self._iterations = 0
+
+    def step(
+        self,
+        solver: "dedalus.core.solvers.InitialValueSolver",
+        cfl: "d3.CFL",
+    ) -> float:
+        """
+        Compute the timestep and advance the solver, timing each phase.
+
+        Must be called by all ranks, in place of `cfl.compute_timestep` followed by
+        `solver.step`.
+
+        :param solver: The IVP solver defined by the script.
+        :param cfl: The CFL condition used by the script.
+        :returns timestep: The timestep that was taken.
+        """
+        start = time.perf_counter()
+        timestep = cfl.compute_timestep()
+        computed = time.perf_counter()
+        solver.step(timestep)
+        stepped = time.perf_counter()
+        self.comm.Barrier()
+        synced = time.perf_counter()
+
+        self._times += (computed - start, stepped - computed, synced - stepped)
+        self._iterations += 1
+        if solver.iteration % self.cadence == 0:
+            self.report(solver)
+        return timestep
+
+    def report(
+        self, solver: "dedalus.core.solvers.InitialValueSolver"
+    ) -> dict[str, Any] | None:
+        """
+        Gather the timings since the last report and summarise them on rank 0.
+
+        :param solver: The IVP solver defined by the script.
+        :returns summary: The summary on rank 0, None on all other ranks.
+        """
+        times = self.comm.gather(self._times / max(self._iterations, 1), root=0)
+        self._times[:] = 0
+        self._iterations = 0
+        if self.comm.rank != 0:
+            return None
+
+        summary = {
+            "iteration": solver.iteration,
+            "sim_time": solver.sim_time,
+            "mesh": self.mesh,
+            **summarise_imbalance(np.array(times)),
+        }
+        self.logger.info(
+            "Load balance: step max/mean=%.3f (slowest rank %i), mean wait=%e s"
+            % (summary["imbalance"], summary["slowest_rank"], summary["mean_wait"])
+        )
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a") as f:
+            f.write(json.dumps(summary) + "\n")
+        return summary
@@ -0,0 +1,212 @@
+"""
+Single HDF5 files viewing all the sets written by a dedalus file handler.
+
+Dedalus splits the output of each file handler into sets, `<handler>/<handler>_sN.h5`,
+of at most `max_writes` writes each, so reading a whole run means looping over the
+sets. `update_virtual_dataset` writes `<handler>.h5` next to the handler directory,
+holding one HDF5 virtual dataset per task and per time scale (`scales/sim_time`,
+`scales/iteration`, ...) that maps the writes of every set, in order, onto a single
+time axis. No data is copied, so the file is small and quick to write, and a slice
+over time of the virtual dataset reads from the sets it covers. The coordinate
+scales are copied from the first set and attached to the tasks as in the sets, so
+readers using `dset.dims` work on the virtual file unchanged.
+
+The virtual file records the sets and numbers of writes it maps. Updating it only
+opens the sets that are new or may have grown since (the last set mapped), and
+leaves the file untouched if nothing has changed, so it can be updated cheaply while
+a run is writing new sets. The sets are referred to by paths relative to the
+virtual file, so the output directory can be moved as a whole.
+"""
+
+import os
+import re
+from pathlib import Path
+
+import h5py
+import numpy as np
+
+from gains.utils.misc import extract_numerical_suffix
+
+# Root attributes of the virtual file recording the sets it maps.
+SET_FILES_ATTR = "set_files"
+SET_WRITES_ATTR = "set_writes"
+
+
+def set_files(handler_dir: Path | str) -> list[Path]:
+    """
+    List the sets written by a file handler, in the order they were written.
+
+    :param handler_dir: Directory of the file handler, holding `<handler>_sN.h5`.
+    :returns paths: Paths to the sets, ordered by set number.
+    """
+    handler_dir = Path(handler_dir)
+    pattern = re.compile(rf"{re.escape(handler_dir.name)}_s\d+")
+    return sorted(
+        (path for path in handler_dir.glob("*.h5") if pattern.fullmatch(path.stem)),
+        key=extract_numerical_suffix,
+    )
+
+
+def virtual_path(handler_dir: Path | str) -> Path:
+    """
+    Locate the virtual file of a file handler, `<handler>.h5` next to its directory.
+
+    :param handler_dir: Directory of the file handler.
+    :returns path: Path to the virtual file.
+    """
+    handler_dir = Path(handler_dir)
+    return handler_dir.with_name(f"{handler_dir.name}.h5")
+
+
+def _recorded_writes(path: Path) -> dict[str, int]:
+    """Read the sets mapped by an existing virtual file, and their numbers of writes."""
+    try:
+        with h5py.File(path, "r") as f:
+            return dict(
+                zip(
+                    (str(name) for name in f.attrs[SET_FILES_ATTR]),
+                    (int(writes) for writes in f.attrs[SET_WRITES_ATTR]),
+                    strict=True,
+                )
+            )
+    except (OSError, KeyError):
+        return {}
+
+
+def _count_writes(path: Path) -> int:
+    """
+    Count the complete writes of a set.
+
+    Datasets are extended one at a time as a write proceeds, so a set being written
+    can briefly hold more writes of some tasks than others.
+    """
+    with h5py.File(path, "r") as f:
+        return min(
+            [f["scales/sim_time"].shape[0]]
+            + [dset.shape[0] for dset in f["tasks"].values()]
+        )
+
+
+def _time_scales(first_set: h5py.File) -> set[str]:
+    """Find the scales indexed by write, i.e. attached to the time axis of the tasks."""
+    names = {"/scales/sim_time"}
+    for dset in first_set["tasks"].values():
+        names.update(scale.name for scale in dset.dims[0].values())
+    return names
+
+
+def _datasets(group: h5py.Group) -> list[h5py.Dataset]:
+    """List the datasets under a group, at any depth."""
+    datasets = []
+    group.visititems(
+        lambda _, obj: datasets.append(obj) if isinstance(obj, h5py.Dataset) else None
+    )
+    return datasets
+
+
+def _map_writes(
+    source: h5py.Dataset, writes: dict[Path, int], relative_to: Path
+) -> h5py.VirtualLayout:
+    """Lay out the writes of a dataset in every set along a single time axis."""
+    shape = source.shape[1:]
+    layout = h5py.VirtualLayout(
+        shape=(sum(writes.values()), *shape), dtype=source.dtype
+    )
+    start = 0
+    for path, count in writes.items():
+        layout[start : start + count] = h5py.VirtualSource(
+            os.path.relpath(path, relative_to), source.name, shape=(count, *shape)
+        )
+        start += count
+    return layout
+
+
+def _write_virtual_file(path: Path, writes: dict[Path, int]) -> None:
+    """Write the virtual file mapping the given writes of each set."""
+    tmp = path.with_suffix(".tmp")
+    with h5py.File(next(iter(writes)), "r") as first, h5py.File(tmp, "w") as f:
+        time_scales = _time_scales(first)
+        for source in _datasets(first["scales"]) + _datasets(first["tasks"]):
+            if source.name in time_scales or source.name.startswith("/tasks/"):
+                f.create_virtual_dataset(
+                    source.name, _map_writes(source, writes, path.parent)
+                )
+            else:
+                f.create_dataset(source.name, data=source[()])
+
+        # Attach the scales as in the sets
+        for source in _datasets(first["tasks"]):
+            dset = f[source.name]
+            for axis, dim in enumerate(source.dims):
+                dset.dims[axis].label = dim.label
+                for name, scale in dim.items():
+                    target = f[scale.name]
+                    if not target.is_scale:
+                        target.make_scale(name)
+                    dset.dims[axis].attach_scale(target)
+
+        f.attrs[SET_FILES_ATTR] = [str(set_path.name) for set_path in writes]
+        f.attrs[SET_WRITES_ATTR] = np.array(list(writes.values()), dtype=np.int64)
+    tmp.replace(path)
+
+
+def update_virtual_dataset(
+    handler_dir: Path | str,
+    path: Path | str | None = None,
+    *,
+    rebuild: bool = False,
+) -> bool:
+    """
+    Write or update the virtual file of a file handler, if its sets have changed.
+
+    The last set mapped, and sets written since, are opened to count their writes;
+    earlier sets were complete when they were mapped. A set that cannot be opened,
+    e.g. because it is being written, ends the sets mapped, and is picked up by the
+    next update. Sets without any writes are left out.
+
+    :param handler_dir: Directory of the file handler, holding `<handler>_sN.h5`.
+    :param path: Path of the virtual file. Defaults to `virtual_path(handler_dir)`.
+    :param rebuild: Whether to count the writes of every set, rather than trusting
+        those recorded in an existing virtual file.
+    :returns updated: Whether the virtual file was written.
+    """
+    handler_dir = Path(handler_dir)
+    path = Path(path) if path is not None else virtual_path(handler_dir)
+    recorded = {} if rebuild else _recorded_writes(path)
+    # Only the last set mapped may have been written to since
+    complete = list(recorded)[:-1]
+
+    writes = {}
+    for set_path in set_files(handler_dir):
+        if set_path.name in complete:
+            count = recorded[set_path.name]
+        else:
+            try:
+                count = _count_writes(set_path)
+            except (OSError, KeyError):
+                break
+        if count > 0:
+            writes[set_path] = count
+
+    if not writes or {p.name: n for p, n in writes.items()} == recorded:
+        return False
+    _write_virtual_file(path, writes)
+    return True
+
+
+def find_handlers(output_dir: Path | str, exclude: tuple[str, ...] = ()) -> list[Path]:
+    """
+    Find the directories of the file handlers of a run.
+
+    :param output_dir: Output directory of the run.
+    :param exclude: Names of directories not to search, e.g. of checkpoints, whose
+        sets are moved and deleted while the run goes on.
+    :returns handler_dirs: Every directory under `output_dir` holding at least one
+        set named after it.
+    """
+    handler_dirs = []
+    for root, dirs, _ in os.walk(output_dir):
+        dirs[:] = sorted(d for d in dirs if d not in exclude)
+        if set_files(root):
+            handler_dirs.append(Path(root))
+    return handler_dirs
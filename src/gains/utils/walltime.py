@@ -0,0 +1,246 @@
+"""Wall-clock budgets, scheduler signals and run-state records for restartable runs."""
+
+import json
+import signal
+import sqlite3
+import time
+from datetime import datetime
+from logging import Logger
+from pathlib import Path
+from types import FrameType
+from typing import TYPE_CHECKING, Any
+
+from mpi4py import MPI
+
+from gains.utils.catalog import RunCatalog
+from gains.utils.checkpoints import (
+    CHECKPOINT_DIR,
+    CheckpointManager,
+    is_valid_checkpoint,
+    latest_valid_checkpoint,
+)
+
+if TYPE_CHECKING:
+    # Kept out of the runtime imports, so the CLI can resume runs without dedalus.
+    import dedalus
+
+RUN_STATE_FILE = "run_state.json"
+
+# Reduction code used when the wall-time budget is exhausted. Larger than any signal
+# number, so that it can be combined with received signals using a single MPI.MAX.
+_WALL_TIME_CODE = 1024
+
+# Taken at import, which for the scripts is as close to process start as we can get.
+_PROCESS_START = time.monotonic()
+
+
+def write_run_state(output_dir: Path | str, status: str, **details: object) -> None:
+    """
+    Record how and where a run stopped.
+
+    The record is written to `RUN_STATE_FILE` in the output directory, replacing the
+    previous record atomically so that a job killed mid-write never leaves a truncated
+    file behind. Should only be called from a single rank.
+
+    :param output_dir: Output directory of the run.
+    :param status: One of "running", "interrupted", "completed" or "failed".
+    :param details: Additional JSON-serialisable information (iteration, sim_time,
+        checkpoint, ...) to store alongside the status.
+    """
+    path = Path(output_dir) / RUN_STATE_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    record = {
+        "status": status,
+        "updated": datetime.now().astimezone().isoformat(),
+        **details,
+    }
+    tmp = path.with_suffix(".tmp")
+    with tmp.open("w") as f:
+        json.dump(record, f, indent=2)
+    tmp.replace(path)
+
+
+def read_run_state(output_dir: Path | str) -> dict[str, Any] | None:
+    """
+    Read the run-state record of a previous run, if there is one.
+
+    :param output_dir: Output directory of the run.
+    :returns record: The stored record, or None if no (readable) record exists.
+    """
+    path = Path(output_dir) / RUN_STATE_FILE
+    try:
+        with path.open() as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def resume_checkpoint(output_dir: Path | str) -> Path | None:
+    """
+    Return the checkpoint an interrupted run in `output_dir` should restart from.
+
+    Only runs that were stopped deliberately (wall-time budget or scheduler signal)
+    are resumed automatically; completed or failed runs are left alone. If the
+    checkpoint recorded by the run is missing or unreadable, the newest valid
+    checkpoint in the run's checkpoint directory is used instead.
+
+    :param output_dir: Output directory of the run.
+    :returns path: The checkpoint to load, or None if the run should start afresh.
+    """
+    record = read_run_state(output_dir)
+    if record is None or record.get("status") != "interrupted":
+        return None
+    checkpoint = record.get("checkpoint")
+    if checkpoint is not None and is_valid_checkpoint(checkpoint):
+        return Path(checkpoint)
+    return latest_valid_checkpoint(Path(output_dir) / CHECKPOINT_DIR)
+
+
+class WallClockGuard:
+    """
+    Decide, consistently across ranks, when a run should stop early.
+
+    A stop is requested when the elapsed wall time comes within `margin` seconds (plus
+    the time between two checks) of the `wall_time` budget, or when any rank receives
+    one of the watched signals. Most batch schedulers can be asked to send SIGTERM or
+    SIGUSR1 ahead of the hard kill (e.g. `#SBATCH --signal=USR1@600`).
+
+    Ranks only agree on a stop every `cadence` iterations, which keeps the cost of the
+    collective negligible. When the run ends, `finish` writes a final checkpoint (if
+    stopping early) and records the state of the run in the output directory, from
+    where `gains.utils.parsers.SimulationCLI` picks it up on the next invocation, and
+    in the run catalog if one is given.
+    """
+
+    checkpoints: CheckpointManager | None
+    reason: str | None
+
+    def __init__(
+        self,
+        output_dir: Path | str,
+        *,
+        wall_time: float | None = None,
+        margin: float = 600.0,
+        cadence: int = 10,
+        signals: tuple[signal.Signals, ...] = (signal.SIGTERM, signal.SIGUSR1),
+        checkpoints: CheckpointManager | None = None,
+        catalog: Path | str | None = None,
+        comm: MPI.Comm = MPI.COMM_WORLD,
+    ) -> None:
+        """
+        Set the budget and install the signal handlers.
+
+        :param output_dir: Output directory of the run, where the run state is stored.
+        :param wall_time: Wall-time budget in seconds, measured from process start.
+            None disables the budget, leaving only the signals.
+        :param margin: Seconds to keep in reserve for the final checkpoint.
+        :param cadence: Number of iterations between (collective) checks.
+        :param signals: Signals that request a clean stop.
+        :param checkpoints: Checkpoint manager used to write the final checkpoint.
+        :param catalog: Run catalog to record the outcome of the run in, if any.
+        :param comm: Communicator the simulation runs on.
+        """
+        self.output_dir = Path(output_dir)
+        self.wall_time = wall_time
+        self.margin = margin
+        self.cadence = cadence
+        self.checkpoints = checkpoints
+        self.catalog = catalog
+        self.comm = comm
+        self.reason = None
+
+        self._received = 0
+        self._last_check = time.monotonic()
+        self._check_interval = 0.0
+        for signum in signals:
+            signal.signal(signum, self._handle_signal)
+
+    def _handle_signal(self, signum: int, _frame: FrameType | None) -> None:
+        """Note the signal; acting on it is left to the main loop."""
+        self._received = signum
+
+    @property
+    def elapsed(self) -> float:
+        """Wall time in seconds since process start."""
+        return time.monotonic() - _PROCESS_START
+
+    def _local_code(self) -> int:
+        """Reason for this rank to stop, encoded for an MPI.MAX reduction."""
+        now = time.monotonic()
+        self._check_interval = max(self._check_interval, now - self._last_check)
+        self._last_check = now
+        if self.wall_time is not None and (
+            self.elapsed + self._check_interval >= self.wall_time - self.margin
+        ):
+            return _WALL_TIME_CODE
+        return self._received
+
+    def should_stop(self, iteration: int) -> bool:
+        """
+        Decide, on all ranks at once, whether the main loop should stop.
+
+        Must be called by all ranks on every iteration.
+
+        :param iteration: Current solver iteration.
+        :returns stop: True on all ranks if any rank requested a stop.
+        """
+        if iteration % self.cadence != 0:
+            return False
+        code = self.comm.allreduce(self._local_code(), op=MPI.MAX)
+        if code == 0:
+            return False
+        self.reason = (
+            "wall_time" if code == _WALL_TIME_CODE else signal.Signals(code).name
+        )
+        return True
+
+    def finish(
+        self,
+        solver: "dedalus.core.solvers.InitialValueSolver",
+        timestep: float,
+        status: str,
+        *,
+        logger: Logger,
+    ) -> None:
+        """
+        Write the final checkpoint, if needed, and record the state of the run.
+
+        A failed run may have failed on a single rank only, so no collective
+        operations are used in that case.
+
+        :param solver: The IVP solver defined by the script.
+        :param timestep: Last timestep taken, stored with the checkpoint.
+        :param status: "interrupted", "completed" or "failed".
+        :param logger: Logger used by the script, warning if the outcome cannot be
+            recorded in the run catalog.
+        """
+        if self.checkpoints is not None and status == "interrupted":
+            self.checkpoints.write(solver, timestep)
+
+        if self.comm.rank == 0:
+            checkpoint = None if self.checkpoints is None else self.checkpoints.latest
+            write_run_state(
+                self.output_dir,
+                status,
+                reason=self.reason,
+                iteration=solver.iteration,
+                sim_time=solver.sim_time,
+                timestep=timestep,
+                elapsed=self.elapsed,
+                checkpoint=None if checkpoint is None else str(checkpoint),
+            )
+            if self.catalog is not None:
+                try:
+                    RunCatalog(self.catalog).update(
+                        self.output_dir,
+                        status,
+                        sim_time=solver.sim_time,
+                        iteration=solver.iteration,
+                        timestep=timestep,
+                        elapsed=self.elapsed,
+                        checkpoint=None if checkpoint is None else str(checkpoint),
+                    )
+                except (sqlite3.Error, OSError) as err:
+                    logger.warning(
+                        f"Could not record the run in {self.catalog} ({err})."
+                    )
@@ -2,6 +2,8 @@ import re
 from collections.abc import Callable
 from pathlib import Path
 
+import h5py
+import numpy as np
 import pytest
 
 
@@ -45,3 +47,22 @@ def raises_context() -> Callable[[Exception], pytest.RaisesExc]:
         return pytest.raises(type(exception), match=re.escape(str(exception)))
 
     return _inner
+
+
+@pytest.fixture(scope="session")
+def write_checkpoint() -> Callable[[Path], Path]:
+    """
+    Write minimal files with the layout of a dedalus checkpoint set.
+
+    The files hold a single write of a single task, which is enough for them to be
+    recognised as valid checkpoints by `gains.utils.checkpoints`.
+    """
+
+    def _inner(path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with h5py.File(path, "w") as f:
+            f.create_dataset("scales/sim_time", data=[1.0])
+            f.create_dataset("tasks/u", data=np.zeros((1, 4)))
+        return path
+
+    return _inner
@@ -0,0 +1,98 @@
+import math
+from collections.abc import Callable
+from pathlib import Path
+
+import h5py
+import numpy as np
+import pytest
+
+from gains.analysis.resolution import (
+    boundary_layer_modes,
+    check_resolution,
+    recommend_resolution,
+    spectral_envelope,
+    spectral_tail,
+    spectral_tail_modes,
+)
+from gains.exceptions import CoefficientLayoutError
+
+TOLERANCE = 1e-6
+
+
+def _write_coefficients(
+    path: Path, coeffs: dict[str, np.ndarray], *, grid_space: bool = False
+) -> Path:
+    """Write a single-write dedalus-like output file holding the given tasks."""
+    with h5py.File(path, "w") as f:
+        f.create_dataset("scales/sim_time", data=[1.0])
+        for name, data in coeffs.items():
+            dset = f.create_dataset(f"tasks/{name}", data=data[np.newaxis])
+            dset.attrs["grid_space"] = [grid_space] * 3
+    return path
+
+
+@pytest.mark.parametrize("ri", [None, 0.5], ids=["Ball", "Shell"])
+def test_boundary_layer_points(ri: float | None) -> None:
+    """The recommended Nr places the requested number of points in the layer."""
+    width, points = 1e-2, 5
+    nr = boundary_layer_modes(width, 1.0, ri, points)
+    # Gauss-Chebyshev points of the radial variable of the basis
+    x = np.cos(np.pi * (np.arange(nr) + 0.5) / nr)
+    r = ri + (x + 1) * (1 - ri) / 2 if ri else np.sqrt((x + 1) / 2)
+    assert np.count_nonzero(r > 1 - width) >= points
+
+
+def test_spectral_tail_modes() -> None:
+    """Thinner layers need more modes, and a tighter tolerance needs more modes."""
+    assert spectral_tail_modes(1e-2, 1.0) < spectral_tail_modes(1e-3, 1.0)
+    assert spectral_tail_modes(1e-2, 1.0, tol=1e-3) < spectral_tail_modes(1e-2, 1.0)
+
+
+@pytest.mark.parametrize("ri", [None, 0.5], ids=["Ball", "Shell"])
+def test_recommendation_grows_with_decreasing_ek(ri: float | None) -> None:
+    """Every recommended resolution grows as the Ekman number decreases."""
+    coarse = recommend_resolution(1e-3, ri=ri)
+    fine = recommend_resolution(1e-5, ri=ri)
+    for name in ("Nphi", "Ntheta", "Nr"):
+        assert fine[name] > coarse[name]
+        assert fine[name] % 8 == 0
+    assert coarse["grid_shape"] == [
+        math.ceil(1.5 * coarse[name]) for name in ("Nphi", "Ntheta", "Nr")
+    ]
+    assert ("Ntheta_stewartson" in coarse["criteria"]) == (ri is not None)
+
+
+def test_spectral_tail() -> None:
+    """The tail is measured relative to the peak of the envelope over other axes."""
+    coeffs = np.zeros((3, 10))
+    coeffs[1] = 10.0 ** -np.arange(10)
+    coeffs[2, -1] = -0.01
+    envelope = spectral_envelope(coeffs, 1)
+    np.testing.assert_allclose(envelope[:2], [1, 0.1])
+    assert spectral_tail(envelope) == pytest.approx(0.01)
+    assert spectral_tail(np.zeros(4)) == 0.0
+
+
+def test_check_resolution(
+    tmp_path: Path, raises_context: Callable[[Exception], pytest.RaisesExc]
+) -> None:
+    """Decaying spectra are adequate; a flat axis is flagged as under-resolved."""
+    decay = 10.0 ** -np.arange(16)
+    resolved = np.einsum("i,j,k->ijk", decay, decay, decay)
+    flat_r = np.einsum("i,j,k->ijk", decay, decay, np.ones(16))
+    path = _write_coefficients(
+        tmp_path / "checkpoint_s1.h5",
+        # The vector field has a leading component axis
+        {"u": np.stack([resolved, resolved, flat_r]), "p": resolved},
+    )
+
+    tails = check_resolution(path, tol=TOLERANCE)
+    assert tails["p"]["adequate"]
+    assert not tails["u"]["adequate"]
+    assert tails["u"]["r"] == 1.0
+    assert tails["u"]["theta"] < TOLERANCE
+    assert list(check_resolution(path, ["p"])) == ["p"]
+
+    grid = _write_coefficients(tmp_path / "grid.h5", {"p": resolved}, grid_space=True)
+    with raises_context(CoefficientLayoutError("p")):
+        check_resolution(grid)
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from gains.initial_conditions.ekman import (
+    add_ekman_layer,
+    ekman_layer,
+    ekman_thickness,
+)
+
+VISCOSITY = 1e-4
+DELTA_OMEGA = 1e-2
+
+
+class _FakeField:
+    """Stands in for a dedalus vector field, exposing only grid data."""
+
+    def __init__(self, shape: tuple[int, ...]) -> None:
+        self.data = np.zeros((3, *shape))
+
+    def __getitem__(self, layout: str) -> np.ndarray:
+        return self.data
+
+
+@pytest.mark.parametrize(
+    ("theta", "expected"),
+    [
+        pytest.param(0.0, np.sqrt(VISCOSITY), id="Pole"),
+        pytest.param(np.pi / 3, np.sqrt(2 * VISCOSITY), id="Mid-latitude"),
+        pytest.param(np.pi / 2, VISCOSITY ** (2 / 5), id="Equator"),
+        pytest.param(np.pi, np.sqrt(VISCOSITY), id="South pole"),
+    ],
+)
+def test_ekman_thickness(theta: float, expected: float) -> None:
+    """The layer thickens towards the equator, up to the equatorial thickness."""
+    assert ekman_thickness(np.array(theta), VISCOSITY) == pytest.approx(expected)
+
+
+def test_ekman_layer_boundary() -> None:
+    """The layer matches the boundary flow on the boundary, and decays inwards."""
+    theta = np.linspace(0.1, np.pi - 0.1, 9)
+    u_theta, u_phi = ekman_layer(
+        theta, 1.0, delta_omega=DELTA_OMEGA, radius=1.0, viscosity=VISCOSITY
+    )
+    np.testing.assert_allclose(u_phi, DELTA_OMEGA * np.sin(theta))
+    np.testing.assert_allclose(u_theta, 0.0, atol=1e-16)
+
+    u_theta, u_phi = ekman_layer(
+        theta, 0.5, delta_omega=DELTA_OMEGA, radius=1.0, viscosity=VISCOSITY
+    )
+    np.testing.assert_allclose(u_phi, 0.0, atol=1e-10)
+    np.testing.assert_allclose(u_theta, 0.0, atol=1e-10)
+
+
+def test_ekman_layer_transport() -> None:
+    """The flow in the layer is towards the equator in both hemispheres."""
+    delta = ekman_thickness(np.array(np.pi / 4), VISCOSITY)
+    r = 1.0 - delta
+    north, _ = ekman_layer(
+        np.pi / 4, r, delta_omega=DELTA_OMEGA, radius=1.0, viscosity=VISCOSITY
+    )
+    south, _ = ekman_layer(
+        3 * np.pi / 4, r, delta_omega=DELTA_OMEGA, radius=1.0, viscosity=VISCOSITY
+    )
+    assert north > 0
+    assert south == pytest.approx(-north)
+
+
+@pytest.mark.parametrize("theta", [np.pi / 6, 2 * np.pi / 3])
+def test_ekman_layer_balance(theta: float) -> None:
+    """The layer balances the Coriolis and viscous forces normal to the boundary."""
+    delta = ekman_thickness(np.array(theta), VISCOSITY)
+    r = np.linspace(1.0 - 5 * delta, 1.0, 2001)
+    u_theta, u_phi = ekman_layer(
+        theta, r, delta_omega=DELTA_OMEGA, radius=1.0, viscosity=VISCOSITY
+    )
+    dr = r[1] - r[0]
+    # In the frame (e_phi, e_theta, -e_r) the rotation normal to the boundary is
+    # -cos(theta), and 2 Omega_n n x u = viscosity d^2u/dr^2.
+    w = u_phi + 1j * u_theta
+    curvature = (w[2:] - 2 * w[1:-1] + w[:-2]) / dr**2
+    np.testing.assert_allclose(
+        VISCOSITY * curvature,
+        2j * -np.cos(theta) * w[1:-1],
+        atol=1e-4 * DELTA_OMEGA / delta,
+    )
+
+
+def test_add_ekman_layer() -> None:
+    """The layer is added to the angular components of the field."""
+    theta = np.linspace(0.1, np.pi - 0.1, 5)[None, :, None]
+    r = np.linspace(0.9, 1.0, 4)[None, None, :]
+    u = _FakeField((2, 5, 4))
+    u.data[:] = 1.0
+    add_ekman_layer(
+        u, theta, r, delta_omega=DELTA_OMEGA, radius=1.0, viscosity=VISCOSITY
+    )
+    u_theta, u_phi = ekman_layer(
+        theta, r, delta_omega=DELTA_OMEGA, radius=1.0, viscosity=VISCOSITY
+    )
+    np.testing.assert_allclose(u.data[0], 1.0 + np.broadcast_to(u_phi, (2, 5, 4)))
+    np.testing.assert_allclose(u.data[1], 1.0 + np.broadcast_to(u_theta, (2, 5, 4)))
+    np.testing.assert_allclose(u.data[2], 1.0)
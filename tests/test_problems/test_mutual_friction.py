@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+d3 = pytest.importorskip("dedalus.public")
+
+from gains.problems.mutual_friction import UNIT_EPSILON, MutualFriction  # noqa: E402
+
+B = 0.1
+
+
+@pytest.fixture
+def velocities() -> tuple:
+    """Random velocities on a small periodic box, with the unit vector along z."""
+    coords = d3.CartesianCoordinates("x", "y", "z")
+    dist = d3.Distributor(coords, dtype=np.float64)
+    bases = tuple(
+        d3.RealFourier(coord, size=8, bounds=(0, 2 * np.pi), dealias=3 / 2)
+        for coord in coords.coords
+    )
+    u_n = dist.VectorField(coords, name="u_n", bases=bases)
+    u_s = dist.VectorField(coords, name="u_s", bases=bases)
+    for seed, u in enumerate((u_n, u_s)):
+        u.fill_random("g", seed=seed, distribution="normal", scale=1e-2)
+    ez = dist.VectorField(coords, name="ez", bases=bases)
+    ez["g"][2] = 1
+    return u_n, u_s, ez
+
+
+def _grid(operator: object) -> np.ndarray:
+    """Evaluate an operator on the grid at the base resolution."""
+    field = operator.evaluate()
+    field.change_scales(1)
+    return np.copy(field["g"])
+
+
+@pytest.mark.parametrize(
+    ("linear", "normalise"),
+    [
+        pytest.param(False, True, id="Normalised"),
+        pytest.param(False, False, id="Not normalised"),
+        pytest.param(True, True, id="Linear"),
+    ],
+)
+def test_force_matches_inline(
+    velocities: tuple, *, linear: bool, normalise: bool
+) -> None:
+    """The force with a shared cross product is the force written out in full."""
+    u_n, u_s, ez = velocities
+    u_ns = u_n - u_s
+    omega_s = d3.Curl(u_s) + 2 * ez
+    if linear:
+        omega_mf, omega_unit = 2 * ez, ez
+    else:
+        omega_mf = omega_s
+        omega_unit = (
+            omega_s / (np.sqrt(d3.DotProduct(omega_s, omega_s)) + UNIT_EPSILON)
+            if normalise
+            else omega_s / 2
+        )
+    inline = B * d3.CrossProduct(
+        omega_unit, d3.CrossProduct(omega_mf, u_ns)
+    ) + B / 2 * d3.CrossProduct(omega_mf, u_ns)
+
+    force = MutualFriction(u_n, u_s, ez, B, linear=linear, normalise=normalise).force
+    assert np.allclose(_grid(force), _grid(inline))
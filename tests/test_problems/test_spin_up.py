@@ -0,0 +1,50 @@
+import logging
+from pathlib import Path
+from typing import Any, ClassVar
+
+import numpy as np
+import pytest
+
+pytest.importorskip("dedalus.public")
+
+from gains.problems.spin_up import (
+    CrustCoreSpinUp,
+    SingleFluidSpinUp,
+    SpinUpBuilder,
+    TwoFluidShellSpinUp,
+    TwoFluidSphereSpinUp,
+)
+
+# Smallest resolution the problems are built at, with the mutual-friction coefficient
+# the sphere's defaults leave out.
+MINIMAL = {"Nphi": 8, "Ntheta": 8, "Nr": 8, "B": 0.1}
+STEPS = 3
+
+
+def test_incomplete_builder() -> None:
+    """A builder missing part of its problem fails when it is created."""
+
+    class Incomplete(SpinUpBuilder):
+        default_params: ClassVar[dict[str, Any]] = MINIMAL
+
+        def _build_bases(self) -> None:
+            pass
+
+    with pytest.raises(TypeError, match="abstract"):
+        Incomplete()
+
+
+@pytest.mark.parametrize(
+    "builder_class",
+    [SingleFluidSpinUp, TwoFluidSphereSpinUp, TwoFluidShellSpinUp, CrustCoreSpinUp],
+)
+def test_builder_steps(builder_class: type[SpinUpBuilder], tmp_path: Path) -> None:
+    """Each problem builds, writes its outputs and takes a few finite steps."""
+    builder = builder_class(MINIMAL)
+    run = builder.build(logger=logging.getLogger(__name__), output_dir=tmp_path)
+    for _ in range(STEPS):
+        run.solver.step(run.cfl.compute_timestep())
+
+    assert run.solver.iteration == STEPS
+    for field in run.solver.state:
+        assert np.all(np.isfinite(field["g"]))
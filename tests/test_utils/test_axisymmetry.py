@@ -0,0 +1,71 @@
+import json
+import logging
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from gains.utils.axisymmetry import AXISYMMETRY_SUMMARY, AxisymmetryCheck
+
+TOLERANCE = 1e-3
+
+
+class _FakeFlow:
+    """Stand-in for a dedalus flow, with fixed volume integrals."""
+
+    def __init__(self, integrals: dict[str, float]) -> None:
+        self.integrals = integrals
+
+    def volume_integral(self, name: str) -> float:
+        return self.integrals[name]
+
+
+def _check(tmp_path: Path, integrals: dict[str, float]) -> AxisymmetryCheck:
+    """Check of a core and a crust velocity."""
+    return AxisymmetryCheck(
+        _FakeFlow(integrals),
+        ["u_b", "u_s"],
+        tmp_path,
+        logging.getLogger(__name__),
+        tolerance=TOLERANCE,
+    )
+
+
+def test_fraction_over_all_velocities(tmp_path: Path) -> None:
+    """The fraction is taken over the summed energies, on the sampling cadence."""
+    check = _check(
+        tmp_path,
+        {"E_kin_u_b": 1.0, "E_kin_u_s": 3.0, "E_nonaxi_u_b": 0.0, "E_nonaxi_u_s": 2e-3},
+    )
+    check.update(SimpleNamespace(iteration=5, sim_time=0.5))
+    assert check.max_time is None
+
+    check.update(SimpleNamespace(iteration=10, sim_time=1.0))
+    assert check.max_value == pytest.approx(5e-4)
+    assert check.max_time == 1.0
+    assert check.passed
+
+
+def test_largest_fraction_is_kept(tmp_path: Path) -> None:
+    """The check fails if the fraction ever exceeds the tolerance."""
+    check = _check(tmp_path, {})
+    check.add_sample(1.0, 1e-5, 1.0)
+    check.add_sample(2.0, 1e-2, 1.0)
+    check.add_sample(3.0, 1e-4, 1.0)
+    check.add_sample(4.0, 0.0, 0.0)
+
+    assert check.max_value == pytest.approx(1e-2)
+    assert check.max_time == 2.0  # noqa: PLR2004
+    assert not check.passed
+
+
+def test_report(tmp_path: Path) -> None:
+    """The outcome is written to the output directory."""
+    check = _check(tmp_path, {})
+    check.add_sample(1.0, 1e-5, 1.0)
+    summary = check.report()
+
+    with (tmp_path / AXISYMMETRY_SUMMARY).open() as f:
+        assert json.load(f) == summary
+    assert summary["passed"]
+    assert summary["tolerance"] == TOLERANCE
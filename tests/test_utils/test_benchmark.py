@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from gains.utils.benchmark import (
+    integrate_to,
+    max_error,
+    pareto_front,
+    pareto_table,
+    state_error,
+)
+
+TIMESTEP = 0.3
+
+
+class _FakeField:
+    """Stand-in for a dedalus field whose coefficients grow linearly in time."""
+
+    def __init__(self, solver: SimpleNamespace) -> None:
+        self.name = "u"
+        self.solver = solver
+
+    def __getitem__(self, layout: str) -> np.ndarray:
+        return np.full(2, self.solver.sim_time if self.solver.finite else np.nan)
+
+
+def _fake_run(blow_up_at: float = np.inf) -> SimpleNamespace:
+    """Run stepping with a fixed CFL timestep, going non-finite after `blow_up_at`."""
+    solver = SimpleNamespace(sim_time=0.0, finite=True, steps=[])
+
+    def step(dt: float) -> None:
+        solver.steps.append(dt)
+        solver.sim_time += dt
+        solver.finite = solver.sim_time <= blow_up_at
+
+    solver.step = step
+    solver.state = [_FakeField(solver)]
+    return SimpleNamespace(
+        solver=solver, cfl=SimpleNamespace(compute_timestep=lambda: TIMESTEP)
+    )
+
+
+def test_integrate_to() -> None:
+    """Timesteps are shortened to land on each output time."""
+    run = _fake_run()
+    snapshots, wall_time = integrate_to(run, [0.5, 1.0])
+
+    assert run.solver.steps == pytest.approx([0.3, 0.2, 0.3, 0.2])
+    assert [s["u"][0] for s in snapshots] == pytest.approx([0.5, 1.0])
+    assert wall_time >= 0
+
+
+def test_integrate_to_blow_up() -> None:
+    """Integration stops at the first output time with a non-finite state."""
+    snapshots, _ = integrate_to(_fake_run(blow_up_at=0.7), [0.5, 1.0, 1.5])
+    assert len(snapshots) == 1
+
+
+def test_state_error() -> None:
+    """The error is relative to the norm of the reference, over all fields."""
+    reference = {"u": np.array([3.0, 0.0]), "p": np.array([4.0])}
+    state = {"u": np.array([3.0, 1.0]), "p": np.array([4.0])}
+
+    assert state_error(state, reference) == pytest.approx(0.2)
+    assert state_error(reference, reference) == 0
+
+
+def test_max_error() -> None:
+    """The largest error is taken, and runs missing output times score infinity."""
+    references = [{"u": np.ones(2)}, {"u": np.ones(2)}]
+    snapshots = [{"u": np.ones(2)}, {"u": np.array([1.0, 2.0])}]
+    error = np.sqrt(0.5)
+
+    assert max_error(snapshots, references) == pytest.approx(error)
+    assert max_error(snapshots[:1], references) == np.inf
+
+
+def test_pareto() -> None:
+    """Results beaten on both cost and error are off the front, and unmarked."""
+    results = [
+        {"timestepper": "SBDF2", "cost": 1.0, "error": 1e-3},
+        {"timestepper": "RK222", "cost": 2.0, "error": 1e-2},
+        {"timestepper": "RK443", "cost": 3.0, "error": 1e-6},
+    ]
+    for result in results:
+        result.update(safety=0.3, max_timestep=1e-2, iterations=100)
+
+    assert pareto_front(results) == [True, False, True]
+    lines = pareto_table(results).splitlines()
+    assert [line[:8] for line in lines[1:]] == ["* SBDF2 ", "  RK222 ", "* RK443 "]
@@ -0,0 +1,77 @@
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from gains.utils.catalog import RunCatalog, parse_filter
+
+ELAPSED = 12.5
+
+
+@pytest.fixture
+def catalog(tmp_path: Path) -> RunCatalog:
+    """Catalog holding three runs, the last of which completed and restarted once."""
+    catalog = RunCatalog(tmp_path / "catalog.sqlite")
+    for name, ek in (("a", 1e-2), ("b", 1e-4), ("c", 1e-4)):
+        catalog.register(
+            tmp_path / name,
+            {"Ek": ek, "timestepper": "SBDF2"},
+            sim_name="two_fluid_spin_up",
+        )
+    catalog.update(tmp_path / "c", "interrupted", sim_time=20.0, elapsed=ELAPSED)
+    catalog.register(tmp_path / "c", {"Ek": 1e-4, "timestepper": "SBDF2"})
+    catalog.update(tmp_path / "c", "completed", sim_time=40.0, elapsed=ELAPSED)
+    return catalog
+
+
+@pytest.mark.parametrize(
+    ("spec", "expected"),
+    [
+        pytest.param("Ek<1e-3", ("Ek", "<", 1e-3), id="Number"),
+        pytest.param("status = completed", ("status", "=", "completed"), id="Text"),
+        pytest.param("sim_time>=40", ("sim_time", ">=", 40.0), id="Two-character op"),
+    ],
+)
+def test_parse_filter(spec: str, expected: tuple[str, str, float | str]) -> None:
+    """Filters are split into a name, an operator and a (numeric if possible) value."""
+    assert parse_filter(spec) == expected
+
+
+def test_parse_filter_invalid(
+    raises_context: Callable[[Exception], pytest.RaisesExc],
+) -> None:
+    """Filters without an operator are rejected."""
+    with raises_context(
+        ValueError("expected a filter of the form NAME<OP>VALUE, got 'Ek'")
+    ):
+        parse_filter("Ek")
+
+
+@pytest.mark.parametrize(
+    ("filters", "expected"),
+    [
+        pytest.param([], ["a", "b", "c"], id="All"),
+        pytest.param([("Ek", "<", 1e-3)], ["b", "c"], id="Parameter"),
+        pytest.param(
+            [("Ek", "<", 1e-3), ("sim_time", ">=", 40.0)], ["c"], id="Combined"
+        ),
+        pytest.param([("timestepper", "=", "RK222")], [], id="Text parameter"),
+        pytest.param([("missing", ">", 0.0)], [], id="Unknown parameter"),
+    ],
+)
+def test_query(
+    catalog: RunCatalog,
+    filters: list[tuple[str, str, float | str]],
+    expected: list[str],
+) -> None:
+    """Runs are selected on their record and on their parameters."""
+    runs = catalog.query(filters)
+    assert [Path(run["output_dir"]).name for run in runs] == expected
+
+
+def test_restarted_run(catalog: RunCatalog) -> None:
+    """A restart updates the existing record, accumulating the wall time."""
+    (run,) = catalog.query([("status", "=", "completed")])
+    assert run["runs"] == 2  # noqa: PLR2004
+    assert run["wall_time"] == pytest.approx(2 * ELAPSED)
+    assert run["params"]["Ek"] == pytest.approx(1e-4)
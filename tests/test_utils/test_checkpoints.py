@@ -0,0 +1,197 @@
+from collections.abc import Callable
+from pathlib import Path
+from types import SimpleNamespace
+
+import h5py
+import numpy as np
+import pytest
+
+from gains.exceptions import CoefficientLayoutError
+from gains.utils.checkpoints import (
+    CHECKPOINT_DIR,
+    STAGING_DIR,
+    CheckpointManager,
+    is_valid_checkpoint,
+    latest_valid_checkpoint,
+    load_checkpoint,
+    resize_coefficients,
+)
+
+SIM_TIME = 2.5
+TIMESTEP = 1e-3
+
+
+class _FakeEvaluator:
+    """Stand-in for the dedalus evaluator, creating a fake checkpoint handler."""
+
+    def add_file_handler(self, base_path: str, **_kwargs: object) -> SimpleNamespace:
+        self.handler = SimpleNamespace(
+            base_path=Path(base_path),
+            total_write_num=0,
+            add_tasks=lambda *_args, **_kwargs: None,
+        )
+        return self.handler
+
+
+class _FakeField:
+    """Stand-in for a dedalus vector field on one rank, recording its coefficients."""
+
+    def __init__(self, name: str, shape: tuple[int, ...]) -> None:
+        layout = SimpleNamespace(
+            global_shape=lambda _domain, **_kwargs: shape,
+            slices=lambda _domain, **_kwargs: tuple(slice(None) for _ in shape),
+        )
+        self.name = name
+        self.tensorsig = [SimpleNamespace(dim=3)]
+        self.domain = None
+        self.dist = SimpleNamespace(coeff_layout=layout)
+        self.coeffs = None
+
+    def __setitem__(self, layout: str, data: np.ndarray) -> None:
+        assert layout == "c"
+        self.coeffs = data
+
+
+def _fake_solver(shape: tuple[int, ...]) -> SimpleNamespace:
+    """Solver with a single vector field, whose `load_state` returns a marker."""
+    return SimpleNamespace(
+        state=[_FakeField("u", shape)],
+        load_state=lambda _path, _index: ("load_state", None),
+        iteration=0,
+        sim_time=0.0,
+    )
+
+
+@pytest.fixture
+def coeff_checkpoint(tmp_path: Path) -> Path:
+    """Checkpoint of a vector field with 4 x 2 x 3 coefficients per component."""
+    path = tmp_path / "checkpoint_s1.h5"
+    with h5py.File(path, "w") as f:
+        u = f.create_dataset(
+            "tasks/u", data=np.arange(72, dtype=float).reshape(1, 3, 4, 2, 3)
+        )
+        u.attrs["grid_space"] = [False, False, False]
+        for name, value in (
+            ("iteration", 100),
+            ("sim_time", SIM_TIME),
+            ("write_number", 7),
+            ("timestep", TIMESTEP),
+        ):
+            f.create_dataset(f"scales/{name}", data=[value])
+    return path
+
+
+@pytest.fixture
+def manager(tmp_path: Path) -> CheckpointManager:
+    """Checkpoint manager keeping two checkpoints, attached to a fake solver."""
+    solver = SimpleNamespace(evaluator=_FakeEvaluator(), state=[])
+    return CheckpointManager(solver, tmp_path, keep=2)
+
+
+def test_is_valid_checkpoint(
+    tmp_path: Path, write_checkpoint: Callable[[Path], Path]
+) -> None:
+    """Complete checkpoints are valid; empty or truncated files are not."""
+    truncated = tmp_path / "checkpoint_s2.h5"
+    truncated.write_bytes(b"\x89HDF\r\n")
+
+    assert is_valid_checkpoint(write_checkpoint(tmp_path / "checkpoint_s1.h5"))
+    assert not is_valid_checkpoint(truncated)
+    assert not is_valid_checkpoint(tmp_path / "missing.h5")
+
+
+def test_latest_valid_checkpoint(
+    tmp_path: Path, write_checkpoint: Callable[[Path], Path]
+) -> None:
+    """Sets are ordered by set number, and invalid sets are skipped."""
+    assert latest_valid_checkpoint(tmp_path) is None
+    for n in (1, 2, 10):
+        write_checkpoint(tmp_path / f"checkpoint_s{n}.h5")
+    (tmp_path / "checkpoint_s11.h5").touch()
+
+    assert latest_valid_checkpoint(tmp_path) == tmp_path / "checkpoint_s10.h5"
+
+
+def test_manager_rotation(
+    manager: CheckpointManager,
+    tmp_path: Path,
+    write_checkpoint: Callable[[Path], Path],
+) -> None:
+    """Finished writes are moved into place and only the newest are kept."""
+    staging = tmp_path / CHECKPOINT_DIR / STAGING_DIR / "checkpoint"
+    for write in range(1, 4):
+        write_checkpoint(staging / f"checkpoint_s{write}.h5")
+        manager.handler.total_write_num = write
+        manager.update()
+
+    assert sorted(p.name for p in manager.directory.glob("*.h5")) == [
+        "checkpoint_s2.h5",
+        "checkpoint_s3.h5",
+    ]
+    assert manager.latest == manager.directory / "checkpoint_s3.h5"
+    assert not list(staging.glob("*.h5"))
+
+
+def test_manager_skips_incomplete(
+    manager: CheckpointManager,
+    tmp_path: Path,
+    write_checkpoint: Callable[[Path], Path],
+) -> None:
+    """Incomplete writes are never moved into place."""
+    staging = tmp_path / CHECKPOINT_DIR / STAGING_DIR / "checkpoint"
+    write_checkpoint(staging / "checkpoint_s1.h5")
+    manager.handler.total_write_num = 1
+    manager.update()
+    (staging / "checkpoint_s2.h5").touch()
+    manager.handler.total_write_num = 2
+    manager.update()
+
+    assert manager.latest == manager.directory / "checkpoint_s1.h5"
+    assert (staging / "checkpoint_s2.h5").exists()
+
+
+@pytest.mark.parametrize(
+    ("shape", "expected"),
+    [
+        pytest.param((2, 4), [[0, 1, 0, 0], [3, 4, 0, 0]], id="Pad"),
+        pytest.param((1, 1), [[0]], id="Truncate"),
+        pytest.param((3, 1), [[0], [3], [0]], id="Mixed"),
+    ],
+)
+def test_resize_coefficients(shape: tuple[int, int], expected: list) -> None:
+    """Modes present at both resolutions are kept, new ones are zero."""
+    coeffs = np.array([[0, 1], [3, 4]])
+    np.testing.assert_array_equal(resize_coefficients(coeffs, shape), expected)
+
+
+def test_load_checkpoint_same_resolution(coeff_checkpoint: Path) -> None:
+    """Checkpoints at the resolution of the solver are loaded by dedalus."""
+    solver = _fake_solver((4, 2, 3))
+    assert load_checkpoint(solver, coeff_checkpoint) == ("load_state", None)
+
+
+def test_load_checkpoint_new_resolution(coeff_checkpoint: Path) -> None:
+    """Checkpoints at another resolution are padded, keeping the time and write."""
+    solver = _fake_solver((8, 4, 2))
+    assert load_checkpoint(solver, coeff_checkpoint) == (7, TIMESTEP)
+
+    (field,) = solver.state
+    with h5py.File(coeff_checkpoint, "r") as f:
+        stored = f["tasks/u"][-1]
+    assert field.coeffs.shape == (3, 8, 4, 2)
+    np.testing.assert_array_equal(field.coeffs[:, :4, :2], stored[..., :2])
+    assert not field.coeffs[:, 4:].any()
+    assert not field.coeffs[:, :, 2:].any()
+    assert solver.iteration == solver.initial_iteration == 100  # noqa: PLR2004
+    assert solver.sim_time == SIM_TIME
+
+
+def test_load_checkpoint_grid_space(
+    coeff_checkpoint: Path, raises_context: Callable[[Exception], pytest.RaisesExc]
+) -> None:
+    """Checkpoints at another resolution must be in coefficient space."""
+    with h5py.File(coeff_checkpoint, "r+") as f:
+        f["tasks/u"].attrs["grid_space"] = [True, True, True]
+
+    with raises_context(CoefficientLayoutError("u")):
+        load_checkpoint(_fake_solver((8, 4, 2)), coeff_checkpoint)
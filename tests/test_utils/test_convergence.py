@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from gains.utils.convergence import SteadyStateMonitor, relative_change
+
+
+@pytest.mark.parametrize(
+    ("values", "expected_output"),
+    [
+        pytest.param(
+            np.array([[1.0, 0.0], [1.0, 0.0]]), np.array([0.0, 0.0]), id="Constant"
+        ),
+        pytest.param(
+            np.array([[1.0, -2.0], [0.5, -1.0]]),
+            np.array([0.5, 0.5]),
+            id="Halving, either sign",
+        ),
+        pytest.param(
+            np.array([[1.0, 1.0, 0.0], [np.nan, np.inf, 0.0]]),
+            np.array([np.inf, np.inf, 0.0]),
+            id="Non-finite",
+        ),
+    ],
+)
+def test_relative_change(values: np.ndarray, expected_output: np.ndarray) -> None:
+    """Relative change is the spread over the window, scaled by the largest value."""
+    assert np.array_equal(relative_change(values), expected_output)
+
+
+def _monitor(hold: float) -> SteadyStateMonitor:
+    """Monitor on a single quantity, not attached to a flow."""
+    return SteadyStateMonitor(None, {"q": "max"}, rtol=1e-3, window=1.0, hold=hold)
+
+
+def test_monitor_needs_full_window() -> None:
+    """A constant signal is only flagged once it spans the whole window."""
+    monitor = _monitor(hold=0.0)
+    times = np.arange(0.0, 2.0, 0.1)
+    stops = [monitor.add_sample(t, [1.0]) for t in times]
+
+    assert not any(stops[:10])
+    assert all(stops[10:])
+
+
+def test_monitor_hold_and_reset() -> None:
+    """The tolerance must hold for `hold` time units, and a change resets it."""
+    monitor = _monitor(hold=0.5)
+    for t in np.arange(0.0, 1.05, 0.1):
+        monitor.add_sample(t, [1.0])
+    assert monitor.steady_since is not None
+    assert not monitor.add_sample(1.1, [2.0])
+    assert monitor.steady_since is None
+
+    # Settled at the new value: steady again after a window, stop after the hold.
+    stops = {
+        round(t, 1): monitor.add_sample(t, [2.0]) for t in np.arange(1.2, 3.0, 0.1)
+    }
+    assert not stops[2.5]
+    assert stops[2.7]
+
+
+@pytest.mark.parametrize("bad_value", [np.nan, np.inf])
+def test_monitor_non_finite(bad_value: float) -> None:
+    """A run that blows up is never steady, and resets the hold."""
+    monitor = _monitor(hold=0.5)
+    for t in np.arange(0.0, 1.05, 0.1):
+        monitor.add_sample(t, [1.0])
+    assert monitor.steady_since is not None
+
+    assert not monitor.add_sample(1.1, [bad_value])
+    assert monitor.steady_since is None
+    assert not any(monitor.add_sample(t, [bad_value]) for t in (1.2, 1.3, 2.5))
+
+
+def test_monitor_reset() -> None:
+    """After a reset, e.g. a rollback, the window starts again."""
+    monitor = _monitor(hold=0.0)
+    for t in np.arange(0.0, 1.05, 0.1):
+        monitor.add_sample(t, [1.0])
+    assert monitor.steady_since is not None
+
+    monitor.reset()
+    assert monitor.steady_since is None
+    assert monitor.changes is None
+    assert not monitor.add_sample(0.5, [1.0])
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from gains.utils.eigenmodes import (
+    arnoldi,
+    growth_rates,
+    least_damped_modes,
+    ritz_pairs,
+)
+
+PERIOD = 0.5
+# Growth rates of the test operator: two weakly damped oscillations, and a range of
+# strongly damped modes.
+SLOW = (complex(-0.01, 1.2), complex(-0.03, 0.4))
+FAST = tuple(-1.0 - k for k in range(20))
+
+
+def _propagator() -> np.ndarray:
+    """Evolution over PERIOD of a real linear system with the growth rates above."""
+    size = 2 * len(SLOW) + len(FAST)
+    blocks = np.zeros((size, size))
+    for i, rate in enumerate(SLOW):
+        angle = rate.imag * PERIOD
+        blocks[2 * i : 2 * i + 2, 2 * i : 2 * i + 2] = np.exp(rate.real * PERIOD) * (
+            np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+        )
+    for i, rate in enumerate(FAST):
+        blocks[2 * len(SLOW) + i, 2 * len(SLOW) + i] = np.exp(rate * PERIOD)
+    rotation, _ = np.linalg.qr(np.random.default_rng(0).standard_normal((size, size)))
+    return rotation @ blocks @ rotation.T
+
+
+def test_arnoldi_relation() -> None:
+    """The basis is orthonormal and the Hessenberg matrix represents the map."""
+    matrix = _propagator()
+    start = np.random.default_rng(1).standard_normal(matrix.shape[0])
+    basis, hessenberg = arnoldi(lambda v: matrix @ v, start, 10)
+
+    np.testing.assert_allclose(basis @ basis.T, np.eye(11), atol=1e-12)
+    np.testing.assert_allclose(matrix @ basis[:10].T, basis.T @ hessenberg, atol=1e-12)
+
+
+def test_arnoldi_invariant_space() -> None:
+    """The iteration stops once the Krylov space is invariant."""
+    matrix = np.diag([1.0, 0.5, 0.25])
+    basis, hessenberg = arnoldi(lambda v: matrix @ v, np.array([1.0, 1.0, 0.0]), 3)
+
+    assert hessenberg.shape == (3, 2)
+    assert hessenberg[2, 1] == 0.0
+    eigenvalues, _, residuals = ritz_pairs(basis, hessenberg)
+    np.testing.assert_allclose(eigenvalues, [1.0, 0.5])
+    np.testing.assert_allclose(residuals, 0.0, atol=1e-12)
+
+
+def test_growth_rates() -> None:
+    """The growth rates are recovered from the eigenvalues of the evolution."""
+    rates = np.array([complex(-0.1, 1.0), -2.0])
+    np.testing.assert_allclose(growth_rates(np.exp(rates * PERIOD), PERIOD), rates)
+
+
+def test_least_damped_modes() -> None:
+    """The weakly damped oscillations are found once each, with converged residuals."""
+    matrix = _propagator()
+    start = np.random.default_rng(2).standard_normal(matrix.shape[0])
+    modes, vectors = least_damped_modes(
+        lambda v: matrix @ v, start, PERIOD, n_modes=3, n_krylov=20
+    )
+
+    # The conjugates are left out, so the next mode is the least damped real one
+    expected = sorted([(-rate.real, rate.imag) for rate in SLOW] + [(-FAST[0], 0.0)])
+    found = sorted((mode["decay_rate"], mode["frequency"]) for mode in modes)
+    np.testing.assert_allclose(found, expected, atol=1e-8)
+    assert all(mode["residual"] < 1e-8 for mode in modes)  # noqa: PLR2004
+    for mode, vector in zip(modes, vectors, strict=True):
+        multiplier = np.exp(complex(-mode["decay_rate"], mode["frequency"]) * PERIOD)
+        np.testing.assert_allclose(
+            matrix @ vector, multiplier * vector, atol=1e-8 * np.linalg.norm(vector)
+        )
+
+
+def test_least_damped_modes_few_krylov() -> None:
+    """A Krylov space too small to converge is flagged by the residuals."""
+    matrix = _propagator()
+    start = np.random.default_rng(3).standard_normal(matrix.shape[0])
+    modes, _ = least_damped_modes(
+        lambda v: matrix @ v, start, PERIOD, n_modes=2, n_krylov=2
+    )
+    assert max(mode["residual"] for mode in modes) > 1e-8  # noqa: PLR2004
+
+
+@pytest.mark.parametrize("n_modes", [1, 3])
+def test_least_damped_modes_count(n_modes: int) -> None:
+    """Only the requested number of modes is returned."""
+    matrix = _propagator()
+    start = np.random.default_rng(4).standard_normal(matrix.shape[0])
+    modes, vectors = least_damped_modes(
+        lambda v: matrix @ v, start, PERIOD, n_modes=n_modes, n_krylov=10
+    )
+    assert len(modes) == len(vectors) == n_modes
@@ -0,0 +1,84 @@
+from pathlib import Path
+
+import h5py
+import numpy as np
+import pytest
+
+from gains.initial_conditions.mcnally import density
+from gains.utils.kh_diagnostics import (
+    DIAGNOSTICS_HANDLER,
+    growth_rate,
+    mixedness,
+    mode_weight,
+    read_growth_diagnostics,
+)
+
+WAVENUMBER = 4 * np.pi
+
+
+def test_mode_weight() -> None:
+    """The weight peaks on the shear layers and decays with distance from them."""
+    weight = mode_weight(np.array([0.0, 0.25, 0.5, 0.75, 0.875]), WAVENUMBER)
+    np.testing.assert_allclose(
+        weight, np.exp(-WAVENUMBER * np.array([0.25, 0, 0.25, 0, 0.125]))
+    )
+
+
+def test_mode_amplitude_of_seed() -> None:
+    """The normalised projection recovers the amplitude of the seeded mode."""
+    x = np.linspace(0, 1, 64, endpoint=False)[:, None]
+    y = np.linspace(0, 1, 64, endpoint=False)[None, :]
+    v_y = 0.01 * np.sin(WAVENUMBER * x + 0.3) * np.ones_like(y)
+    weight = np.ones_like(x) * mode_weight(y, WAVENUMBER)
+
+    sin_part = np.sum(v_y * np.sin(WAVENUMBER * x) * weight)
+    cos_part = np.sum(v_y * np.cos(WAVENUMBER * x) * weight)
+    amplitude = 2 * np.hypot(sin_part, cos_part) / np.sum(weight)
+    assert amplitude == pytest.approx(0.01)
+
+
+@pytest.mark.parametrize(
+    ("rho", "expected"),
+    [
+        pytest.param(1.0, 0.0, id="Pure rho_1"),
+        pytest.param(2.0, 0.0, id="Pure rho_2"),
+        pytest.param(1.5, 1.0, id="Fully mixed"),
+        pytest.param(1.25, 0.75, id="Partly mixed"),
+    ],
+)
+def test_mixedness(rho: float, expected: float) -> None:
+    """The mixedness vanishes in either fluid and peaks where they are mixed evenly."""
+    assert mixedness(rho, 1.0, 2.0) == pytest.approx(expected)
+
+
+def test_mixing_width_initial() -> None:
+    """Each layer of the initial condition is three profile lengths wide."""
+    params = {"rho_1": 1.0, "rho_2": 2.0, "rho_m": -0.5, "L": 0.025}
+    ys = np.linspace(0, 1, 4001)
+    rho = density(np.zeros(1), ys, **params)[0]
+
+    width = np.trapezoid(mixedness(rho, 1.0, 2.0), ys) / 2
+    assert width == pytest.approx(3 * params["L"], rel=1e-3)
+
+
+def test_growth_rate() -> None:
+    """The growth rate is fitted over the exponential phase only."""
+    times = np.linspace(0, 3, 31)
+    amplitude = 0.01 * np.exp(2.5 * np.minimum(times, 2))
+
+    assert growth_rate(times, amplitude, window=(0.5, 1.5)) == pytest.approx(2.5)
+    assert growth_rate(times, amplitude) < 2.5  # noqa: PLR2004
+
+
+def test_read_growth_diagnostics(tmp_path: Path) -> None:
+    """The diagnostics of every set are read as one series."""
+    handler_dir = tmp_path / DIAGNOSTICS_HANDLER
+    handler_dir.mkdir()
+    for number in (1, 2):
+        with h5py.File(handler_dir / f"{DIAGNOSTICS_HANDLER}_s{number}.h5", "w") as f:
+            f.create_dataset("scales/sim_time", data=[number, number + 0.5])
+            f.create_dataset("tasks/KE_y", data=np.full((2, 1, 1), number))
+
+    diagnostics = read_growth_diagnostics(handler_dir)
+    np.testing.assert_allclose(diagnostics["sim_time"], [1, 1.5, 2, 2.5])
+    np.testing.assert_allclose(diagnostics["KE_y"], [1, 1, 2, 2])
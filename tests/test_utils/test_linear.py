@@ -0,0 +1,74 @@
+import json
+import logging
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from gains.utils.linear import (
+    NONLINEARITY_SUMMARY,
+    FixedTimestep,
+    NonlinearityCheck,
+    advection,
+)
+from gains.utils.rollback import BlowUpRecovery
+
+TOLERANCE = 0.1
+
+
+@pytest.mark.parametrize(
+    ("linear", "expected"),
+    [
+        pytest.param(False, " - u_n@grad(u_n)", id="Nonlinear"),
+        pytest.param(True, "", id="Linear"),
+    ],
+)
+def test_advection(*, linear: bool, expected: str) -> None:
+    """The advective term is dropped from linear equations."""
+    assert advection("u_n", linear=linear) == expected
+
+
+def test_fixed_timestep_rollback() -> None:
+    """The fixed timestep is reduced by a blow-up recovery, like a CFL."""
+    timestep = FixedTimestep(0.05)
+    timestep.add_velocity(None)
+    assert timestep.compute_timestep() == pytest.approx(0.05)
+
+    solver = SimpleNamespace(
+        state=[], iteration=0, sim_time=0.0, timestepper=SimpleNamespace()
+    )
+    recovery = BlowUpRecovery(
+        SimpleNamespace(max=lambda _name: 0.0), "u", logging.getLogger("TestLogger")
+    )
+    recovery.update(solver, timestep)
+    recovery.rollback(solver, timestep, "test")
+    assert timestep.compute_timestep() == pytest.approx(0.05 * recovery.reduction)
+
+
+def test_nonlinearity_check(tmp_path: Path) -> None:
+    """The largest ratio over velocities and times is kept and reported."""
+    flow = SimpleNamespace(
+        max=lambda name: {
+            "advection_u_n": 1e-3,
+            "coriolis_u_n": 1e-1,
+            "advection_u_s": 2e-3,
+            "coriolis_u_s": 1e-1,
+        }[name]
+    )
+    check = NonlinearityCheck(
+        flow,
+        ["u_n", "u_s"],
+        tmp_path,
+        logging.getLogger("TestLogger"),
+        tolerance=TOLERANCE,
+    )
+    check.update(SimpleNamespace(iteration=10, sim_time=1.0))
+    check.add_sample(2.0, 0.5, 1.0)
+    check.add_sample(3.0, 1.0, 0.0)
+
+    assert check.max_value == pytest.approx(0.5)
+    assert check.max_time == 2.0  # noqa: PLR2004
+    assert not check.passed
+    summary = check.report()
+    with (tmp_path / NONLINEARITY_SUMMARY).open() as f:
+        assert json.load(f) == summary
@@ -0,0 +1,84 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import scipy.sparse
+
+from gains.utils.matrix_cache import MatrixCache, cache_key, describe_problem
+
+
+class _FakeSubproblem:
+    """Stand-in for a dedalus subproblem, counting how often matrices are built."""
+
+    builds = 0
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+
+    def build_matrices(self, names: list[str]) -> None:
+        type(self).builds += 1
+        for name in names:
+            setattr(self, f"{name}_min", scipy.sparse.eye(self.size, format="csr"))
+        self.valid_modes = np.ones(self.size, dtype=bool)
+        self.logger = object()
+
+
+def _fake_problem(lhs: str, shape: tuple[int, ...]) -> SimpleNamespace:
+    """Stand-in for a dedalus problem with one equation and one variable."""
+    basis = SimpleNamespace(shape=shape)
+    var = SimpleNamespace(
+        name="u",
+        domain=SimpleNamespace(bases=[basis]),
+        dist=SimpleNamespace(mesh=None),
+    )
+    return SimpleNamespace(equations=[{"LHS": lhs}], variables=[var])
+
+
+@pytest.mark.parametrize(
+    ("lhs", "shape", "params", "same"),
+    [
+        pytest.param("dt(u) - 0.01*lap(u)", (8, 4), {"Ek": 0.01}, True, id="Same"),
+        pytest.param("dt(u) - 0.02*lap(u)", (8, 4), {"Ek": 0.01}, False, id="LHS"),
+        pytest.param("dt(u) - 0.01*lap(u)", (16, 4), {"Ek": 0.01}, False, id="Shape"),
+        pytest.param("dt(u) - 0.01*lap(u)", (8, 4), {"Ek": 0.02}, False, id="Params"),
+    ],
+)
+def test_cache_key(
+    lhs: str, shape: tuple[int, ...], params: dict[str, float], *, same: bool
+) -> None:
+    """The key changes with the equations, the bases and the parameters."""
+    reference = cache_key(
+        describe_problem(
+            _fake_problem("dt(u) - 0.01*lap(u)", (8, 4)), int, {"Ek": 0.01}
+        )
+    )
+    key = cache_key(describe_problem(_fake_problem(lhs, shape), int, params))
+    assert (key == reference) == same
+
+
+def test_matrix_cache_round_trip(tmp_path: Path) -> None:
+    """Matrices built on a miss are restored on a hit, without being rebuilt."""
+    cache = MatrixCache(tmp_path, "key")
+    assert cache.load() is None
+
+    built: list[dict] = []
+    with MatrixCache.intercept(_FakeSubproblem, None, built):
+        for size in (2, 3):
+            _FakeSubproblem(size).build_matrices(["M", "L"])
+    # Attributes that are not matrix data are not cached
+    assert set(built[0]) == {"M_min", "L_min", "valid_modes"}
+    cache.save(built, {"params": {}})
+
+    stored = cache.load()
+    assert stored is not None
+    builds = _FakeSubproblem.builds
+    with MatrixCache.intercept(_FakeSubproblem, stored, []):
+        subproblems = [_FakeSubproblem(size) for size in (2, 3)]
+        for subproblem in subproblems:
+            subproblem.build_matrices(["M", "L"])
+    assert _FakeSubproblem.builds == builds
+    assert subproblems[1].L_min.shape == (3, 3)
+    # The original method is put back afterwards
+    _FakeSubproblem(1).build_matrices(["M"])
+    assert _FakeSubproblem.builds == builds + 1
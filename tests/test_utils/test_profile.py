@@ -0,0 +1,240 @@
+import cProfile
+import json
+import logging
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from gains.utils.profile import (
+    FOLDED_STACKS,
+    HOT_SPOT_REPORT,
+    MEMORY_SUMMARY,
+    MERGED_PROFILE,
+    PHASE_SUMMARY,
+    MemoryTracker,
+    PhaseTimer,
+    ProfileWindow,
+    StackSampler,
+    aggregate_profiles,
+    folded_stacks,
+    hot_spots,
+    load_rank_profiles,
+    memory_usage,
+    merge_folded_stacks,
+    merge_profiles,
+    profile,
+)
+
+
+def _inner(n: int) -> int:
+    """Function doing the work in the profiled call."""
+    return sum(i * i for i in range(n))
+
+
+def _outer(n: int) -> int:
+    """Function calling `_inner`, to give the profile some depth."""
+    return _inner(n) + _inner(2 * n)
+
+
+@pytest.fixture
+def profile_dir(tmp_path: Path) -> Path:
+    """Directory of profiles from three 'ranks' doing tenfold more work each."""
+    for rank in range(3):
+        pr = cProfile.Profile()
+        pr.enable()
+        _outer(1000 * 10**rank)
+        pr.disable()
+        pr.dump_stats(tmp_path / f"time_profile.{rank}")
+    return tmp_path
+
+
+def test_merge_profiles(profile_dir: Path) -> None:
+    """Call counts are summed across ranks."""
+    rank_stats = load_rank_profiles(profile_dir)
+    merged = merge_profiles(rank_stats)
+    outer = next(func for func in merged.stats if func[2] == "_outer")
+
+    assert len(rank_stats) == len(list(profile_dir.glob("time_profile.*")))
+    assert merged.stats[outer][1] == len(rank_stats)
+
+
+def test_hot_spots_spread(profile_dir: Path) -> None:
+    """The spread over ranks is ordered, and the biggest rank is the slowest."""
+    rank_stats = load_rank_profiles(profile_dir)
+    rows = hot_spots(rank_stats, top=50)
+    outer = next(row for row in rows if row["function"].startswith("_outer"))
+    low, median, high = outer["cumulative_spread"]
+
+    assert low <= median <= high
+    assert outer["cumulative"] == pytest.approx(sum(outer["cumulative_spread"]))
+    assert outer["slowest_rank"] == len(rank_stats) - 1
+
+
+def test_folded_stacks(profile_dir: Path) -> None:
+    """Work done in `_inner` is attributed to stacks passing through `_outer`."""
+    stacks = folded_stacks(merge_profiles(load_rank_profiles(profile_dir)))
+    inner_stacks = [stack for stack in stacks if "_inner" in stack]
+
+    assert inner_stacks
+    assert all(stack.startswith("_outer") for stack in inner_stacks)
+
+
+def test_aggregate_profiles_outputs(profile_dir: Path) -> None:
+    """All aggregated outputs are written next to the per-rank profiles."""
+    aggregate_profiles(profile_dir, top=5)
+    for name in (MERGED_PROFILE, FOLDED_STACKS, HOT_SPOT_REPORT):
+        assert (profile_dir / name).is_file()
+
+
+def test_stack_sampler() -> None:
+    """Samples of a busy thread land in stacks ending in the busy function."""
+    sampler = StackSampler(frequency=200.0)
+    sampler.enable()
+    deadline = time.perf_counter() + 0.3
+    while time.perf_counter() < deadline:
+        _inner(1000)
+    sampler.disable()
+
+    inner_samples = sum(
+        count for stack, count in sampler.stacks.items() if "_inner" in stack
+    )
+    assert inner_samples > 0
+
+
+def test_merge_folded_stacks() -> None:
+    """Counts of the same stack are summed across ranks."""
+    merged = merge_folded_stacks([{"a;b": 1, "a": 2}, {"a;b": 3}])
+    assert merged == {"a;b": 4, "a": 2}
+
+
+def test_memory_usage() -> None:
+    """The current RSS is positive and no larger than the peak."""
+    rss, peak = memory_usage()
+    assert 0 < rss <= peak
+
+
+def test_memory_tracker(tmp_path: Path) -> None:
+    """Each marked phase is summarised and written to the summary file."""
+    top = 2
+    tracker = MemoryTracker(tmp_path, logging.getLogger(__name__), tracemalloc_top=top)
+    tracker.mark("bases")
+    _buffer = bytearray(2**20)
+    tracker.mark("fields")
+    summary = tracker.report()
+    tracemalloc.stop()
+
+    assert list(summary) == ["bases", "fields"]
+    assert summary["fields"]["rss"]["min"] <= summary["fields"]["rss"]["max"]
+    assert len(summary["fields"]["top_allocations"]) == top
+    with (tmp_path / MEMORY_SUMMARY).open() as f:
+        assert json.load(f) == summary
+
+
+def test_memory_tracker_disabled(tmp_path: Path) -> None:
+    """A disabled tracker records and writes nothing."""
+    tracker = MemoryTracker(tmp_path, logging.getLogger(__name__), enabled=False)
+    tracker.mark("bases")
+    assert tracker.report() is None
+    assert not (tmp_path / MEMORY_SUMMARY).exists()
+
+
+def test_phase_timer(tmp_path: Path) -> None:
+    """Phases are accumulated, usable as decorators, and summarised to file."""
+    timers = PhaseTimer(tmp_path, logging.getLogger(__name__))
+    with timers.phase("setup"):
+        time.sleep(0.01)
+
+    @timers.phase("loop")
+    def loop() -> None:
+        time.sleep(0.01)
+
+    loop()
+    loop()
+    summary = timers.report()
+
+    assert list(summary["phases"]) == ["setup", "loop"]
+    assert summary["phases"]["loop"]["mean"] > summary["phases"]["setup"]["mean"]
+    assert sum(p["fraction"] for p in summary["phases"].values()) <= 1
+    with (tmp_path / PHASE_SUMMARY).open() as f:
+        assert json.load(f) == summary
+
+
+class _RecordingProfiler:
+    """Stand-in for a profiler, recording when it is enabled and disabled."""
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, int]] = []
+        self.clock = 0
+
+    def enable(self) -> None:
+        self.calls.append(("enable", self.clock))
+
+    def disable(self) -> None:
+        self.calls.append(("disable", self.clock))
+
+
+@pytest.mark.parametrize(
+    ("window", "expected"),
+    [
+        pytest.param(
+            ProfileWindow(3, 6),
+            [("enable", 3), ("disable", 6)],
+            id="Iterations",
+        ),
+        pytest.param(
+            ProfileWindow(0.25, 0.5, sim_time=True),
+            [("enable", 3), ("disable", 5)],
+            id="Simulation time",
+        ),
+        pytest.param(
+            ProfileWindow(8, None),
+            [("enable", 8), ("disable", 10)],
+            id="Open-ended, closed at the end of the loop",
+        ),
+    ],
+)
+def test_profile_window(window: ProfileWindow, expected: list) -> None:
+    """The profiler is only enabled while the loop is inside the window."""
+    profiler = _RecordingProfiler()
+    window.profiler = profiler
+    for iteration in range(10):
+        profiler.clock = iteration
+        window.update(SimpleNamespace(iteration=iteration, sim_time=0.1 * iteration))
+    profiler.clock = 10
+    window.close()
+
+    assert profiler.calls == expected
+
+
+def test_profile_window_from_params() -> None:
+    """Windows are only created when requested."""
+    window = ProfileWindow.from_params(
+        {"profile_iterations": None, "profile_sim_time": (1.0, 2.0)}
+    )
+
+    assert ProfileWindow.from_params({"profile_iterations": None}) is None
+    assert (window.start, window.stop, window.sim_time) == (1.0, 2.0, True)
+
+
+def test_profile_with_window(tmp_path: Path) -> None:
+    """Only the steps inside the window appear in the profile."""
+    window = ProfileWindow(2, 3)
+
+    @profile("profiles", tmp_path, window=window)
+    def loop() -> None:
+        for iteration in range(5):
+            window.update(SimpleNamespace(iteration=iteration, sim_time=0.0))
+            if iteration == window.start:
+                _inner(10)
+            else:
+                _outer(10)
+
+    loop()
+    (stats,) = load_rank_profiles(tmp_path / "profiles")
+    names = {func[2]: stat[1] for func, stat in stats.stats.items()}
+
+    assert names["_inner"] == 1
+    assert "_outer" not in names
@@ -0,0 +1,119 @@
+import logging
+from collections.abc import Callable
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from gains.exceptions import BlowUpError
+from gains.utils.rollback import BlowUpRecovery, restart_timestepper
+
+
+class _FakeField:
+    """Stands in for a dedalus field, exposing only coefficient data."""
+
+    def __init__(self, size: int) -> None:
+        self.data = np.zeros(size)
+
+    def __getitem__(self, layout: str) -> np.ndarray:
+        return self.data
+
+    def __setitem__(self, layout: str, value: np.ndarray) -> None:
+        self.data = np.array(value)
+
+
+class _FakeSolver:
+    """Stands in for a dedalus solver, advancing the state by a fixed amount."""
+
+    def __init__(self) -> None:
+        self.state = [_FakeField(4)]
+        self.iteration = 0
+        self.sim_time = 0.0
+        self.timestepper = SimpleNamespace(_iteration=0)
+
+    def step(self, timestep: float) -> None:
+        self.iteration += 1
+        self.sim_time += timestep
+        self.timestepper._iteration += 1
+        self.state[0].data += timestep
+
+
+@pytest.fixture
+def recovery_setup() -> tuple[_FakeSolver, SimpleNamespace, BlowUpRecovery]:
+    """Solver, CFL and recovery watching the maximum of the state."""
+    solver = _FakeSolver()
+    cfl = SimpleNamespace(safety=0.4, max_dt=0.1, stored_dt=0.1)
+    flow = SimpleNamespace(max=lambda _name: solver.state[0].data.max())
+    recovery = BlowUpRecovery(
+        flow,
+        "u",
+        logging.getLogger("TestLogger"),
+        depth=2,
+        threshold=10.0,
+        cadence=1,
+        snapshot_cadence=5,
+    )
+    return solver, cfl, recovery
+
+
+def test_rollback_restores_state(
+    recovery_setup: tuple[_FakeSolver, SimpleNamespace, BlowUpRecovery],
+) -> None:
+    """A non-finite state is replaced by the newest snapshot, with a smaller dt."""
+    solver, cfl, recovery = recovery_setup
+    for _ in range(7):
+        solver.step(cfl.max_dt)
+        assert not recovery.update(solver, cfl)
+
+    solver.state[0].data[0] = np.nan
+    assert recovery.update(solver, cfl)
+
+    assert solver.iteration == recovery.snapshot_cadence
+    assert solver.sim_time == pytest.approx(0.5)
+    assert np.allclose(solver.state[0].data, 0.5)
+    assert solver.timestepper._iteration == 0
+    assert cfl.safety == pytest.approx(0.2)
+    assert cfl.max_dt == pytest.approx(0.05)
+    assert recovery.rollbacks == 1
+
+
+def test_rollback_exhausted(
+    recovery_setup: tuple[_FakeSolver, SimpleNamespace, BlowUpRecovery],
+    raises_context: Callable[[Exception], pytest.RaisesExc],
+) -> None:
+    """Once no snapshots are left, the blow-up is raised."""
+    solver, cfl, recovery = recovery_setup
+    solver.step(cfl.max_dt)
+    recovery.update(solver, cfl)
+
+    solver.state[0].data[:] = 100.0
+    recovery.update(solver, cfl)
+    solver.state[0].data[:] = 100.0
+    with raises_context(BlowUpError(1, "max(u)=1.000000e+02")):
+        recovery.update(solver, cfl)
+
+
+class MultistepIMEX:
+    """Stands in for a dedalus multistep timestepper without its iteration count."""
+
+
+class RungeKuttaIMEX:
+    """Stands in for a dedalus Runge-Kutta timestepper, which keeps no history."""
+
+
+@pytest.mark.parametrize(
+    ("timestepper", "warns"),
+    [
+        pytest.param(MultistepIMEX(), True, id="Multistep"),
+        pytest.param(RungeKuttaIMEX(), False, id="Runge-Kutta"),
+    ],
+)
+def test_restart_timestepper_missing(
+    timestepper: object, *, warns: bool, caplog: pytest.LogCaptureFixture
+) -> None:
+    """A multistep scheme that cannot be restarted is reported, not skipped."""
+    solver = SimpleNamespace(timestepper=timestepper)
+    with caplog.at_level(logging.WARNING):
+        restart_timestepper(solver, logging.getLogger("TestLogger"))
+
+    assert ("Cannot restart MultistepIMEX" in caplog.text) == warns
@@ -0,0 +1,230 @@
+import argparse
+import json
+import logging
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from gains.utils.profile import MEMORY_SUMMARY, PHASE_SUMMARY
+from gains.utils.scaling import (
+    compare_results,
+    parse_plane_resolution,
+    peak_memory,
+    run_metrics,
+    run_scaling_benchmark,
+    setup_time,
+    steady_step_time,
+    strong_scaling,
+    weak_scaling,
+)
+from gains.utils.telemetry import LOAD_BALANCE_FILE
+
+# Stand-in for a simulation script: writes the summaries of a run whose time per
+# iteration is proportional to the grid points per rank, and records how it was
+# called.
+_SCRIPT = """
+import json, sys
+from pathlib import Path
+
+args = dict(zip(sys.argv[1::2], sys.argv[2::2]))
+output_dir = Path(args["--output_dir"])
+output_dir.mkdir(parents=True, exist_ok=True)
+(output_dir / "args.json").write_text(json.dumps(sys.argv[1:]))
+step = int(args["--Nx"]) * int(args["--Ny"]) * 1e-6
+cadence = int(args["--load_balance_cadence"])
+with (output_dir / "load_balance.jsonl").open("w") as f:
+    for iteration in range(cadence, int(args["--stop_iteration"]) + 1, cadence):
+        f.write(json.dumps({"iteration": iteration, "mean_step": step, "mean_wait": 0}))
+        f.write("\\n")
+(output_dir / "phase_times.json").write_text(json.dumps({
+    "ranks": 1,
+    "total": {"min": 3.0, "mean": 3.0, "max": 3.0},
+    "phases": {"main_loop": {"min": 2.0, "mean": 2.0, "max": 2.0, "fraction": 0.7}},
+}))
+"""
+
+
+def _write_load_balance(output_dir: Path, summaries: list[tuple[int, float]]) -> None:
+    """Write load-balance summaries of (iteration, mean step time)."""
+    with (output_dir / LOAD_BALANCE_FILE).open("w") as f:
+        for iteration, step in summaries:
+            f.write(
+                json.dumps(
+                    {"iteration": iteration, "mean_step": step, "mean_wait": 0.1}
+                )
+                + "\n"
+            )
+
+
+def _result(
+    resolution: dict[str, int], ranks: int, step_time: float | None, **kwargs
+) -> dict:
+    """Record of a benchmark run, as returned by run_scaling_benchmark."""
+    return {
+        "script": "script",
+        "resolution": resolution,
+        "ranks": ranks,
+        "status": "completed",
+        "step_time": step_time,
+        "setup_time": 1.0,
+        "peak_memory": 100,
+        **kwargs,
+    }
+
+
+def test_parse_plane_resolution(
+    raises_context: Callable[[Exception], pytest.RaisesExc],
+) -> None:
+    """Resolutions of the Cartesian scripts are given as two integers."""
+    assert parse_plane_resolution("128,64") == {"Nx": 128, "Ny": 64}
+    with raises_context(argparse.ArgumentTypeError("expected NX,NY, got '1,2,3'")):
+        parse_plane_resolution("1,2,3")
+
+
+def test_steady_step_time(tmp_path: Path) -> None:
+    """The first summary is left out, and the others weighted by their iterations."""
+    _write_load_balance(tmp_path, [(10, 5.0), (20, 1.0), (50, 2.0)])
+
+    step_time, iterations = steady_step_time(tmp_path)
+    assert step_time == pytest.approx((10 * 1.1 + 30 * 2.1) / 40)
+    assert iterations == 40  # noqa: PLR2004
+
+
+@pytest.mark.parametrize(
+    "summaries",
+    [pytest.param(None, id="No summaries"), pytest.param([(10, 1.0)], id="One")],
+)
+def test_steady_step_time_missing(
+    tmp_path: Path, summaries: list[tuple[int, float]] | None
+) -> None:
+    """No time per iteration is measured without at least two summaries."""
+    if summaries is not None:
+        _write_load_balance(tmp_path, summaries)
+    assert steady_step_time(tmp_path) is None
+
+
+def test_setup_and_memory(tmp_path: Path) -> None:
+    """The setup time and peak memory are read from the run's summaries."""
+    assert setup_time(tmp_path) is None
+    assert peak_memory(tmp_path, 2) is None
+
+    (tmp_path / PHASE_SUMMARY).write_text(
+        json.dumps(
+            {
+                "ranks": 2,
+                "total": {"min": 9.0, "mean": 9.5, "max": 10.0},
+                "phases": {"main_loop": {"min": 6.0, "mean": 6.5, "max": 7.0}},
+            }
+        )
+    )
+    stats = {"min": 0, "mean": 0, "max": 0}
+    (tmp_path / MEMORY_SUMMARY).write_text(
+        json.dumps(
+            {
+                "bases": {"rss": stats, "peak": {"min": 1, "mean": 2, "max": 3}},
+                "stepping": {"rss": stats, "peak": {"min": 4, "mean": 5, "max": 6}},
+            }
+        )
+    )
+    assert setup_time(tmp_path) == pytest.approx(3.0)
+    assert peak_memory(tmp_path, 2) == {"peak_memory": 6, "total_memory": 10}
+    assert run_metrics(tmp_path, 2)["step_time"] is None
+
+
+def test_strong_scaling() -> None:
+    """Each run is compared to the run at the same resolution on the fewest ranks."""
+    low, high = (
+        {"Nphi": 16, "Ntheta": 16, "Nr": 16},
+        {"Nphi": 32, "Ntheta": 16, "Nr": 16},
+    )
+    results = [
+        _result(low, 4, 0.5),
+        _result(low, 1, 1.0),
+        _result(low, 2, 0.8),
+        _result(high, 2, 3.0),
+        _result(high, 8, None),
+        _result(high, 4, 1.0, status="failed"),
+    ]
+    scaling = strong_scaling(results)
+
+    assert [(run["resolution"], run["ranks"]) for run in scaling] == [
+        (low, 1),
+        (low, 2),
+        (low, 4),
+        (high, 2),
+    ]
+    assert [run["speedup"] for run in scaling] == pytest.approx([1.0, 1.25, 2.0, 1.0])
+    assert [run["efficiency"] for run in scaling] == pytest.approx(
+        [1.0, 0.625, 0.5, 1.0]
+    )
+
+
+def test_weak_scaling() -> None:
+    """Runs with the same grid points per rank are compared, on the fewest ranks."""
+    results = [
+        _result({"Nx": 64, "Ny": 64}, 1, 1.0),
+        _result({"Nx": 128, "Ny": 64}, 2, 1.25),
+        _result({"Nx": 128, "Ny": 128}, 4, 2.0),
+        _result({"Nx": 128, "Ny": 128}, 1, 4.0),
+    ]
+    scaling = weak_scaling(results)
+
+    assert [run["ranks"] for run in scaling] == [1, 2, 4]
+    assert [run["points_per_rank"] for run in scaling] == [64 * 64] * 3
+    assert [run["efficiency"] for run in scaling] == pytest.approx([1.0, 0.8, 0.5])
+
+
+def test_compare_results() -> None:
+    """Runs measured in both benchmarks are compared by ratio."""
+    resolution = {"Nx": 64, "Ny": 64}
+    baseline = {"runs": [_result(resolution, 1, 2.0), _result(resolution, 2, 1.0)]}
+    results = {
+        "runs": [
+            _result(resolution, 1, 1.0, setup_time=2.0, peak_memory=None),
+            _result(resolution, 4, 0.5),
+        ]
+    }
+    (comparison,) = compare_results(baseline, results)
+
+    assert comparison["ranks"] == 1
+    assert comparison["step_time_ratio"] == pytest.approx(0.5)
+    assert comparison["setup_time_ratio"] == pytest.approx(2.0)
+    assert comparison["peak_memory_ratio"] is None
+
+
+def test_run_scaling_benchmark(tmp_path: Path) -> None:
+    """Every resolution runs on every number of ranks, and is measured."""
+    script = tmp_path / "script.py"
+    script.write_text(_SCRIPT)
+    resolutions = [{"Nx": 100, "Ny": 100}, {"Nx": 200, "Ny": 100}]
+    results = run_scaling_benchmark(
+        script,
+        None,
+        resolutions,
+        tmp_path / "scaling",
+        logging.getLogger(__name__),
+        ranks=[1, 2],
+        iterations=40,
+        load_balance_cadence=10,
+        launcher=None,
+        poll_interval=0.01,
+    )
+
+    assert [(run["resolution"], run["ranks"]) for run in results] == [
+        (resolutions[0], 1),
+        (resolutions[1], 1),
+        (resolutions[0], 2),
+        (resolutions[1], 2),
+    ]
+    assert all(run["status"] == "completed" for run in results)
+    assert [run["step_time"] for run in results] == pytest.approx([1e-2, 2e-2] * 2)
+    assert all(run["timed_iterations"] == 30 for run in results)  # noqa: PLR2004
+    assert all(run["setup_time"] == pytest.approx(1.0) for run in results)
+    args = json.loads(
+        (
+            tmp_path / "scaling" / "script" / "ranks_2" / "run_1" / "args.json"
+        ).read_text()
+    )
+    assert args[:4] == ["--Nx", "200", "--Ny", "100"]
+    assert "--profile_memory" in args
@@ -6,7 +6,11 @@ from typing import Any
 
 import pytest
 
+from gains.utils.catalog import CATALOG_FILE
+from gains.utils.checkpoints import CHECKPOINT_DIR
+from gains.utils.linear import LINEAR_TIMESTEP
 from gains.utils.parsers import SimulationCLI
+from gains.utils.walltime import write_run_state
 
 
 @pytest.fixture
@@ -94,6 +98,94 @@ def tmp_parameters(tmp_path: Path) -> Path:
             False,
             id="Profiling disabled but passed anyway",
         ),
+        pytest.param(
+            {"profiling_option": True},
+            ["--profile_iterations", "500:1500"],
+            {},
+            {"profile_iterations": (500.0, 1500.0)},
+            False,
+            id="Profile a window of iterations",
+        ),
+        pytest.param(
+            {"profiling_option": True},
+            ["--profile_sim_time", "2.5:"],
+            {},
+            {"profile_sim_time": (2.5, None)},
+            False,
+            id="Profile from a simulation time onwards",
+        ),
+        pytest.param(
+            {"profiling_option": True},
+            ["--profile_iterations", "500"],
+            {},
+            SystemExit(2),
+            False,
+            id="Profiling window without a colon",
+        ),
+        pytest.param(
+            {"profiling_option": True},
+            ["--profile_iterations", "1:2", "--profile_sim_time", "1:2"],
+            {},
+            SystemExit(2),
+            False,
+            id="Profiling windows are mutually exclusive",
+        ),
+        pytest.param(
+            {},
+            ["--axisymmetric"],
+            {"Nphi": 128, "Ntheta": 64},
+            {"Nphi": 1, "Ntheta": 64, "axisymmetric": True},
+            False,
+            id="Axisymmetric mode keeps a single azimuthal mode",
+        ),
+        pytest.param(
+            {},
+            ["--axisymmetric", "--axisymmetry_check", "1e-6"],
+            {},
+            SystemExit(2),
+            False,
+            id="Axisymmetric mode cannot be checked against itself",
+        ),
+        pytest.param(
+            {},
+            ["--linear", "--linear_timestep", "0.1"],
+            {"dealias": 3 / 2},
+            {"dealias": 1, "linear": True, "linear_timestep": 0.1},
+            False,
+            id="Linear mode does not dealias",
+        ),
+        pytest.param(
+            {},
+            ["--initial_condition", "ekman"],
+            {},
+            {"initial_condition": "ekman"},
+            False,
+            id="Ekman-layer initial condition",
+        ),
+        pytest.param(
+            {},
+            ["--initial_condition", "rest"],
+            {},
+            SystemExit(2),
+            False,
+            id="Unknown initial condition",
+        ),
+        pytest.param(
+            {},
+            ["--stop_iteration", "200"],
+            {},
+            {"stop_iteration": 200},
+            False,
+            id="Stop iteration",
+        ),
+        pytest.param(
+            {},
+            ["--no_catalog"],
+            {},
+            {"catalog": None},
+            False,
+            id="Run not registered in a catalog",
+        ),
         pytest.param(
             {},
             ["--logfile", "log/file"],
@@ -163,15 +255,39 @@ def test_simulation_cli_parsing(
         # which should confirm that the default values are used in the param comparison
         # below.
         expected_output.setdefault("use_checkpoint", False)
-        expected_output.setdefault(
-            "checkpoint_path",
-            str(parser.place_all_outputs_under / parser._default_checkpoint_path),
-        )
+        expected_output.setdefault("checkpoint_path", None)
         expected_output.setdefault(
             "output_dir", parser.place_all_outputs_under / parser._default_output_dir
         )
         expected_output.setdefault("profile", None)
+        expected_output.setdefault("profile_aggregate", False)
+        expected_output.setdefault("profile_mode", "cprofile")
+        expected_output.setdefault("profile_frequency", 100.0)
+        expected_output.setdefault("profile_memory", False)
+        expected_output.setdefault("profile_tracemalloc", 0)
+        expected_output.setdefault("profile_iterations", None)
+        expected_output.setdefault("profile_sim_time", None)
+        expected_output.setdefault(
+            "catalog", parser.place_all_outputs_under / CATALOG_FILE
+        )
         expected_output.setdefault("checkpoint_cadence", 3600)
+        expected_output.setdefault("checkpoint_keep", 3)
+        expected_output.setdefault("matrix_cache", None)
+        expected_output.setdefault("wall_time", None)
+        expected_output.setdefault("wall_time_margin", 600)
+        expected_output.setdefault("stop_iteration", None)
+        expected_output.setdefault("load_balance_cadence", None)
+        expected_output.setdefault("rollback_depth", None)
+        expected_output.setdefault("blowup_threshold", float("inf"))
+        expected_output.setdefault("steady_rtol", None)
+        expected_output.setdefault("steady_window", 1.0)
+        expected_output.setdefault("steady_hold", 1.0)
+        expected_output.setdefault("axisymmetric", False)
+        expected_output.setdefault("axisymmetry_check", None)
+        expected_output.setdefault("linear", False)
+        expected_output.setdefault("linear_timestep", LINEAR_TIMESTEP)
+        expected_output.setdefault("nonlinearity_check", None)
+        expected_output.setdefault("initial_condition", "noise")
 
         params = parser.parse_args_and_get_params(
             logger_for_tests, cli_args, default_params=default_params
@@ -186,3 +302,112 @@ def test_simulation_cli_parsing(
             if isinstance(h, logging.FileHandler)
         ]
         assert (str(parser.log_path) in logger_files) == bool(parser.log_path)
+
+
+@pytest.mark.parametrize(
+    ("status", "cli_args", "expect_resume"),
+    [
+        pytest.param("interrupted", [], True, id="Interrupted run is resumed"),
+        pytest.param("completed", [], False, id="Completed run is not resumed"),
+        pytest.param("failed", [], False, id="Failed run is not resumed"),
+        pytest.param(
+            "interrupted",
+            ["--use_checkpoint", "True", "--checkpoint_path", "explicit.h5"],
+            False,
+            id="Explicit checkpoint takes precedence",
+        ),
+    ],
+)
+def test_simulation_cli_resume(
+    status: str,
+    cli_args: list[str],
+    cli_for_tests: Callable[..., SimulationCLI],
+    logger_for_tests: logging.Logger,
+    tmp_path: Path,
+    *,
+    write_checkpoint: Callable[[Path], Path],
+    expect_resume: bool,
+) -> None:
+    """Check runs recorded as interrupted in `--output_dir` are resumed."""
+    checkpoint = write_checkpoint(
+        tmp_path / "run" / CHECKPOINT_DIR / "checkpoint_s2.h5"
+    )
+    write_run_state(tmp_path / "run", status, checkpoint=str(checkpoint))
+
+    parser = cli_for_tests()
+    params = parser.parse_args_and_get_params(
+        logger_for_tests, ["--output_dir", "run", *cli_args]
+    )
+
+    if expect_resume:
+        assert params["use_checkpoint"]
+        assert params["checkpoint_path"] == str(checkpoint)
+    else:
+        assert params["checkpoint_path"] != str(checkpoint)
+
+
+@pytest.mark.parametrize(
+    ("cli_args", "expected"),
+    [
+        pytest.param(["--use_checkpoint", "False"], False, id="False"),
+        pytest.param(["--use_checkpoint", "no"], False, id="No"),
+        pytest.param(
+            ["--use_checkpoint", "true", "--checkpoint_path", "a.h5"], True, id="True"
+        ),
+        pytest.param(["--use_checkpoint", "maybe"], SystemExit(2), id="Not a bool"),
+    ],
+)
+def test_simulation_cli_use_checkpoint(
+    cli_args: list[str],
+    cli_for_tests: Callable[..., SimulationCLI],
+    logger_for_tests: logging.Logger,
+    raises_context: Callable[[Exception], pytest.RaisesExc],
+    *,
+    expected: bool | SystemExit,
+) -> None:
+    """`--use_checkpoint` only accepts booleans, and "False" means False."""
+    parser = cli_for_tests()
+    if isinstance(expected, SystemExit):
+        with raises_context(expected):
+            parser.parse_args_and_get_params(logger_for_tests, cli_args)
+    else:
+        params = parser.parse_args_and_get_params(logger_for_tests, cli_args)
+        assert params["use_checkpoint"] == expected
+
+
+def test_simulation_cli_latest_checkpoint(
+    cli_for_tests: Callable[..., SimulationCLI],
+    logger_for_tests: logging.Logger,
+    tmp_path: Path,
+    write_checkpoint: Callable[[Path], Path],
+    raises_context: Callable[[Exception], pytest.RaisesExc],
+) -> None:
+    """Without `--checkpoint_path`, the newest valid checkpoint of the run is used."""
+    cli_args = ["--output_dir", "run", "--use_checkpoint", "true"]
+    with raises_context(SystemExit(2)):
+        cli_for_tests().parse_args_and_get_params(logger_for_tests, cli_args)
+
+    for n in (1, 2):
+        write_checkpoint(tmp_path / "run" / CHECKPOINT_DIR / f"checkpoint_s{n}.h5")
+    (tmp_path / "run" / CHECKPOINT_DIR / "checkpoint_s3.h5").touch()
+    params = cli_for_tests().parse_args_and_get_params(logger_for_tests, cli_args)
+
+    assert params["checkpoint_path"] == str(
+        tmp_path / "run" / CHECKPOINT_DIR / "checkpoint_s2.h5"
+    )
+
+
+def test_simulation_cli_catalog_failure(
+    cli_for_tests: Callable[..., SimulationCLI],
+    logger_for_tests: logging.Logger,
+    tmp_path: Path,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """A catalog that cannot be opened is reported, and the run goes on without it."""
+    # A directory cannot be opened as a SQLite database
+    params = cli_for_tests().parse_args_and_get_params(
+        logger_for_tests, ["--catalog", str(tmp_path)]
+    )
+
+    assert params["catalog"] is None
+    assert "Could not register the run" in caplog.text
@@ -0,0 +1,196 @@
+import argparse
+import json
+import logging
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from gains.utils.sweep import (
+    PARAMETER_FILE,
+    SWEEP_SUMMARY,
+    ArgumentSweep,
+    Sweep,
+    expand_grid,
+    load_base_params,
+    parse_grid_axis,
+    parse_resolution,
+)
+from gains.utils.walltime import write_run_state
+
+# Stand-in for a simulation script: fails on its first attempt if asked to, and
+# records how it was called.
+_SCRIPT = """
+import json, sys
+from pathlib import Path
+
+args = dict(zip(sys.argv[1::2], sys.argv[2::2]))
+with open(args["--parameter_file"]) as f:
+    params = json.load(f)
+output_dir = Path(args["--output_dir"])
+marker = output_dir / "attempted"
+if params.get("fail_once") and not marker.exists():
+    marker.touch()
+    sys.exit(1)
+if params.get("fail_always"):
+    sys.exit(1)
+(output_dir / "args.json").write_text(json.dumps(sys.argv[1:]))
+"""
+
+
+@pytest.fixture
+def script(tmp_path: Path) -> Path:
+    """Write the stand-in simulation script."""
+    path = tmp_path / "script.py"
+    path.write_text(_SCRIPT)
+    return path
+
+
+def _sweep(script: Path, tmp_path: Path, overrides: list[dict], **kwargs) -> Sweep:
+    """Create a sweep running the stand-in script directly, without mpiexec."""
+    return Sweep(
+        script,
+        {"Ek": 1e-3, "B": 0.1},
+        overrides,
+        tmp_path / "sweep",
+        logging.getLogger(__name__),
+        launcher=None,
+        poll_interval=0.01,
+        **kwargs,
+    )
+
+
+def test_expand_grid() -> None:
+    """Every combination is produced, with the last parameter varying fastest."""
+    assert expand_grid({"Ek": [1, 2], "B": [3, 4]}) == [
+        {"Ek": 1, "B": 3},
+        {"Ek": 1, "B": 4},
+        {"Ek": 2, "B": 3},
+        {"Ek": 2, "B": 4},
+    ]
+    assert expand_grid({}) == [{}]
+
+
+def test_parse_grid_axis() -> None:
+    """Values are read as JSON where possible."""
+    assert parse_grid_axis("Ek=1e-3,1e-4") == ("Ek", [1e-3, 1e-4])
+    assert parse_grid_axis("name=a,2") == ("name", ["a", 2])
+
+
+def test_parse_resolution(
+    raises_context: Callable[[Exception], pytest.RaisesExc],
+) -> None:
+    """Resolutions are given as three integers."""
+    assert parse_resolution("64,32,16") == {"Nphi": 64, "Ntheta": 32, "Nr": 16}
+    with raises_context(
+        argparse.ArgumentTypeError("expected NPHI,NTHETA,NR, got '64,32'")
+    ):
+        parse_resolution("64,32")
+
+
+def test_load_base_params(tmp_path: Path) -> None:
+    """Parameters are loaded from gains.params modules or from JSON files."""
+    parameter_file = tmp_path / "params.json"
+    parameter_file.write_text(json.dumps({"Ek": 1.0}))
+
+    assert load_base_params("spherical_shell")["Ri"] == pytest.approx(0.5)
+    assert load_base_params(parameter_file) == {"Ek": 1.0}
+
+
+def test_sweep(script: Path, tmp_path: Path) -> None:
+    """All runs complete, with their own parameter files and extra arguments."""
+    sweep = _sweep(
+        script,
+        tmp_path,
+        [{"Ek": 1e-4}, {"B": 0.5}, {}],
+        max_concurrent=2,
+        script_args=["--wall_time", "60"],
+    )
+    runs = sweep.run()
+
+    assert [run.status for run in runs] == ["completed"] * 3
+    with (runs[0].run_dir / PARAMETER_FILE).open() as f:
+        assert json.load(f) == {"Ek": 1e-4, "B": 0.1}
+    args = json.loads((runs[1].run_dir / "args.json").read_text())
+    assert args[-2:] == ["--wall_time", "60"]
+    with (tmp_path / "sweep" / SWEEP_SUMMARY).open() as f:
+        summary = json.load(f)
+    assert [run["status"] for run in summary["runs"]] == ["completed"] * 3
+    assert "completed" in sweep.format_summary()
+
+
+@pytest.mark.parametrize(
+    ("overrides", "retries", "status", "attempts"),
+    [
+        pytest.param({"fail_once": True}, 1, "completed", 2, id="Retry succeeds"),
+        pytest.param({"fail_once": True}, 0, "failed", 1, id="No retries"),
+        pytest.param({"fail_always": True}, 2, "failed", 3, id="Retries exhausted"),
+    ],
+)
+def test_sweep_retries(
+    script: Path,
+    tmp_path: Path,
+    overrides: dict,
+    *,
+    retries: int,
+    status: str,
+    attempts: int,
+) -> None:
+    """Failed runs are relaunched until they succeed or run out of retries."""
+    (run,) = _sweep(script, tmp_path, [overrides], retries=retries).run()
+
+    assert (run.status, run.attempts) == (status, attempts)
+
+
+def test_sweep_skips_completed(script: Path, tmp_path: Path) -> None:
+    """Runs recorded as completed by an earlier sweep are not launched again."""
+    sweep = _sweep(script, tmp_path, [{}, {"fail_always": True}])
+    write_run_state(sweep.runs[1].run_dir, "completed")
+    runs = sweep.run()
+
+    assert [run.attempts for run in runs] == [1, 0]
+    assert [run.status for run in runs] == ["completed", "completed"]
+
+
+def test_sweep_command(script: Path, tmp_path: Path) -> None:
+    """Runs are launched through mpiexec with the requested number of ranks."""
+    sweep = Sweep(
+        script,
+        {},
+        [{}],
+        tmp_path,
+        logging.getLogger(__name__),
+        ranks_per_run=4,
+        cores=10,
+    )
+    command = sweep.command(sweep.runs[0])
+
+    assert command[:4] == ["mpiexec", "-n", "4", sys.executable]
+    assert sweep.slots == 10 // 4
+
+
+def test_argument_sweep_command(script: Path, tmp_path: Path) -> None:
+    """Parameters are passed as arguments, for scripts without a parameter file."""
+    sweep = ArgumentSweep(
+        script,
+        {"Nx": 64},
+        [{"Ny": 32}],
+        tmp_path,
+        logging.getLogger(__name__),
+        script_args=["--stop_iteration", "10"],
+        launcher=None,
+    )
+    command = sweep.command(sweep.runs[0])
+
+    assert command[1:] == [
+        str(script),
+        "--Nx",
+        "64",
+        "--Ny",
+        "32",
+        "--output_dir",
+        str(sweep.runs[0].run_dir),
+        "--stop_iteration",
+        "10",
+    ]
@@ -0,0 +1,64 @@
+import json
+import logging
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from gains.utils.telemetry import (
+    LOAD_BALANCE_FILE,
+    PHASES,
+    LoadBalanceMonitor,
+    summarise_imbalance,
+)
+
+
+@pytest.mark.parametrize(
+    ("step_times", "expected_imbalance", "expected_slowest"),
+    [
+        pytest.param([1.0, 1.0, 1.0, 1.0], 1.0, 0, id="Balanced"),
+        pytest.param([1.0, 1.0, 1.0, 5.0], 2.5, 3, id="One slow rank"),
+    ],
+)
+def test_summarise_imbalance(
+    step_times: list[float], expected_imbalance: float, expected_slowest: int
+) -> None:
+    """Imbalance is the ratio of the slowest rank's step time to the mean."""
+    times = np.zeros((len(step_times), len(PHASES)))
+    times[:, PHASES.index("step")] = step_times
+    summary = summarise_imbalance(times)
+
+    assert summary["ranks"] == len(step_times)
+    assert summary["imbalance"] == pytest.approx(expected_imbalance)
+    assert summary["slowest_rank"] == expected_slowest
+
+
+class _FakeSolver:
+    """Stands in for a dedalus solver, advancing only the iteration count."""
+
+    def __init__(self) -> None:
+        self.iteration = 0
+        self.sim_time = 0.0
+
+    def step(self, timestep: float) -> None:
+        self.iteration += 1
+        self.sim_time += timestep
+
+
+def test_monitor_writes_summaries(tmp_path: Path) -> None:
+    """A summary is appended to the output every `cadence` iterations."""
+    cadence = 5
+    monitor = LoadBalanceMonitor(
+        tmp_path, logging.getLogger("TestLogger"), cadence=cadence
+    )
+    solver = _FakeSolver()
+    cfl = SimpleNamespace(compute_timestep=lambda: 0.1)
+
+    for _ in range(2 * cadence):
+        assert monitor.step(solver, cfl) == pytest.approx(0.1)
+
+    with (tmp_path / LOAD_BALANCE_FILE).open() as f:
+        summaries = [json.loads(line) for line in f]
+    assert [s["iteration"] for s in summaries] == [cadence, 2 * cadence]
+    assert all(s["ranks"] == 1 for s in summaries)
@@ -0,0 +1,146 @@
+import shutil
+from pathlib import Path
+
+import h5py
+import numpy as np
+import pytest
+
+import gains.utils.virtual_dataset
+from gains.utils.virtual_dataset import (
+    find_handlers,
+    set_files,
+    update_virtual_dataset,
+    virtual_path,
+)
+
+NX = 4
+
+
+def _write_set(handler_dir: Path, number: int, writes: int) -> None:
+    """
+    Write a set with the layout dedalus gives it, with dimension scales attached.
+
+    Each write n of set s holds u = 100 s + n + x, at sim_time s + n / 10.
+    """
+    handler_dir.mkdir(parents=True, exist_ok=True)
+    with h5py.File(handler_dir / f"{handler_dir.name}_s{number}.h5", "w") as f:
+        sim_time = f.create_dataset(
+            "scales/sim_time", data=number + np.arange(writes) / 10, maxshape=(None,)
+        )
+        iteration = f.create_dataset(
+            "scales/iteration", data=10 * number + np.arange(writes), maxshape=(None,)
+        )
+        x = f.create_dataset("scales/x_hash_0", data=np.arange(NX, dtype=float))
+        u = f.create_dataset(
+            "tasks/u",
+            data=100 * number + np.arange(writes)[:, None] + x[()],
+            maxshape=(None, NX),
+        )
+        sim_time.make_scale("sim_time")
+        iteration.make_scale("iteration")
+        x.make_scale("x")
+        u.dims[0].label = "t"
+        u.dims[0].attach_scale(sim_time)
+        u.dims[0].attach_scale(iteration)
+        u.dims[1].label = "x"
+        u.dims[1].attach_scale(x)
+
+
+def test_set_files(tmp_path: Path) -> None:
+    """Sets are ordered by number, and other files are ignored."""
+    handler_dir = tmp_path / "slices"
+    for number in (10, 2, 1):
+        _write_set(handler_dir, number, 1)
+    (handler_dir / "other_s3.h5").touch()
+    (handler_dir / "slices.txt").touch()
+
+    assert [path.name for path in set_files(handler_dir)] == [
+        "slices_s1.h5",
+        "slices_s2.h5",
+        "slices_s10.h5",
+    ]
+    assert virtual_path(handler_dir) == tmp_path / "slices.h5"
+
+
+def test_update_virtual_dataset(tmp_path: Path) -> None:
+    """The writes of every set are mapped onto one time axis, with their scales."""
+    handler_dir = tmp_path / "run" / "slices"
+    _write_set(handler_dir, 1, 3)
+    _write_set(handler_dir, 2, 2)
+
+    assert update_virtual_dataset(handler_dir)
+    # The sets are found relative to the virtual file
+    shutil.move(tmp_path / "run", tmp_path / "moved")
+    with h5py.File(tmp_path / "moved" / "slices.h5", "r") as f:
+        u = f["tasks/u"]
+        assert u.is_virtual
+        np.testing.assert_allclose(u[:, 0], [100, 101, 102, 200, 201])
+        np.testing.assert_allclose(u[3], 200 + np.arange(NX))
+        np.testing.assert_allclose(f["scales/sim_time"], [1, 1.1, 1.2, 2, 2.1])
+        np.testing.assert_array_equal(f["scales/iteration"], [10, 11, 12, 20, 21])
+        assert u.dims[0].label == "t"
+        assert list(u.dims[0].keys()) == ["sim_time", "iteration"]
+        np.testing.assert_allclose(u.dims[0][0], f["scales/sim_time"])
+        np.testing.assert_allclose(u.dims[1][0], np.arange(NX))
+
+
+def test_update_virtual_dataset_incremental(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Only the last set mapped and new sets are opened, and changes are written."""
+    handler_dir = tmp_path / "slices"
+    for number in (1, 2, 3):
+        _write_set(handler_dir, number, 2)
+    assert update_virtual_dataset(handler_dir)
+
+    counted = []
+    count_writes = gains.utils.virtual_dataset._count_writes
+    monkeypatch.setattr(
+        gains.utils.virtual_dataset,
+        "_count_writes",
+        lambda path: counted.append(path.name) or count_writes(path),
+    )
+    assert not update_virtual_dataset(handler_dir)
+    assert counted == ["slices_s3.h5"]
+
+    counted.clear()
+    _write_set(handler_dir, 3, 4)
+    _write_set(handler_dir, 4, 1)
+    assert update_virtual_dataset(handler_dir)
+    assert counted == ["slices_s3.h5", "slices_s4.h5"]
+    with h5py.File(virtual_path(handler_dir), "r") as f:
+        assert f["tasks/u"].shape == (2 + 2 + 4 + 1, NX)
+        np.testing.assert_allclose(f["tasks/u"][-2:, 0], [303, 400])
+
+    counted.clear()
+    assert update_virtual_dataset(handler_dir, rebuild=True)
+    assert len(counted) == 4  # noqa: PLR2004
+
+
+def test_update_virtual_dataset_partial(tmp_path: Path) -> None:
+    """Empty sets are left out, and unreadable sets end the sets mapped."""
+    handler_dir = tmp_path / "slices"
+    _write_set(handler_dir, 1, 2)
+    _write_set(handler_dir, 2, 0)
+    _write_set(handler_dir, 3, 1)
+    (handler_dir / "slices_s4.h5").write_bytes(b"being written")
+    _write_set(handler_dir, 5, 1)
+
+    assert update_virtual_dataset(handler_dir)
+    with h5py.File(virtual_path(handler_dir), "r") as f:
+        np.testing.assert_allclose(f["tasks/u"][:, 0], [100, 101, 300])
+        assert list(f.attrs["set_files"]) == ["slices_s1.h5", "slices_s3.h5"]
+
+    assert not update_virtual_dataset(tmp_path / "empty")
+
+
+def test_find_handlers(tmp_path: Path) -> None:
+    """Handler directories are found at any depth, except in excluded directories."""
+    _write_set(tmp_path / "slices", 1, 1)
+    _write_set(tmp_path / "su_equator" / "AZ_avg_equator", 1, 1)
+    _write_set(tmp_path / "checkpoints" / "checkpoints", 1, 1)
+
+    assert find_handlers(tmp_path, exclude=("checkpoints",)) == [
+        tmp_path / "slices",
+        tmp_path / "su_equator" / "AZ_avg_equator",
+    ]
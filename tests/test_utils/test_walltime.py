@@ -0,0 +1,89 @@
+import logging
+import os
+import signal
+from collections.abc import Callable
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from gains.utils.checkpoints import CHECKPOINT_DIR
+from gains.utils.walltime import (
+    WallClockGuard,
+    read_run_state,
+    resume_checkpoint,
+    write_run_state,
+)
+
+
+def test_run_state_round_trip(tmp_path: Path) -> None:
+    """Records written by write_run_state are read back unchanged."""
+    assert read_run_state(tmp_path) is None
+    details = {"iteration": 10, "sim_time": 0.5}
+    write_run_state(tmp_path, "interrupted", **details)
+    record = read_run_state(tmp_path)
+    assert record is not None
+    assert record["status"] == "interrupted"
+    assert details.items() <= record.items()
+
+
+def test_resume_checkpoint_missing_file(tmp_path: Path) -> None:
+    """Interrupted runs whose checkpoint has disappeared start afresh."""
+    write_run_state(tmp_path, "interrupted", checkpoint=str(tmp_path / "gone.h5"))
+    assert resume_checkpoint(tmp_path) is None
+
+
+def test_resume_checkpoint_fallback(
+    tmp_path: Path, write_checkpoint: Callable[[Path], Path]
+) -> None:
+    """If the recorded checkpoint is unusable, the newest valid one is used."""
+    newest = write_checkpoint(tmp_path / CHECKPOINT_DIR / "checkpoint_s2.h5")
+    write_run_state(tmp_path, "interrupted", checkpoint=str(tmp_path / "gone.h5"))
+    assert resume_checkpoint(tmp_path) == newest
+
+
+@pytest.mark.parametrize(
+    ("wall_time", "expected_reason"),
+    [
+        pytest.param(None, None, id="No budget"),
+        pytest.param(0.0, "wall_time", id="Budget exhausted"),
+    ],
+)
+def test_guard_wall_time(
+    tmp_path: Path, wall_time: float | None, expected_reason: str | None
+) -> None:
+    """The guard only requests a stop once the budget (less margin) is used up."""
+    guard = WallClockGuard(tmp_path, wall_time=wall_time, margin=0.0, cadence=5)
+    # Only iterations on the cadence are checked.
+    assert not guard.should_stop(3)
+    assert guard.should_stop(5) == (expected_reason is not None)
+    assert guard.reason == expected_reason
+
+
+def test_guard_signal(tmp_path: Path) -> None:
+    """A watched signal is turned into a stop request at the next check."""
+    previous = signal.getsignal(signal.SIGUSR1)
+    try:
+        guard = WallClockGuard(tmp_path, cadence=1, signals=(signal.SIGUSR1,))
+        assert not guard.should_stop(1)
+        os.kill(os.getpid(), signal.SIGUSR1)
+        assert guard.should_stop(2)
+        assert guard.reason == "SIGUSR1"
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
+
+
+def test_guard_catalog_failure(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    """A catalog that cannot be written to does not stop the run being recorded."""
+    guard = WallClockGuard(tmp_path / "run", signals=(), catalog=tmp_path)
+    guard.finish(
+        SimpleNamespace(iteration=10, sim_time=0.5),
+        0.01,
+        "completed",
+        logger=logging.getLogger(__name__),
+    )
+
+    assert read_run_state(tmp_path / "run")["status"] == "completed"
+    assert "Could not record the run" in caplog.text